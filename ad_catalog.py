@@ -0,0 +1,220 @@
+"""
+Ad Catalog for Kijiji Room Rental Automation
+Loads any number of ads from a JSON/YAML file and validates them once, before the browser starts
+
+Catalog format (see catalogs/dual.json):
+{
+    "defaults": {"location": "138 Chillery Avenue", "phone": "647-607-4050"},
+    "ads": [
+        {"name": "ad1", "title": "...", "description": "...", "price": "500",
+         "tags": ["furnished", "scarborough"], "images": ["images/ad1/room_main.png"]},
+        {"name": "ad2", ..., "images_dir": "images/ad2"}
+    ]
+}
+
+"defaults" fill in any field an ad leaves out. An ad's photos are listed in "images",
+or taken from every photo in "images_dir". "name" identifies the ad in per-account
+overrides and defaults to ad1, ad2, ... by position.
+
+Every problem found is reported at once (CatalogError), so a bad catalog fails in
+under a second instead of halfway through a posting run.
+
+Usage:
+  python ad_catalog.py catalogs/triple.json   - Validate a catalog and list its ads
+"""
+
+import json
+import os
+import re
+import sys
+
+from image_variants import list_images
+
+try:
+    import yaml
+except ImportError:  # PyYAML missing - JSON catalogs still work
+    yaml = None
+
+# Kijiji's form limits
+MAX_TITLE_LENGTH = 100
+MAX_DESCRIPTION_LENGTH = 4000
+MAX_TAGS = 5
+MAX_TAG_LENGTH = 20
+# Whole dollars or dollars and cents, no currency sign ("500", "450.00")
+PRICE_PATTERN = re.compile(r'^\d{1,6}(\.\d{2})?$')
+# Canadian 10-digit number, any separators ("647-607-4050", "6477405216")
+PHONE_PATTERN = re.compile(r'^\D*(\d\D*){10}$')
+
+REQUIRED_FIELDS = ('title', 'description', 'price', 'phone', 'location')
+
+
+class CatalogError(ValueError):
+    """The catalog can't be loaded or has invalid ads - lists every problem found"""
+
+    def __init__(self, path, problems):
+        self.path = path
+        self.problems = list(problems)
+        details = '\n'.join(f'  - {problem}' for problem in self.problems)
+        super().__init__(f"Invalid ad catalog {path}:\n{details}")
+
+
+def read_catalog_file(path):
+    """Parse a .json, .yaml or .yml catalog file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise CatalogError(path, ["YAML catalogs need PyYAML (pip install pyyaml) - or use JSON"])
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def validate_ad(ad, check_images=True):
+    """
+    Check one ad against Kijiji's form limits.
+
+    Args:
+        ad (dict): Ad with defaults already applied
+        check_images (bool): Also require every photo to exist on disk
+
+    Returns:
+        list: Problems found (empty if the ad is valid)
+    """
+    if not isinstance(ad, dict):
+        return [f"should be an object with {', '.join(REQUIRED_FIELDS)}, not {type(ad).__name__}"]
+
+    problems = []
+    for field in REQUIRED_FIELDS:
+        if not str(ad.get(field) or '').strip():
+            problems.append(f"missing {field}")
+
+    # Typed into the form as text - a number or list would fail halfway through posting
+    title = ad.get('title') or ''
+    if not isinstance(title, str):
+        problems.append("title should be text")
+    elif len(title) > MAX_TITLE_LENGTH:
+        problems.append(f"title is {len(title)} characters (Kijiji allows {MAX_TITLE_LENGTH})")
+
+    description = ad.get('description') or ''
+    if not isinstance(description, str):
+        problems.append("description should be text")
+    elif len(description) > MAX_DESCRIPTION_LENGTH:
+        problems.append(f"description is {len(description)} characters (Kijiji allows {MAX_DESCRIPTION_LENGTH})")
+
+    price = str(ad.get('price') or '')
+    if price and not PRICE_PATTERN.match(price):
+        problems.append(f"price '{price}' should be a plain amount like 500 or 450.00")
+
+    phone = str(ad.get('phone') or '')
+    if phone and not PHONE_PATTERN.match(phone):
+        problems.append(f"phone '{phone}' should be a 10-digit number")
+
+    # Typed into the location box - the autocomplete suggestion is picked by it
+    location = ad.get('location')
+    if location and not isinstance(location, str):
+        problems.append("location should be an address string like \"138 Chillery Avenue\"")
+
+    tags = ad.get('tags', [])
+    if not isinstance(tags, list):
+        problems.append("tags should be a list")
+    else:
+        if len(tags) > MAX_TAGS:
+            problems.append(f"{len(tags)} tags (Kijiji allows {MAX_TAGS})")
+        not_text = [repr(tag) for tag in tags if not isinstance(tag, str)]
+        if not_text:
+            problems.append(f"tags should be text: {', '.join(not_text)}")
+        long_tags = [tag for tag in tags if isinstance(tag, str) and len(tag) > MAX_TAG_LENGTH]
+        if long_tags:
+            problems.append(f"tags longer than {MAX_TAG_LENGTH} characters: {', '.join(long_tags)}")
+
+    # A single path given as a string would otherwise be uploaded one character at a time
+    images = ad.get('images', [])
+    if not isinstance(images, list) or not all(isinstance(path, str) for path in images):
+        problems.append("images should be a list of photo paths")
+    elif check_images:
+        missing = [path for path in images if not os.path.isfile(path)]
+        if missing:
+            problems.append(f"missing photos: {', '.join(missing)}")
+    return problems
+
+
+def load_catalog(path, overrides=None, check_images=True):
+    """
+    Load and validate an ad catalog.
+
+    Args:
+        path (str): Catalog file (.json, .yaml or .yml)
+        overrides (dict): Per-ad field overrides by ad name, e.g. {"ad1": {"price": "550"}}
+        check_images (bool): Require the photos to exist (off when photos are generated as variants)
+
+    Returns:
+        list: Ad dicts in posting order, each with 'name' and 'images'
+
+    Raises:
+        CatalogError: If the file can't be read or any ad is invalid
+    """
+    try:
+        data = read_catalog_file(path)
+    except (OSError, ValueError) as e:
+        if isinstance(e, CatalogError):
+            raise
+        raise CatalogError(path, [str(e)])
+
+    if not isinstance(data, dict) or not isinstance(data.get('ads'), list) or not data['ads']:
+        raise CatalogError(path, ["expected an object with a non-empty \"ads\" list"])
+
+    defaults = data.get('defaults') or {}
+    if not isinstance(defaults, dict):
+        raise CatalogError(path, ["\"defaults\" should be an object of ad fields"])
+
+    ads = []
+    problems = []
+    for index, entry in enumerate(data['ads'], 1):
+        if not isinstance(entry, dict):
+            problems.extend(f"ad #{index}: {problem}" for problem in validate_ad(entry))
+            continue
+        ad = dict(defaults)
+        ad.update(entry)
+        ad.setdefault('name', f'ad{index}')
+        ads.append(ad)
+
+    names = [ad['name'] for ad in ads]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        problems.append(f"duplicate ad names: {', '.join(duplicates)}")
+
+    unknown = sorted(set(overrides or {}) - set(names))
+    if unknown:
+        problems.append(f"overrides for unknown ads: {', '.join(unknown)}")
+
+    for ad in ads:
+        ad.update((overrides or {}).get(ad['name'], {}))
+        if 'images_dir' in ad and 'images' not in ad:
+            ad['images'] = list_images(ad['images_dir']) if os.path.isdir(ad['images_dir']) else []
+        # Not copied into a list - a string here is reported by validate_ad, not split into characters
+        ad.setdefault('images', [])
+        ad.setdefault('tags', [])
+        ad['price'] = str(ad.get('price', ''))
+        ad['phone'] = str(ad.get('phone', ''))
+        problems.extend(f"{ad['name']}: {problem}" for problem in validate_ad(ad, check_images))
+
+    if problems:
+        raise CatalogError(path, problems)
+    return ads
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__[__doc__.index('Usage:'):])
+        sys.exit(1)
+    try:
+        ads = load_catalog(sys.argv[1])
+    except CatalogError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ {sys.argv[1]}: {len(ads)} valid ads")
+    for ad in ads:
+        print(f"   {ad['name']:<8} ${ad['price']:<7} {len(ad['images'])} photos  {ad['title']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Posted Ad ID Capture for Kijiji Room Rental Automation
+Reads the new listing's ID when an ad is posted, so later runs can delete it without scanning My Ads
+
+The ID is taken from the first place it shows up:
+1. the publish response the checkout button triggers ({"adId": "..."} in its JSON)
+2. the confirmation page URL (".../p-post-ad-success?adId=...")
+3. the confirmation page itself (the element with data-testid="posted-ad-id")
+
+The posting engine stores it with the posted ad (state/posted_ads-<hash>.json).
+"""
+
+import asyncio
+import re
+from urllib.parse import urlparse, parse_qs
+
+# Substring of the URL of the request that publishes the ad (POST only)
+DEFAULT_PUBLISH_URL_PATTERN = 'publish'
+# Element on the confirmation page holding the new ad's ID
+POSTED_AD_ID_SELECTOR = '[data-testid="posted-ad-id"]'
+
+# Kijiji ad IDs are all digits
+AD_ID_PATTERN = re.compile(r'^\d{6,}$')
+
+
+def ad_id_from_payload(payload):
+    """Ad ID from a publish response body (adId / ad_id / id, top level or under "ad")"""
+    if not isinstance(payload, dict):
+        return None
+    for source in (payload, payload.get('ad'), payload.get('data')):
+        if isinstance(source, dict):
+            for key in ('adId', 'ad_id', 'id'):
+                value = str(source.get(key) or '').strip()
+                if AD_ID_PATTERN.match(value):
+                    return value
+    return None
+
+
+def ad_id_from_url(url):
+    """Ad ID from an adId/ad_id query parameter of a URL"""
+    query = parse_qs(urlparse(url).query)
+    for key in ('adId', 'ad_id'):
+        for value in query.get(key, []):
+            if AD_ID_PATTERN.match(value.strip()):
+                return value.strip()
+    return None
+
+
+class AdIdCapture:
+    """Follows one page's checkout and reports the ID of the ad it posted"""
+
+    def __init__(self, page, url_pattern=DEFAULT_PUBLISH_URL_PATTERN):
+        """
+        Create the capture BEFORE clicking the checkout button, so the publish response isn't missed.
+
+        Args:
+            page: Playwright page showing the checkout page
+            url_pattern (str): Substring of the publish request URL
+        """
+        self.page = page
+        self.url_pattern = url_pattern
+        self.from_response = None
+        self.pending = []
+        page.on('response', self._on_response)
+
+    def _on_response(self, response):
+        if self.url_pattern in response.url and response.request.method == 'POST' and response.ok:
+            self.pending.append(asyncio.ensure_future(self._read(response)))
+
+    async def _read(self, response):
+        try:
+            self.from_response = self.from_response or ad_id_from_payload(await response.json())
+        except Exception:
+            pass
+
+    def stop(self):
+        self.page.remove_listener('response', self._on_response)
+
+    async def ad_id(self):
+        """
+        The posted ad's ID - call once the confirmation page has loaded.
+
+        Returns:
+            str: Bare ad ID, or None if none of the three sources had one
+        """
+        self.stop()
+        if self.pending:
+            await asyncio.gather(*self.pending, return_exceptions=True)
+        if self.from_response:
+            return self.from_response
+
+        ad_id = ad_id_from_url(self.page.url)
+        if ad_id:
+            return ad_id
+
+        try:
+            element = self.page.locator(POSTED_AD_ID_SELECTOR).first
+            if await element.count():
+                text = (await element.inner_text()).strip()
+                if AD_ID_PATTERN.match(text):
+                    return text
+        except Exception:
+            pass
+        return None
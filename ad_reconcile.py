@@ -0,0 +1,195 @@
+"""
+Incremental Reconcile Mode for Kijiji Room Rental Automation
+Compares the catalog's ads with the live listings on My Ads and only reposts what needs it
+
+The default "replace" mode deletes every listing and reposts every ad, so each run costs
+as much as the catalog is big. In "reconcile" mode each wanted ad is matched to its live
+listing and only reposted when it is:
+- missing   - no live listing found for it
+- changed   - its content fingerprint differs from the one it was posted with
+- aged      - it was posted longer ago than bump_age_hours (reposting bumps it to the top)
+- untracked - a listing with its title is live, but this machine never recorded posting it
+
+Live listings that match no catalog ad are deleted. Everything else is left alone.
+
+The fingerprint and posting time of every posted ad are kept per account in
+state/posted_ads-<hash>.json (written by the posting engine after each ad goes up).
+
+Usage:
+  python ad_reconcile.py catalogs/dual.json   - Show each ad's fingerprint
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+
+# Ad fields that make up the listing's content (photos are hashed by file content)
+FINGERPRINT_FIELDS = ('title', 'description', 'price', 'tags', 'location', 'phone')
+
+SYNC_MODES = ('replace', 'reconcile')
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ad_fingerprint(ad):
+    """Short content hash of an ad - changes when any posted field or photo changes"""
+    content = {name: ad.get(name) for name in FINGERPRINT_FIELDS}
+    content['photos'] = [_file_digest(path) if os.path.isfile(path) else path
+                         for path in ad.get('images', [])]
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _normalise(text):
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+class PostedAdStore:
+    """
+    What was posted for one account: fingerprint, title, time and (when known) the ad ID.
+
+    Stored by catalog ad name, in a file named by a hash of the username
+    (like the session store), so email addresses never appear in file names.
+    """
+
+    def __init__(self, username, state_dir='state'):
+        """
+        Args:
+            username (str): Kijiji account the ads belong to
+            state_dir (str): Folder where the posted-ads file is kept
+        """
+        digest = hashlib.sha256(username.lower().encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(state_dir, f'posted_ads-{digest}.json')
+        self.ads = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.ads, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, name):
+        return self.ads.get(name)
+
+    def record(self, ad, ad_id=None):
+        """Remember that this catalog ad was just posted"""
+        self.ads[ad['name']] = {
+            'title': ad['title'],
+            'fingerprint': ad_fingerprint(ad),
+            'posted_at': time.time(),
+            'ad_id': ad_id,
+        }
+        self.save()
+
+    def ad_ids(self):
+        """Recorded ad ID of every ad posted with one, by catalog ad name"""
+        return {name: record['ad_id'] for name, record in self.ads.items() if record.get('ad_id')}
+
+    def forget(self, name):
+        if self.ads.pop(name, None) is not None:
+            self.save()
+
+
+@dataclass
+class ReconcilePlan:
+    """What a reconcile run will do"""
+    keep: list = field(default_factory=list)      # (ad, listing_id, age_hours)
+    post: list = field(default_factory=list)      # (ad, reason)
+    delete: list = field(default_factory=list)    # (listing_id, reason)
+
+    def print_plan(self):
+        for ad, listing_id, age_hours in self.keep:
+            print(f"   ✅ keep    {ad['name']:<8} {ad['title']} (posted {age_hours:.1f}h ago)")
+        for ad, reason in self.post:
+            print(f"   ♻️ post    {ad['name']:<8} {ad['title']} ({reason})")
+        for listing_id, reason in self.delete:
+            print(f"   🗑️ delete  {listing_id} ({reason})")
+
+
+def plan_reconcile(ads, live_listings, store, bump_age_hours=72, now=None):
+    """
+    Decide which ads to keep, which to (re)post and which live listings to delete.
+
+    Args:
+        ads (list): Catalog ads wanted on the account
+        live_listings (list): {'id': 'listing-id-...', 'text': '...'} per live listing on My Ads
+        store (PostedAdStore): Fingerprints and times the ads were last posted with
+        bump_age_hours (float): Repost ads older than this
+        now (float): Current time (for testing)
+
+    Returns:
+        ReconcilePlan
+    """
+    now = now or time.time()
+    plan = ReconcilePlan()
+    unclaimed = list(live_listings)
+
+    def claim(record, ad):
+        # Known ad ID first, then the title it was posted with, then its current title
+        if record and record.get('ad_id'):
+            for listing in unclaimed:
+                if listing['id'] == f"listing-id-{record['ad_id']}":
+                    return listing
+        titles = [_normalise(record['title'])] if record else []
+        titles.append(_normalise(ad['title']))
+        for title in titles:
+            for listing in unclaimed:
+                if title and title in _normalise(listing['text']):
+                    return listing
+        return None
+
+    for ad in ads:
+        record = store.get(ad['name'])
+        listing = claim(record, ad)
+        if listing is None:
+            plan.post.append((ad, 'missing'))
+            continue
+        unclaimed.remove(listing)
+
+        if record is None:
+            reason = 'untracked'
+        elif record['fingerprint'] != ad_fingerprint(ad):
+            reason = 'changed'
+        elif now - record['posted_at'] > bump_age_hours * 3600:
+            reason = f"aged {(now - record['posted_at']) / 3600:.0f}h"
+        else:
+            plan.keep.append((ad, listing['id'], (now - record['posted_at']) / 3600))
+            continue
+        plan.delete.append((listing['id'], f"{ad['name']} {reason}"))
+        plan.post.append((ad, reason))
+
+    for listing in unclaimed:
+        plan.delete.append((listing['id'], 'not in catalog'))
+    return plan
+
+
+def main():
+    from ad_catalog import load_catalog
+
+    if len(sys.argv) < 2:
+        print(__doc__[__doc__.index('Usage:'):])
+        sys.exit(1)
+    for ad in load_catalog(sys.argv[1]):
+        print(f"   {ad['name']:<8} {ad_fingerprint(ad)}  {ad['title']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Asyncio-Native Daily Scheduler for Kijiji Room Rental Automation
+Sleeps until the next due job instead of polling, and runs jobs as asyncio tasks
+
+Replaces the schedule + time.sleep(60) polling loop: jobs start on time instead of up
+to a minute late, a running job never blocks the loop, and independent jobs can run at
+the same time. Each job runs at one daily HH:MM slot, optionally shifted by random jitter.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# Longest single sleep - the wall clock is re-checked after each one, so the
+# scheduler stays on time even if the machine sleeps or the clock is adjusted
+MAX_SLEEP_SECONDS = 300
+
+
+@dataclass
+class DailyJob:
+    """A coroutine function run every day at `at` (HH:MM), plus up to `jitter_minutes` random delay"""
+    name: str
+    at: str
+    func: object
+    jitter_minutes: float = 0
+    slot: datetime = None
+    next_run: datetime = None
+
+
+class AsyncScheduler:
+    """
+    Runs daily jobs on one event loop.
+
+    Jobs with the same name never overlap: if a job is still running when
+    its next slot comes up, that slot is skipped. Jobs with different names
+    run concurrently.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.tasks = {}
+
+    def add_daily(self, name, at, func, jitter_minutes=0):
+        """
+        Schedule `func` (a coroutine function) every day at `at`.
+
+        Args:
+            name (str): Job name - runs of jobs sharing a name never overlap
+            at (str): Time of day as HH:MM
+            jitter_minutes (float): Random delay of 0..jitter_minutes added to each run
+        """
+        datetime.strptime(at, "%H:%M")  # Fail early on a bad time
+        job = DailyJob(name, at, func, jitter_minutes)
+        self._advance(job, datetime.now())
+        self.jobs.append(job)
+        return job
+
+    @staticmethod
+    def _advance(job, after):
+        """
+        Move the job to its first HH:MM slot strictly after `after`, then add fresh jitter.
+
+        Jitter is added on top of the slot rather than compared against it,
+        so a jittered run can never fire twice for the same day's slot.
+        """
+        hour, minute = map(int, job.at.split(':'))
+        slot = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if slot <= after:
+            slot += timedelta(days=1)
+        job.slot = slot
+        job.next_run = slot + timedelta(minutes=random.uniform(0, job.jitter_minutes))
+
+    def next_due(self):
+        """The job that runs next (or None if nothing is scheduled)"""
+        return min(self.jobs, key=lambda job: job.next_run, default=None)
+
+    def _start(self, job):
+        running = self.tasks.get(job.name)
+        if running and not running.done():
+            print(f"⏭️ Skipping {job.name} at {job.at} - previous run still in progress")
+            return
+        self.tasks[job.name] = asyncio.create_task(self._run_job(job))
+
+    async def _run_job(self, job):
+        try:
+            await job.func()
+        except Exception as e:
+            # A failed job must never take the scheduler down with it
+            print(f"❌ Job {job.name} ({job.at}) failed: {e}")
+
+    async def run_forever(self):
+        """Sleep until each job is due, start it as a task, repeat"""
+        try:
+            while True:
+                job = self.next_due()
+                if job is None:
+                    return
+                delay = (job.next_run - datetime.now()).total_seconds()
+                if delay > 0:
+                    await asyncio.sleep(min(delay, MAX_SLEEP_SECONDS))
+                    continue
+
+                self._start(job)
+                self._advance(job, job.slot)
+                upcoming = self.next_due()
+                print(f"🚀 Next run: {upcoming.next_run.strftime('%Y-%m-%d %H:%M:%S')} ({upcoming.at} slot)")
+        finally:
+            for task in self.tasks.values():
+                task.cancel()
@@ -0,0 +1,231 @@
+"""
+End-to-End Benchmark for Kijiji Room Rental Automation
+Runs the full login -> delete -> post flow against the local mock Kijiji site, many times
+
+Every run uses the real posting engine (dual, triple or any catalog), with its browser context
+served by mock_kijiji_server.route_context() instead of kijiji.ca. Each run reports
+its wall time and the bytes sent between the browser and the site; at the end the
+per-step timings from run_metrics are summarised as p50/p95 across all runs.
+
+Runs follow each other like real daily runs: every run deletes the ads the previous
+run posted. Screenshots, logs and a results JSON are kept under benchmark_runs/.
+
+Usage:
+  python benchmark.py [runs] [options]
+
+Options:
+  --strategy dual|triple   Catalog preset to post (default: dual)
+  --catalog FILE           Post the ads in this catalog instead (e.g. a generated 50-ad catalog)
+  --concurrent             Post the ads concurrently (concurrent_posting)
+  --fast-fill              Fill the plain form fields in one in-page script (fast_fill)
+  --reconcile              Only repost ads that are missing, changed or aged out (sync_mode: reconcile)
+  --warm                   Reuse one browser for every run instead of launching one per run
+  --fresh-login            Log in every run instead of reusing the saved session
+  --ui-delete              Delete old ads through the UI instead of the fast HTTP path
+  --listings N             Old ads on the account before the first run (default: 3)
+  --upload-delay S         Seconds the mock takes to process each photo upload (default: 0)
+  --replay FILE            Serve every run from a recorded HAR archive instead of the mock site
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from playwright.async_api import async_playwright
+
+from mock_kijiji_server import route_context, start_server
+from multi_account_runner import STRATEGIES
+from run_metrics import percentile
+
+USAGE = __doc__[__doc__.index('Usage:'):]
+
+
+def parse_args(argv):
+    """Parse the command line into a settings dict (exits with usage on bad input)"""
+    settings = {'runs': 5, 'strategy': 'dual', 'concurrent': False, 'fast_fill': False, 'reconcile': False,
+                'warm': False, 'fresh_login': False, 'ui_delete': False, 'listings': 3, 'upload_delay': 0.0,
+                'replay': None, 'catalog': None}
+    flags = {'--concurrent': 'concurrent', '--fast-fill': 'fast_fill', '--reconcile': 'reconcile',
+             '--warm': 'warm', '--fresh-login': 'fresh_login', '--ui-delete': 'ui_delete'}
+    values = {'--strategy': ('strategy', str), '--listings': ('listings', int),
+              '--upload-delay': ('upload_delay', float), '--replay': ('replay', str),
+              '--catalog': ('catalog', str)}
+    args = list(argv)
+    try:
+        while args:
+            arg = args.pop(0)
+            if arg in flags:
+                settings[flags[arg]] = True
+            elif arg in values:
+                key, convert = values[arg]
+                settings[key] = convert(args.pop(0))
+            elif arg.isdigit():
+                settings['runs'] = int(arg)
+            else:
+                raise ValueError(arg)
+    except (ValueError, IndexError):
+        print(USAGE)
+        sys.exit(1)
+    if settings['strategy'] not in STRATEGIES:
+        print(f"Unknown strategy '{settings['strategy']}' (expected one of: {', '.join(STRATEGIES)})")
+        sys.exit(1)
+    return settings
+
+
+def benchmark_class(base, site):
+    """Subclass a posting script so its browser context talks to the mock site"""
+    class Benchmarked(base):
+        async def setup_context(self, context):
+            # Registered first, so the traffic filter's routes fall back to it
+            if not self.har.replaying:
+                await route_context(context, site)
+            await super().setup_context(context)
+    return Benchmarked
+
+
+def build_config(settings, work_dir, base_url):
+    """Automation config for a benchmark run - everything written goes under work_dir"""
+    config = {
+        'username': 'benchmark@example.com',
+        'password': 'benchmark',
+        'headless': True,
+        'screenshot_dir': os.path.join(work_dir, 'screenshots'),
+        'session_dir': os.path.join(work_dir, 'sessions'),
+        'state_dir': os.path.join(work_dir, 'state'),
+        # Every benchmark run is timed end to end, never resumed from a failed one
+        'resume_runs': False,
+        # Back-to-back runs would soon be held to the posting rate - measure the flow itself
+        'rate_limiting': False,
+        'use_saved_session': not settings['fresh_login'],
+        'metrics_dir': os.path.join(work_dir, 'logs'),
+        'fast_delete': not settings['ui_delete'],
+        'delete_endpoint_file': os.path.join(work_dir, 'delete_endpoint.json'),
+        # The request client doesn't go through context routes, so it calls the mock's own port
+        'delete_endpoint': {'method': 'DELETE', 'url': f'{base_url}/api/ads/{{ad_id}}',
+                            'headers': {'Cookie': 'session=benchmark'}},
+        'concurrent_posting': settings['concurrent'],
+        'fast_fill': settings['fast_fill'],
+        'sync_mode': 'reconcile' if settings['reconcile'] else 'replace',
+        'check_duplicate_photos': False,
+        'har_mode': 'replay' if settings['replay'] else 'off',
+        'har_path': settings['replay'] or 'har/kijiji_run.zip',
+    }
+    if settings['catalog']:
+        config['catalog_file'] = settings['catalog']
+    return config
+
+
+async def run_benchmark(settings):
+    """Run the flow settings['runs'] times and return the per-run results"""
+    work_dir = os.path.join('benchmark_runs', datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(work_dir, exist_ok=True)
+
+    listings = {str(1000 + i): f'Old listing {i + 1}' for i in range(settings['listings'])}
+    server, base_url = start_server(port=0, listings=listings, upload_delay=settings['upload_delay'])
+    site = server.site
+    automation_class = benchmark_class(STRATEGIES[settings['strategy']], site)
+    config = build_config(settings, work_dir, base_url)
+
+    results = []
+    playwright = browser = None
+    try:
+        if settings['warm']:
+            playwright = await async_playwright().start()
+            browser = await automation_class(config=config).launch_browser(playwright)
+
+        for run in range(1, settings['runs'] + 1):
+            automation = automation_class(config=config)
+            site.reset_stats()
+            started = time.perf_counter()
+            error = None
+            try:
+                await automation.run_automation(browser)
+            except Exception as e:
+                error = str(e)
+            wall_time = time.perf_counter() - started
+
+            steps = [record for record in automation.metrics.load_history()
+                     if record['run_id'] == automation.metrics.run_id]
+            result = {'run': run, 'ok': error is None, 'error': error, 'wall_time': round(wall_time, 3),
+                      **site.stats(), 'listings_left': len(site.listings), 'steps': steps}
+            results.append(result)
+
+            status = "✅" if result['ok'] else f"❌ {error}"
+            traffic = '' if settings['replay'] else (
+                f"  {result['requests']} requests, {result['bytes_out'] / 1e6:.2f} MB down / "
+                f"{result['bytes_in'] / 1e6:.2f} MB up, {result['listings_left']} ads on the account")
+            print(f"\n🏁 Run {run}/{settings['runs']}: {wall_time:.2f}s {status}{traffic}\n")
+    finally:
+        if browser is not None:
+            await browser.close()
+        if playwright is not None:
+            await playwright.stop()
+        server.shutdown()
+
+    return work_dir, results
+
+
+def summarise(settings, results):
+    """Wall time, bytes and p50/p95 per step across all runs"""
+    wall_times = [r['wall_time'] for r in results]
+    step_times = {}
+    for result in results:
+        for record in result['steps']:
+            step_times.setdefault(record['step'], []).append(record['duration'])
+    return {
+        'settings': settings,
+        'runs': len(results),
+        'failed_runs': sum(1 for r in results if not r['ok']),
+        'wall_time': {'p50': percentile(wall_times, 0.5), 'p95': percentile(wall_times, 0.95),
+                      'mean': sum(wall_times) / len(wall_times)},
+        'bytes_per_run': {'down': sum(r['bytes_out'] for r in results) / len(results),
+                          'up': sum(r['bytes_in'] for r in results) / len(results)},
+        'requests_per_run': sum(r['requests'] for r in results) / len(results),
+        'steps': {step: {'p50': percentile(times, 0.5), 'p95': percentile(times, 0.95), 'count': len(times)}
+                  for step, times in sorted(step_times.items())},
+    }
+
+
+def print_summary(summary):
+    """Print the benchmark summary table"""
+    settings = summary['settings']
+    mode = 'concurrent' if settings['concurrent'] else 'sequential'
+    if settings['fast_fill']:
+        mode += ', fast-fill'
+    if settings['reconcile']:
+        mode += ', reconcile'
+    print("=" * 64)
+    source = f"replayed from {settings['replay']}" if settings['replay'] else 'mock site'
+    ads = settings['catalog'] or f"{settings['strategy']} strategy"
+    print(f"📊 Benchmark: {summary['runs']} runs, {ads}, {mode} posting"
+          f"{', warm browser' if settings['warm'] else ''} ({source})")
+    print("=" * 64)
+    wall = summary['wall_time']
+    print(f"   Wall time    p50 {wall['p50']:.2f}s   p95 {wall['p95']:.2f}s   mean {wall['mean']:.2f}s")
+    if not settings['replay']:
+        print(f"   Per run      {summary['requests_per_run']:.0f} requests, "
+              f"{summary['bytes_per_run']['down'] / 1e6:.2f} MB down / {summary['bytes_per_run']['up'] / 1e6:.2f} MB up")
+    if summary['failed_runs']:
+        print(f"   ❌ {summary['failed_runs']} runs failed")
+    print(f"\n   {'step':<36} {'p50':>8} {'p95':>8} {'count':>6}")
+    for step, s in summary['steps'].items():
+        print(f"   {step:<36} {s['p50']:>7.2f}s {s['p95']:>7.2f}s {s['count']:>6}")
+
+
+def main():
+    settings = parse_args(sys.argv[1:])
+    work_dir, results = asyncio.run(run_benchmark(settings))
+    summary = summarise(settings, results)
+    print_summary(summary)
+
+    results_file = os.path.join(work_dir, 'results.json')
+    with open(results_file, 'w') as f:
+        json.dump({'summary': summary, 'runs': results}, f, indent=2)
+    print(f"\n💾 Results saved to {results_file}")
+
+
+if __name__ == "__main__":
+    main()
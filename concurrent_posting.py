@@ -0,0 +1,68 @@
+"""
+Concurrent Ad Posting for Kijiji Room Rental Automation
+Runs post_ad for several ads at once, each on its own page of the logged-in context
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+KIJIJI_HOME = "https://www.kijiji.ca/"
+
+
+@dataclass
+class AdResult:
+    """Outcome of posting one ad"""
+    ad_number: int
+    title: str
+    ok: bool
+    elapsed: float
+    error: str = None
+    exception: Exception = None  # The error itself, so callers can tell kinds of failure apart
+
+
+async def post_ads_concurrently(automation, context, ads, concurrency=2):
+    """
+    Post several ads in parallel on separate pages of one browser context.
+
+    Pages opened from the same context share its cookies, so every page is
+    already logged in once the context is. Each ad gets its own page, so
+    screenshots, form state and failures stay separate per ad.
+
+    Args:
+        automation: KijijiPosting instance providing post_ad()
+        context: Logged-in Playwright browser context
+        ads (list): (ad_data, ad_number) pairs to post
+        concurrency (int): Maximum number of ads being posted at the same time
+
+    Returns:
+        list[AdResult]: One result per ad, in the same order as `ads`
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def post_one(ad_data, ad_number):
+        async with semaphore:
+            started = time.perf_counter()
+            page = await context.new_page()
+            try:
+                await page.goto(KIJIJI_HOME, wait_until='domcontentloaded')
+                await automation.post_ad(page, ad_data, ad_number)
+                return AdResult(ad_number, ad_data['title'], True, time.perf_counter() - started)
+            except Exception as e:
+                print(f"   ❌ Ad #{ad_number} failed: {e}")
+                try:
+                    await page.screenshot(path=f'{automation.screenshot_dir}/error-ad{ad_number}-{datetime.now().strftime("%H%M%S")}.png')
+                except Exception:
+                    pass
+                return AdResult(ad_number, ad_data['title'], False, time.perf_counter() - started, str(e), e)
+            finally:
+                await page.close()
+
+    print(f"⚡ Posting {len(ads)} ads concurrently (up to {concurrency} at a time)...")
+    started = time.perf_counter()
+    results = await asyncio.gather(*(post_one(ad_data, ad_number) for ad_data, ad_number in ads))
+
+    print(f"   ⏱️ All ads finished in {time.perf_counter() - started:.1f}s "
+          f"(sum of individual ads: {sum(r.elapsed for r in results):.1f}s)")
+    return list(results)
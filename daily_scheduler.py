@@ -1,19 +1,34 @@
 """
 Daily Scheduler for Kijiji Room Rental Automation
-Runs the dual posting automation every 24 hours
+Runs the posting automation for an ad catalog at one or more times every day
 """
 
 import asyncio
-import schedule
-import time
 import sys
-from datetime import datetime, timedelta
-from kijiji_dual_posting import KijijiDualPosting
+from datetime import datetime
+from async_scheduler import AsyncScheduler
+from kijiji_posting import KijijiPosting
+from step_retry import CircuitOpenError
+from warm_browser import WarmBrowser
 
 class DailyScheduler:
-    def __init__(self):
-        self.automation = KijijiDualPosting()
-        self.next_run = None
+    def __init__(self, catalog=None):
+        """
+        Args:
+            catalog (str): Ad catalog file to post (default: catalog_file from test_input.json)
+        """
+        self.automation = KijijiPosting(catalog=catalog)
+        self.scheduler = AsyncScheduler()
+        
+        # One event loop and one warm Chromium for the scheduler's whole lifetime -
+        # each job gets a fresh context instead of launching a new browser
+        self.loop = asyncio.new_event_loop()
+        self.browser = WarmBrowser(self.automation.launch_browser)
+        
+        # A failed run is rerun after a pause (it resumes from its journal) before
+        # waiting for the next scheduled time
+        self.rerun_attempts = self.automation.config.get('rerun_attempts', 2)
+        self.rerun_delay = self.automation.config.get('rerun_delay_minutes', 10) * 60
         
     async def run_daily_automation(self):
         """Run the daily automation job"""
@@ -21,97 +36,131 @@ class DailyScheduler:
         print(f"🕐 DAILY AUTOMATION STARTED - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*60}")
         
-        try:
-            await self.automation.run_automation()
-            print(f"\n✅ Daily automation completed successfully!")
-            
-            # Calculate next run time
-            self.next_run = datetime.now() + timedelta(hours=24)
-            print(f"⏰ Next run scheduled for: {self.next_run.strftime('%Y-%m-%d %H:%M:%S')}")
+        for rerun in range(self.rerun_attempts + 1):
+            try:
+                browser = await self.browser.get()
+                await self.automation.run_automation(browser=browser)
+                print(f"\n✅ Daily automation completed successfully!")
+                break
+                
+            except CircuitOpenError as e:
+                # The site keeps refusing - rerunning now would only add to the failures
+                print(f"\n🔌 Daily automation stopped: {e}")
+                print("Will retry at the next scheduled time")
+                break
+                
+            except Exception as e:
+                print(f"\n❌ Daily automation failed: {e}")
+                if rerun == self.rerun_attempts:
+                    print("Will retry at the next scheduled time")
+                    break
+                print(f"🔁 Rerunning in {self.rerun_delay / 60:.0f} minutes "
+                      f"(rerun {rerun + 1}/{self.rerun_attempts}, resuming from the journal)")
+                await asyncio.sleep(self.rerun_delay)
             
-        except Exception as e:
-            print(f"\n❌ Daily automation failed: {e}")
-            print("Will retry tomorrow at the same time")
+        # Show when the next run is due
+        upcoming = self.scheduler.next_due()
+        if upcoming:
+            print(f"⏰ Next run scheduled for: {upcoming.next_run.strftime('%Y-%m-%d %H:%M:%S')}")
             
         print(f"{'='*60}\n")
         
     def job_wrapper(self):
         """Wrapper to run async function in sync context"""
-        asyncio.run(self.run_daily_automation())
+        # Same loop every time - the warm browser belongs to it
+        self.loop.run_until_complete(self.run_daily_automation())
+        
+    def shutdown(self):
+        """Close the warm browser and the event loop"""
+        self.loop.run_until_complete(self.browser.stop())
+        self.loop.close()
         
-    def start_scheduler(self, run_time="09:00"):
-        """Start the daily scheduler"""
+    def start_scheduler(self, run_times=("09:00",), jitter_minutes=0):
+        """
+        Start the daily scheduler.
+        
+        Args:
+            run_times (list): Daily HH:MM slots to post at
+            jitter_minutes (float): Random delay of up to this many minutes added to each run
+        """
         print(f"🤖 Kijiji Daily Automation Scheduler")
         print(f"{'='*50}")
-        print(f"📅 Schedule: Every day at {run_time}")
-        print(f"🏠 Posting: 2 room rental ads")
+        print(f"📅 Schedule: Every day at {', '.join(run_times)}")
+        if jitter_minutes:
+            print(f"🎲 Jitter: up to {jitter_minutes} minutes after each time")
+        print(f"🏠 Posting: {len(self.automation.ads)} room rental ads from {self.automation.catalog_file}")
         print(f"📧 Account: {self.automation.username}")
         print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
-        # Calculate next run
-        now = datetime.now()
-        next_run = datetime.strptime(f"{now.date()} {run_time}", "%Y-%m-%d %H:%M")
-        if next_run <= now:
-            next_run += timedelta(days=1)
-        self.next_run = next_run
+        # All slots post for the same account, so they share one job name
+        # and a slot is skipped if the previous run is still going
+        for run_time in run_times:
+            self.scheduler.add_daily('daily-posting', run_time, self.run_daily_automation, jitter_minutes)
         
-        print(f"🚀 Next run: {self.next_run.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🚀 Next run: {self.scheduler.next_due().next_run.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*50}\n")
         
-        # Schedule the job
-        schedule.every().day.at(run_time).do(self.job_wrapper)
-        
-        # Keep the scheduler running
+        # Sleep until each run is due - runs execute as tasks on the scheduler's loop
         try:
-            while True:
-                schedule.run_pending()
-                
-                # Show countdown every minute
-                now = datetime.now()
-                if self.next_run:
-                    time_until = self.next_run - now
-                    if time_until.total_seconds() > 0:
-                        hours = int(time_until.total_seconds() // 3600)
-                        minutes = int((time_until.total_seconds() % 3600) // 60)
-                        print(f"⏳ Time until next run: {hours}h {minutes}m", end='\r')
-                
-                time.sleep(60)  # Check every minute
+            self.loop.run_until_complete(self.scheduler.run_forever())
                 
         except KeyboardInterrupt:
             print(f"\n\n🛑 Scheduler stopped by user")
             print(f"📊 Last successful run: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             
+        finally:
+            self.shutdown()
+            
     def run_once_now(self):
         """Run the automation once immediately (for testing)"""
         print("🧪 Running automation once for testing...")
-        asyncio.run(self.run_daily_automation())
+        try:
+            self.job_wrapper()
+        finally:
+            self.shutdown()
 
 def main():
-    scheduler = DailyScheduler()
+    # Optional --catalog FILE anywhere on the command line picks the ads to post
+    argv = sys.argv[1:]
+    catalog = None
+    if "--catalog" in argv:
+        index = argv.index("--catalog")
+        catalog = argv[index + 1]
+        del argv[index:index + 2]
     
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    if argv:
+        scheduler = DailyScheduler(catalog)
+        command = argv[0].lower()
         
         if command == "test":
             # Run once for testing
             scheduler.run_once_now()
             
         elif command == "schedule":
-            # Start daily scheduling
-            run_time = sys.argv[2] if len(sys.argv) > 2 else "09:00"
-            scheduler.start_scheduler(run_time)
+            # Start daily scheduling: one or more HH:MM slots, optional --jitter MINUTES
+            args = argv[1:]
+            jitter_minutes = 0
+            if "--jitter" in args:
+                index = args.index("--jitter")
+                jitter_minutes = float(args[index + 1])
+                del args[index:index + 2]
+            scheduler.start_scheduler(args or ["09:00"], jitter_minutes)
             
         else:
             print("Usage:")
             print("  python daily_scheduler.py test              - Run once now")
-            print("  python daily_scheduler.py schedule [HH:MM]  - Start daily scheduler")
+            print("  python daily_scheduler.py schedule [HH:MM ...] [--jitter MIN]  - Start daily scheduler")
             print("  Example: python daily_scheduler.py schedule 09:00")
+            print("  Example: python daily_scheduler.py schedule 09:00 17:30 --jitter 15")
+            print("  Add --catalog FILE to post a different ad catalog (e.g. catalogs/triple.json)")
     else:
         print("🤖 Kijiji Daily Automation Scheduler")
         print("Usage:")
         print("  python daily_scheduler.py test              - Run once now")
-        print("  python daily_scheduler.py schedule [HH:MM]  - Start daily scheduler")
+        print("  python daily_scheduler.py schedule [HH:MM ...] [--jitter MIN]  - Start daily scheduler")
         print("  Example: python daily_scheduler.py schedule 09:00")
+        print("  Example: python daily_scheduler.py schedule 09:00 17:30 --jitter 15")
+        print("  Add --catalog FILE to post a different ad catalog (e.g. catalogs/triple.json)")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,299 @@
+"""
+Fast Ad Deletion for Kijiji Room Rental Automation
+Deletes listings by calling the same backend request the My Ads page sends,
+through the logged-in context's request client, instead of clicking through modals
+
+The delete request is learned automatically: the first time an ad is deleted
+through the UI, the request the page fires is recorded as a template (with the
+ad ID replaced by {ad_id}) and saved. Later runs replay that template directly.
+
+Only a request that looks like the deletion is learned - sent to the site itself
+(not a tracking host), a DELETE or mentioning "delete", answered with a 2xx and no
+"errors" - and only once a fresh look at My Ads shows the listing really gone, so
+an analytics beacon carrying the ad ID is never mistaken for it. The template is
+marked verified after the first batch it deletes is confirmed gone from My Ads;
+the posting engine only deletes by recorded ID, without looking, with a verified one.
+
+The template file can hold request tokens, so it is only readable by its owner.
+
+Usage (check against the local stub server):
+  python fast_delete.py stub
+"""
+
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+# Headers that belong to a single request/connection, or carry credentials, and must not
+# be saved - the logged-in context's request client sends its own cookies
+SKIP_HEADERS = {'cookie', 'content-length', 'host', 'connection', 'accept-encoding',
+                'authorization', 'proxy-authorization'}
+
+
+def _site(url):
+    """Last two labels of a URL's host ("www.kijiji.ca" -> "kijiji.ca")"""
+    return '.'.join((urlparse(url).hostname or '').split('.')[-2:])
+
+
+async def response_confirms(response):
+    """
+    True if a delete response reports success: a 2xx status and, for JSON
+    (e.g. GraphQL) responses, no "errors" field.
+    """
+    if response is None or not response.ok:
+        return False
+    try:
+        payload = await response.json()
+    except Exception:
+        return True
+    return not (isinstance(payload, dict) and payload.get('errors'))
+
+
+def listing_to_ad_id(listing_id):
+    """Convert a My Ads test ID ("listing-id-1234567890") into the bare ad ID"""
+    return listing_id.replace('listing-id-', '', 1)
+
+
+class FastAdDeleter:
+    """
+    Deletes ads over HTTP using a learned (or configured) request template.
+
+    Requests go through context.request, which shares the browser context's
+    cookies and keeps connections alive between calls, so deletions need no
+    extra login and no page rendering.
+    """
+
+    def __init__(self, endpoint_file='delete_endpoint.json', concurrency=4, endpoint=None, throttle=None):
+        """
+        Args:
+            endpoint_file (str): Where the learned delete request template is saved
+            concurrency (int): Maximum deletions in flight at once
+            endpoint (dict): Explicit template {"method", "url", "headers", "body"} - overrides the learned one
+            throttle: Coroutine function awaited before each delete request (e.g. a rate limiter)
+        """
+        self.endpoint_file = endpoint_file
+        self.concurrency = max(1, concurrency)
+        self.throttle = throttle
+        self.endpoint = endpoint or self._load_endpoint()
+
+    def _load_endpoint(self):
+        if not os.path.exists(self.endpoint_file):
+            return None
+        try:
+            with open(self.endpoint_file, 'r') as f:
+                endpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # A saved template is only trusted without looking once its deletions were seen to work
+        endpoint.setdefault('verified', False)
+        return endpoint
+
+    def has_endpoint(self):
+        """True once a delete request template is known"""
+        return bool(self.endpoint)
+
+    def is_verified(self):
+        """True if the template was configured, or its deletions were seen to take effect"""
+        return bool(self.endpoint) and self.endpoint.get('verified', True)
+
+    def mark_verified(self):
+        """Record that a batch deleted with the template is gone from My Ads"""
+        if self.endpoint and not self.endpoint.get('verified', True):
+            self.endpoint['verified'] = True
+            self._write_endpoint()
+
+    def forget_endpoint(self):
+        """Drop a template that no longer works (e.g. Kijiji changed its API) so it's re-learned"""
+        self.endpoint = None
+        try:
+            os.remove(self.endpoint_file)
+        except FileNotFoundError:
+            pass
+
+    # =================================================================
+    # LEARNING THE ENDPOINT FROM A UI DELETION
+    # =================================================================
+
+    def learn(self, page, ad_id):
+        """
+        Context manager that records the delete request fired during a UI deletion.
+
+            recorder = deleter.learn(page, ad_id)
+            with recorder:
+                ... click delete -> "Prefer not to say" -> "Delete My Ad" ...
+            if recorder.learning:
+                await recorder.commit(listing_gone=...)   # after re-checking My Ads
+
+        Does nothing if a template is already known.
+        """
+        return _EndpointRecorder(self, page, ad_id)
+
+    def _save_template(self, request, ad_id):
+        body = request.post_data or None
+        template = {
+            'method': request.method,
+            'url': request.url.replace(ad_id, '{ad_id}'),
+            'headers': {k: v for k, v in request.headers.items()
+                        if k.lower() not in SKIP_HEADERS and not k.startswith(':')},
+            'body': body.replace(ad_id, '{ad_id}') if body else None,
+            # Until a batch deleted with it is confirmed gone from My Ads
+            'verified': False,
+        }
+        self.endpoint = template
+        self._write_endpoint()
+        print(f"   💾 Learned delete endpoint: {template['method']} {template['url']}")
+
+    def _write_endpoint(self):
+        # The template can hold request tokens - only the owner may read it
+        tmp_path = f'{self.endpoint_file}.{os.getpid()}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.endpoint, f, indent=2)
+        os.replace(tmp_path, self.endpoint_file)
+
+    # =================================================================
+    # DIRECT DELETION
+    # =================================================================
+
+    async def delete_one(self, request_client, ad_id):
+        """
+        Delete a single ad with the template. Returns True if the response reports success
+        (see response_confirms) - the caller checks My Ads to be sure the ad is gone.
+        """
+        template = self.endpoint
+        body = template.get('body')
+        response = await request_client.fetch(
+            template['url'].replace('{ad_id}', ad_id),
+            method=template['method'],
+            headers=template.get('headers') or {},
+            data=body.replace('{ad_id}', ad_id) if body else None,
+        )
+        return await response_confirms(response)
+
+    async def delete_all(self, request_client, ad_ids):
+        """
+        Delete many ads in parallel.
+
+        Args:
+            request_client: Playwright APIRequestContext - normally page.context.request
+            ad_ids (list): Bare ad IDs to delete
+
+        Returns:
+            tuple: (deleted_ids, failed_ids)
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+
+        async def delete(ad_id):
+            async with semaphore:
+                try:
+                    if self.throttle is not None:
+                        await self.throttle()
+                    return ad_id, await self.delete_one(request_client, ad_id)
+                except Exception as e:
+                    print(f"   ⚠️ Direct delete failed for {ad_id}: {e}")
+                    return ad_id, False
+
+        results = await asyncio.gather(*(delete(ad_id) for ad_id in ad_ids))
+        deleted = [ad_id for ad_id, ok in results if ok]
+        failed = [ad_id for ad_id, ok in results if not ok]
+
+        print(f"   ⚡ Direct delete: {len(deleted)} deleted, {len(failed)} failed "
+              f"in {time.perf_counter() - started:.2f}s")
+        return deleted, failed
+
+
+class _EndpointRecorder:
+    """Listens for the page's delete request while a UI deletion runs"""
+
+    def __init__(self, deleter, page, ad_id):
+        self.deleter = deleter
+        self.page = page
+        self.ad_id = ad_id
+        self.learning = False
+        self.pending = []
+        self.confirmed = []
+
+    def _looks_like_delete(self, request):
+        """A non-GET xhr/fetch to the site itself that carries the ad ID and says it deletes"""
+        if request.method == 'GET' or request.resource_type not in ('xhr', 'fetch'):
+            return False
+        if _site(request.url) != _site(self.page.url):
+            return False  # Analytics/tracking hosts
+        body = request.post_data or ''
+        if self.ad_id not in request.url and self.ad_id not in body:
+            return False
+        return request.method == 'DELETE' or 'delete' in f'{request.url} {body}'.lower()
+
+    def _on_finished(self, request):
+        if self._looks_like_delete(request):
+            self.pending.append(asyncio.ensure_future(self._check(request)))
+
+    async def _check(self, request):
+        try:
+            if await response_confirms(await request.response()):
+                self.confirmed.append(request)
+        except Exception:
+            pass
+
+    def __enter__(self):
+        self.learning = not self.deleter.has_endpoint()
+        if self.learning:
+            self.page.on('requestfinished', self._on_finished)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.learning:
+            self.page.remove_listener('requestfinished', self._on_finished)
+            self.learning = exc_type is None
+        return False
+
+    async def commit(self, listing_gone):
+        """
+        Save the delete request once My Ads shows the listing gone.
+
+        Args:
+            listing_gone (bool): A fresh look at My Ads no longer shows the listing
+
+        Returns:
+            bool: True if a template was learned
+        """
+        if self.pending:
+            await asyncio.gather(*self.pending, return_exceptions=True)
+        if not (self.learning and listing_gone and self.confirmed):
+            return False
+        self.deleter._save_template(self.confirmed[0], self.ad_id)
+        return True
+
+
+async def _check_against_stub():
+    """Delete a handful of ads on the local stub server and confirm they're gone"""
+    from playwright.async_api import async_playwright
+    from mock_kijiji_server import start_server
+
+    server, base_url = start_server(port=0, listings=['1001', '1002', '1003', '1004', '1005'])
+    deleter = FastAdDeleter(endpoint={'method': 'DELETE', 'url': f'{base_url}/api/ads/{{ad_id}}'},
+                            concurrency=3)
+    try:
+        async with async_playwright() as p:
+            client = await p.request.new_context(extra_http_headers={'Cookie': 'session=stub'})
+            deleted, failed = await deleter.delete_all(client, ['1001', '1002', '1003', '1004', '9999'])
+            remaining = server.listings.copy()
+            await client.dispose()
+    finally:
+        server.shutdown()
+
+    print(f"Deleted: {deleted}")
+    print(f"Failed (expected ['9999']): {failed}")
+    print(f"Left on server (expected ['1005']): {sorted(remaining)}")
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == 'stub':
+        asyncio.run(_check_against_stub())
+    else:
+        print("Usage:")
+        print("  python fast_delete.py stub   - Run a direct-delete check against the local stub server")
@@ -0,0 +1,146 @@
+"""
+Fast Form Filling for Kijiji Room Rental Automation
+Sets every plain ad form field in ONE page.evaluate() call instead of a click/fill per field
+
+The normal fill_ad_form path sends separate browser commands for each radio option,
+the description, every tag (click, fill and Add, five times over), the price and the
+phone number, and waits for the page to settle after each. The script below does the
+same work inside the page in a single round-trip. Values are written through the
+native value setter and followed by input/change/blur events, so React-style forms
+see them exactly as if they were typed.
+
+Widgets that need real interaction (location autocomplete, the file input) are left
+to the normal path. The script finds every field before touching any of them - if
+one is missing nothing is changed, and the caller falls back to filling field by field.
+
+Fields are found through the selector registry's candidates, in the order the registry
+would try them, so selector overrides in test_input.json and the learned "fastest
+candidate first" order apply here too. The script understands the subset of
+Playwright selector syntax the registry uses: plain CSS, role=textbox/button[name="..."],
+:has-text("...") and a trailing ">> nth=N". Other candidates are skipped.
+"""
+
+# Form field -> selector registry element
+FIELD_ELEMENTS = {
+    'furnished': 'furnished_yes',
+    'roomOption': 'room_option',
+    'description': 'description',
+    'tags': 'tags_input',
+    'addTag': 'add_tag_button',
+    'price': 'price',
+    'phone': 'phone',
+}
+
+# Runs in the page. Receives {description, tags, price, phone, maxTags, selectors}
+# (selectors: candidate list per field); returns {ok, missing, filled}
+FAST_FILL_SCRIPT = """
+async (ad) => {
+    const normalize = (text) => text.replace(/\\s+/g, ' ').trim();
+    const labelled = (text) => [...document.querySelectorAll('label')]
+        .filter(l => l.textContent.trim().startsWith(text) && l.control)
+        .map(l => l.control);
+    const buttonsNamed = (scope, text) =>
+        [...scope.querySelectorAll('button')].filter(b => b.textContent.trim() === text);
+    const css = (scope, selector) =>
+        [...scope.querySelectorAll(scope === document ? selector : ':scope ' + selector)];
+
+    // Every element a candidate selector matches within scope
+    const findAll = (selector, scope) => {
+        const nth = selector.match(/^(.*?)\\s*>>\\s*nth=(\\d+)$/);
+        if (nth) {
+            const found = findAll(nth[1], scope)[Number(nth[2])];
+            return found ? [found] : [];
+        }
+        const role = selector.match(/^role=(\\w+)\\[name="(.*)"\\]$/);
+        if (role) {
+            if (role[1] === 'textbox') return labelled(role[2]);
+            if (role[1] === 'button') return buttonsNamed(scope, role[2]);
+            return [];
+        }
+        const hasText = selector.match(/^(.*?):has-text\\("(.*?)"\\)(.*)$/);
+        if (hasText) {
+            const [, base, text, rest] = hasText;
+            const holders = css(scope, base || '*').filter(e => normalize(e.textContent).includes(text));
+            return rest.trim() ? holders.flatMap(holder => findAll(rest.trim(), holder)) : holders;
+        }
+        return css(scope, selector);
+    };
+    // First element matched by the field's candidates, tried in the registry's order
+    const find = (name, scope) => {
+        for (const selector of ad.selectors[name]) {
+            try {
+                const found = findAll(selector, scope || document);
+                if (found.length) return found[0];
+            } catch (error) {
+                // Not something this script can evaluate (text=, invalid CSS) - next candidate
+            }
+        }
+        return null;
+    };
+
+    const tagsInput = find('tags');
+    const tagsSection = tagsInput ? tagsInput.closest('li, fieldset, form') : null;
+    const fields = {
+        furnished: find('furnished'),
+        roomOption: find('roomOption'),
+        description: find('description'),
+        tags: tagsInput,
+        // The Add button next to the tags box, not any other "Add" on the page
+        addTag: tagsInput ? (tagsSection && find('addTag', tagsSection)) || find('addTag') : null,
+        price: find('price'),
+        phone: find('phone'),
+    };
+    const missing = Object.keys(fields).filter(name => !fields[name]);
+    if (missing.length) {
+        return {ok: false, missing, filled: []};
+    }
+
+    // Write through the prototype's setter so framework value tracking notices the change
+    const setValue = (element, value) => {
+        const prototype = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        element.focus();
+        Object.getOwnPropertyDescriptor(prototype, 'value').set.call(element, value);
+        element.dispatchEvent(new Event('input', {bubbles: true}));
+        element.dispatchEvent(new Event('change', {bubbles: true}));
+        element.blur();
+    };
+    // Let the framework re-render between dependent steps (e.g. tag input -> Add)
+    const tick = () => new Promise(resolve => setTimeout(resolve, 0));
+
+    fields.furnished.click();
+    fields.roomOption.click();
+    setValue(fields.description, ad.description);
+    for (const tag of ad.tags.slice(0, ad.maxTags)) {
+        setValue(fields.tags, tag);
+        await tick();
+        fields.addTag.click();
+        await tick();
+    }
+    setValue(fields.price, ad.price);
+    setValue(fields.phone, ad.phone);
+    return {ok: true, missing: [], filled: ['furnished', 'roomOption', 'description', 'tags', 'price', 'phone']};
+}
+"""
+
+
+async def fill_form_fields(page, ad_data, registry, max_tags=5):
+    """
+    Fill the radio options, description, tags, price and phone in one page.evaluate().
+
+    Args:
+        page: Playwright page showing the ad form
+        ad_data (dict): Ad with 'description', 'tags', 'price' and 'phone'
+        registry (SelectorRegistry): Supplies each field's candidate selectors, best first
+        max_tags (int): Kijiji's tag limit
+
+    Returns:
+        dict: {'ok': bool, 'missing': [fields not found], 'filled': [fields set]}
+    """
+    return await page.evaluate(FAST_FILL_SCRIPT, {
+        'description': ad_data['description'],
+        'tags': list(ad_data['tags']),
+        'price': str(ad_data['price']),
+        'phone': str(ad_data['phone']),
+        'maxTags': max_tags,
+        'selectors': {field: registry.candidates(element) for field, element in FIELD_ELEMENTS.items()},
+    })
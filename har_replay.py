@@ -0,0 +1,92 @@
+"""
+HAR Record/Replay for Kijiji Room Rental Automation
+Captures a live run's Kijiji traffic to a HAR archive and replays whole runs from it offline
+
+record - The run goes to the real site as usual. Every kijiji.ca request and response
+         is saved to the archive when the browser context closes, together with the
+         login session the run started from.
+replay - The run is served entirely from the archive through the context's routing.
+         Nothing leaves the machine, and requests missing from the archive are aborted.
+         Login, deletion and posting replay in seconds, so a selector or timing change
+         can be checked (and timed against other code versions) without a live run.
+
+Both modes delete old ads through the UI: fast_delete.py's request client bypasses
+context routing, so its calls could be neither recorded nor replayed.
+
+The archive holds the account's password (login form post) and session cookies -
+it is written owner-readable only and should never be committed.
+"""
+
+import json
+import os
+import re
+
+HAR_MODES = ('off', 'record', 'replay')
+
+# Only Kijiji's own traffic goes into the archive (third-party requests are blocked anyway)
+KIJIJI_URL_PATTERN = re.compile(r'^https://([a-z0-9-]+\.)*kijiji\.ca/')
+
+
+class HarArchive:
+    """Record or replay one run's traffic through a HAR file"""
+
+    def __init__(self, mode='off', har_path='har/kijiji_run.zip'):
+        """
+        Args:
+            mode (str): 'off', 'record' or 'replay'
+            har_path (str): Archive file - .zip stores bodies as separate entries (smaller, faster to load)
+        """
+        if mode not in HAR_MODES:
+            raise ValueError(f"Unknown HAR mode '{mode}' (expected one of: {', '.join(HAR_MODES)})")
+        self.mode = mode
+        self.har_path = har_path
+        self.state_path = f'{har_path}.state.json'
+
+    @property
+    def recording(self):
+        return self.mode == 'record'
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    def context_options(self):
+        """Extra browser.new_context() arguments (HAR capture in record mode)"""
+        if not self.recording:
+            return {}
+        os.makedirs(os.path.dirname(self.har_path) or '.', exist_ok=True)
+        return {
+            'record_har_path': self.har_path,
+            'record_har_content': 'attach' if self.har_path.endswith('.zip') else 'embed',
+            'record_har_url_filter': KIJIJI_URL_PATTERN,
+        }
+
+    async def attach(self, context):
+        """Serve the context from the archive (replay mode only)"""
+        if not self.replaying:
+            return
+        if not os.path.exists(self.har_path):
+            raise FileNotFoundError(f"No HAR archive at {self.har_path} - record one first (har_mode: record)")
+        await context.route_from_har(self.har_path, not_found='abort')
+        print(f"📼 Replaying run from {self.har_path}")
+
+    def save_state(self, storage_state):
+        """Remember the login session the recorded run started from (None = it logged in)"""
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        fd = os.open(self.state_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'state': storage_state}, f)
+
+    def load_state(self):
+        """The session the recorded run started from, so the replay takes the same path"""
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f).get('state')
+        except (OSError, ValueError):
+            return None
+
+    def finish(self):
+        """Call after the context has closed - Playwright writes the archive on close"""
+        if self.recording and os.path.exists(self.har_path):
+            os.chmod(self.har_path, 0o600)
+            print(f"📼 Run recorded to {self.har_path} ({os.path.getsize(self.har_path) / 1e6:.1f} MB)")
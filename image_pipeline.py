@@ -0,0 +1,130 @@
+"""
+Image Preprocessing Pipeline for Kijiji Room Rental Automation
+Downscales and recompresses ad photos before upload, caching results by content hash
+
+Kijiji never shows photos larger than its gallery size, so uploading multi-megabyte
+PNGs only slows the upload down. Each photo is resized, converted to a well-compressed
+JPEG with all metadata removed, and stored in the cache under the hash of the source
+file's bytes - so every photo is processed once and later runs upload the cached copy.
+
+Usage:
+  python image_pipeline.py images/ad1 images/ad2   - Preprocess folders and show savings
+"""
+
+import hashlib
+import os
+import sys
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow missing - uploads fall back to the original files
+    Image = None
+
+
+class ImagePreprocessor:
+    """
+    Resizes/recompresses images into a content-addressed cache.
+
+    Cache file names include the processing settings, so changing the size or
+    quality produces new files instead of reusing ones made with old settings.
+    """
+
+    def __init__(self, cache_dir='.image_cache', max_dimension=1600, quality=85):
+        """
+        Args:
+            cache_dir (str): Folder for processed images
+            max_dimension (int): Longest side in pixels after resizing
+            quality (int): JPEG quality (1-95)
+        """
+        self.cache_dir = cache_dir
+        self.max_dimension = max_dimension
+        self.quality = quality
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def content_hash(path):
+        """SHA-256 of the file's bytes"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def cache_path(self, path):
+        """Where the processed copy of this image lives"""
+        digest = self.content_hash(path)[:24]
+        return os.path.join(self.cache_dir, f'{digest}-{self.max_dimension}q{self.quality}.jpg')
+
+    def process(self, path):
+        """Return the path to upload for one image, processing it on a cache miss"""
+        cached = self.cache_path(path)
+        if os.path.exists(cached):
+            return cached
+
+        with Image.open(path) as image:
+            # Apply the camera's rotation before EXIF is dropped, or photos upload sideways
+            image = ImageOps.exif_transpose(image)
+            if image.mode != 'RGB':
+                # JPEG has no transparency - flatten onto white
+                rgba = image.convert('RGBA')
+                image = Image.new('RGB', rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.split()[-1])
+            image.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+
+            # Per-process temp name - multi_account_runner workers may process the same photo at once
+            tmp_path = f'{cached}.{os.getpid()}.tmp'
+            # No exif/icc arguments - the saved JPEG carries no metadata
+            image.save(tmp_path, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+
+        # Always upload the processed copy, even when it isn't smaller -
+        # originals can carry GPS coordinates and other EXIF data
+        os.replace(tmp_path, cached)
+        return cached
+
+    def prepare(self, image_files, label='ad'):
+        """
+        Process a set of images for upload and report the bytes saved.
+
+        Args:
+            image_files (list): Paths of existing source images
+            label (str): Name used in the printed report
+
+        Returns:
+            list: Paths to upload, in the same order as image_files
+        """
+        if Image is None:
+            print("   ⚠️ Pillow not installed - uploading original images (pip install Pillow)")
+            return list(image_files)
+
+        upload_files = []
+        original_bytes = 0
+        upload_bytes = 0
+        for path in image_files:
+            try:
+                prepared = self.process(path)
+            except Exception as e:
+                print(f"   ⚠️ Could not preprocess {path}: {e}")
+                prepared = path
+            upload_files.append(prepared)
+            original_bytes += os.path.getsize(path)
+            upload_bytes += os.path.getsize(prepared)
+
+        saved = original_bytes - upload_bytes
+        print(f"   📦 {label}: {len(upload_files)} images, {original_bytes / 1e6:.1f} MB → "
+              f"{upload_bytes / 1e6:.1f} MB (saved {saved / 1e6:.1f} MB)")
+        return upload_files
+
+
+def main():
+    folders = sys.argv[1:] or ['images/ad1', 'images/ad2', 'images/ad3']
+    preprocessor = ImagePreprocessor()
+    for folder in folders:
+        if not os.path.isdir(folder):
+            continue
+        files = sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                       if name.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')))
+        preprocessor.prepare(files, folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Background Photo Upload Tracking for Kijiji Room Rental Automation
+Lets the photo upload run while the rest of the ad form is filled, then confirms every photo arrived
+
+set_input_files() only hands the photos to the page - the page then uploads them in
+the background. UploadWatcher starts listening before the files are set and follows
+each upload request (POST/PUT to a URL containing the upload pattern), so the form can
+carry on (location, price, phone) and the upload is only waited for right before the
+package is selected.
+
+Each finished upload is matched to the photo whose file size is closest to the request
+body, which gives a per-photo latency and size report. The wait returns as soon as all
+photos are confirmed - by their upload responses, or by one rendered thumbnail each.
+The timeout grows with the total size being uploaded. Photos whose upload failed (or
+never started) are sent again; if some are still missing after the retries, the wait
+raises UploadIncomplete so the ad fails instead of being posted without its photos.
+
+The URL pattern and thumbnail selector default to what the local mock site uses. If
+neither signal shows up at all - no upload request and no thumbnail - the page uploads
+some other way, so nothing can be confirmed: the wait warns, falls back to a fixed
+pause (fallback_wait) and lets the ad carry on, rather than re-sending photos that
+may well have arrived and failing every ad.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+
+# Substring of the upload request URL (POST/PUT requests only)
+DEFAULT_UPLOAD_URL_PATTERN = 'upload'
+# One element per uploaded photo in the form's photo strip
+DEFAULT_THUMBNAIL_SELECTOR = '[data-testid="image-thumbnail"]'
+
+
+class UploadIncomplete(Exception):
+    """Some photos didn't finish uploading within the timeout (and retries)"""
+
+
+@dataclass
+class ImageUpload:
+    """One finished upload request"""
+    file: str
+    size: int
+    latency: float
+    ok: bool
+
+
+class UploadWatcher:
+    """Follows one page's photo upload requests"""
+
+    def __init__(self, page, files, url_pattern=DEFAULT_UPLOAD_URL_PATTERN,
+                 thumbnail_selector=DEFAULT_THUMBNAIL_SELECTOR, base_timeout=10000, seconds_per_mb=10,
+                 fallback_wait=5000):
+        """
+        Create the watcher BEFORE calling set_input_files, so no request is missed.
+
+        Args:
+            page: Playwright page showing the ad form
+            files (list): Photo paths being uploaded
+            url_pattern (str): Substring of the upload request URL
+            thumbnail_selector (str): CSS selector matching one element per uploaded photo
+            base_timeout (int): Milliseconds allowed for an upload regardless of size
+            seconds_per_mb (float): Extra seconds allowed per MB (10 s/MB ~ a 0.8 Mbps uplink)
+            fallback_wait (int): Milliseconds after the photos were set to wait when no upload
+                                 request or thumbnail is ever seen (upload tracking unavailable)
+        """
+        self.page = page
+        self.files = list(files)
+        self.sizes = {path: os.path.getsize(path) for path in self.files}
+        self.url_pattern = url_pattern
+        self.thumbnail_selector = thumbnail_selector
+        self.base_timeout = base_timeout
+        self.seconds_per_mb = seconds_per_mb
+        self.fallback_wait = fallback_wait
+
+        self.started = time.perf_counter()
+        self.finished = None
+        self.in_flight = {}
+        self.uploads = []
+        self.answered = 0
+        self.confirmed = set()
+        self.retried = []
+        # Whether either completion signal has shown up at all
+        self.requests_seen = 0
+        self.thumbnails_seen = 0
+
+        page.on('request', self._on_request)
+        page.on('requestfinished', self._on_finished)
+        page.on('requestfailed', self._on_failed)
+
+    # =================================================================
+    # REQUEST TRACKING
+    # =================================================================
+
+    def _is_upload(self, request):
+        return request.method in ('POST', 'PUT') and self.url_pattern in request.url
+
+    def _on_request(self, request):
+        if self._is_upload(request):
+            self.requests_seen += 1
+            self.in_flight[request] = time.perf_counter()
+
+    def _match_file(self, body_size):
+        """The unconfirmed photo closest in size to the request body (multipart adds a little)"""
+        pending = [path for path in self.files if path not in self.confirmed]
+        if not pending:
+            return None
+        return min(pending, key=lambda path: abs(self.sizes[path] - body_size))
+
+    def _record(self, request, ok, body_size):
+        started = self.in_flight.pop(request, None)
+        if started is None:
+            return
+        path = self._match_file(body_size)
+        latency = time.perf_counter() - started
+        self.uploads.append(ImageUpload(path, body_size, latency, ok))
+        self.answered += 1
+        if ok and path:
+            self.confirmed.add(path)
+            if len(self.confirmed) == len(self.files) and self.finished is None:
+                self.finished = time.perf_counter()
+
+    async def _on_finished(self, request):
+        if request not in self.in_flight:
+            return
+        try:
+            response = await request.response()
+            sizes = await request.sizes()
+            self._record(request, bool(response and response.ok), sizes['requestBodySize'])
+        except Exception:
+            self._record(request, False, 0)
+
+    def _on_failed(self, request):
+        if request in self.in_flight:
+            self._record(request, False, 0)
+
+    def stop(self):
+        """Stop listening for upload requests"""
+        self.page.remove_listener('request', self._on_request)
+        self.page.remove_listener('requestfinished', self._on_finished)
+        self.page.remove_listener('requestfailed', self._on_failed)
+
+    # =================================================================
+    # WAITING
+    # =================================================================
+
+    def timeout_for(self, files):
+        """Milliseconds to allow for uploading these photos - scales with their total size"""
+        total_mb = sum(self.sizes[path] for path in files) / 1e6
+        return int(self.base_timeout + total_mb * self.seconds_per_mb * 1000)
+
+    def missing(self):
+        """Photos without a confirmed upload"""
+        return [path for path in self.files if path not in self.confirmed]
+
+    async def is_complete(self):
+        """True once every photo has a successful upload response or a thumbnail"""
+        if not self.missing():
+            return True
+        thumbnails = await self.page.locator(self.thumbnail_selector).count()
+        self.thumbnails_seen = max(self.thumbnails_seen, thumbnails)
+        if thumbnails >= len(self.files) and self.finished is None:
+            self.finished = time.perf_counter()
+        return thumbnails >= len(self.files)
+
+    def tracking_unavailable(self):
+        """True while neither an upload request nor a thumbnail has been seen"""
+        return not self.requests_seen and not self.thumbnails_seen
+
+    async def _round_over(self, pending):
+        """
+        True once all photos are confirmed, or every upload in this round has answered (some
+        failed), or the fallback wait is up without any sign of the upload being trackable
+        """
+        if await self.is_complete():
+            return True
+        if self.tracking_unavailable() and (time.perf_counter() - self.started) * 1000 >= self.fallback_wait:
+            return True
+        return self.answered >= len(pending) and not self.in_flight
+
+    async def wait(self, waits, resend=None, retries=1):
+        """
+        Wait for every photo to finish uploading (returns at once if they already have).
+
+        Args:
+            waits: WaitEngine recording the waits
+            resend: Coroutine function taking a list of photo paths and uploading them again
+                    (e.g. set_input_files on the form's file input)
+            retries (int): How many more rounds to give photos that didn't finish
+
+        Returns:
+            bool: True if every photo was confirmed, False if the upload couldn't be tracked
+
+        Raises:
+            UploadIncomplete: If photos are still missing after the retries
+        """
+        pending = self.files
+        attempt = 0
+        try:
+            while True:
+                timeout = self.timeout_for(pending)
+                await waits.condition(lambda: self._round_over(pending), f'{len(pending)} photo uploads',
+                                      timeout=timeout)
+                if await self.is_complete():
+                    break
+                if self.tracking_unavailable():
+                    # Nothing to confirm against - re-sending could duplicate photos that did arrive
+                    print(f"   ⚠️ No upload request (URL containing '{self.url_pattern}') or thumbnail "
+                          f"({self.thumbnail_selector}) seen - can't confirm the photos, carrying on "
+                          f"after {self.fallback_wait / 1000:.0f}s")
+                    return False
+
+                missing = self.missing()
+                names = ', '.join(os.path.basename(path) for path in missing)
+                if attempt >= retries or (resend is None and not self.in_flight):
+                    self.print_report()
+                    raise UploadIncomplete(f"{len(missing)} of {len(self.files)} photos didn't finish "
+                                           f"uploading: {names}")
+                attempt += 1
+
+                if self.in_flight:
+                    # Still uploading on a slow connection - sending them again would only duplicate them
+                    print(f"   ⏳ {len(missing)} photos still uploading after {timeout / 1000:.0f}s - waiting longer")
+                else:
+                    print(f"   🔁 Re-uploading {len(missing)} photos that failed: {names}")
+                    self.retried.extend(missing)
+                    self.answered = 0
+                    await resend(missing)
+                pending = missing
+        finally:
+            self.stop()
+
+        self.print_report()
+        return True
+
+    def print_report(self):
+        """Per-photo upload size and latency"""
+        upload_time = (self.finished or time.perf_counter()) - self.started
+        if not self.missing():
+            print(f"   ✅ Successfully uploaded {len(self.files)} images in {upload_time:.1f}s")
+        else:
+            print(f"   ⚠️ {len(self.confirmed)} of {len(self.files)} images confirmed uploaded")
+        for upload in self.uploads:
+            status = "✅" if upload.ok else "❌"
+            name = os.path.basename(upload.file) if upload.file else '(unmatched)'
+            print(f"      {status} {name:<28} {upload.size / 1e3:>7.0f} KB  {upload.latency:.2f}s")
@@ -0,0 +1,198 @@
+"""
+Per-Ad Photo Variant Generator for Kijiji Room Rental Automation
+Turns one source photo set into a distinct photo set for every ad
+
+Kijiji flags ads that reuse identical photos. Instead of shooting and storing a
+separate set per ad, each ad gets its own variant of the same photos: a different
+crop, colour/brightness shifts and (for some photos) a mirror image.
+The whole set is transformed as a single NumPy batch, and results are cached by the
+source files' content hash, so repeated runs just return the cached paths.
+
+Random crops can land close together, so every variant photo is checked against
+the same photo in the other variant sets: one within `min_distance` dHash bits
+(the duplicate threshold photo_hash_index.py warns at) is redrawn.
+
+Usage:
+  python image_variants.py images/ad1 3   - Make 3 variant sets from images/ad1
+"""
+
+import hashlib
+import io
+import os
+import sys
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from image_pipeline import ImagePreprocessor
+from photo_hash_index import dhash, dhash_image, hamming
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+def list_images(folder):
+    """Sorted image files in a folder"""
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+class VariantGenerator:
+    """
+    Generates deterministic, cached photo variants with batched NumPy transforms.
+
+    Every photo is first fitted to a common canvas so the set stacks into one
+    (N, H, W, 3) array. A variant is then one gather (crop + mirror for all
+    photos at once) followed by one broadcast multiply (colour + brightness).
+    """
+
+    def __init__(self, cache_dir='.image_cache/variants', canvas=(1600, 1200), max_crop=0.15,
+                 color_shift=0.06, brightness_shift=0.1, mirror_probability=0.5, quality=85,
+                 min_distance=6, max_attempts=20):
+        """
+        Args:
+            cache_dir (str): Folder for generated variant sets
+            canvas (tuple): (width, height) every photo is fitted to before transforming
+            max_crop (float): Largest fraction trimmed from the width/height
+            color_shift (float): Largest per-channel gain change (0.06 = ±6%)
+            brightness_shift (float): Largest overall brightness change
+            mirror_probability (float): Chance each photo is mirrored in a variant
+            quality (int): JPEG quality of the saved variants
+            min_distance (int): A variant photo must differ from the same photo in every other
+                                variant set by more than this many dHash bits
+            max_attempts (int): Redraws of a photo before the most distinct one is kept
+        """
+        self.cache_dir = cache_dir
+        self.canvas = tuple(canvas)
+        self.max_crop = max_crop
+        self.color_shift = color_shift
+        self.brightness_shift = brightness_shift
+        self.mirror_probability = mirror_probability
+        self.quality = quality
+        self.min_distance = min_distance
+        self.max_attempts = max_attempts
+
+    def _set_key(self, source_files):
+        """Cache key from the photos' contents and the generator settings"""
+        digest = hashlib.sha256()
+        for path in source_files:
+            digest.update(ImagePreprocessor.content_hash(path).encode('ascii'))
+        digest.update(repr((self.canvas, self.max_crop, self.color_shift, self.brightness_shift,
+                            self.mirror_probability, self.quality, self.min_distance)).encode('ascii'))
+        return digest.hexdigest()[:20]
+
+    def _load_batch(self, source_files):
+        """Load and fit every photo to the canvas, stacked as one uint8 array (N, H, W, 3)"""
+        frames = []
+        for path in source_files:
+            with Image.open(path) as image:
+                image = ImageOps.exif_transpose(image).convert('RGB')
+                frames.append(np.asarray(ImageOps.fit(image, self.canvas, Image.LANCZOS)))
+        return np.stack(frames)
+
+    def _make_variant(self, batch, rng):
+        """Apply a random crop, mirror and colour shift to the whole batch at once"""
+        count, height, width, _ = batch.shape
+        crop_h = int(round(height * (1 - self.max_crop)))
+        crop_w = int(round(width * (1 - self.max_crop)))
+
+        # Per-photo crop offsets and mirror flags
+        top = rng.integers(0, height - crop_h + 1, size=count)
+        left = rng.integers(0, width - crop_w + 1, size=count)
+        mirror = rng.random(count) < self.mirror_probability
+
+        # One gather does crop + mirror for every photo: build each photo's row/column indices
+        rows = top[:, None] + np.arange(crop_h)[None, :]
+        cols = left[:, None] + np.arange(crop_w)[None, :]
+        cols = np.where(mirror[:, None], cols[:, ::-1], cols)
+        cropped = batch[np.arange(count)[:, None, None], rows[:, :, None], cols[:, None, :]]
+
+        # Per-photo, per-channel gains, scaled by a per-photo brightness factor
+        gains = 1 + rng.uniform(-self.color_shift, self.color_shift, size=(count, 1, 1, 3))
+        gains *= 1 + rng.uniform(-self.brightness_shift, self.brightness_shift, size=(count, 1, 1, 1))
+        return np.clip(cropped.astype(np.float32) * gains, 0, 255).astype(np.uint8)
+
+    def _encode(self, frame):
+        """JPEG bytes of a frame and the dHash of the JPEG (what the duplicate check will see)"""
+        buffer = io.BytesIO()
+        Image.fromarray(frame).save(buffer, 'JPEG', quality=self.quality, optimize=True)
+        buffer.seek(0)
+        with Image.open(buffer) as image:
+            return buffer.getvalue(), dhash_image(image)
+
+    def _distinct_photo(self, batch, position, frame, rng, sibling_hashes):
+        """
+        JPEG bytes and hash of one variant photo, redrawn while it's within min_distance
+        of the same photo in another variant set.
+        """
+        best = None
+        for _ in range(self.max_attempts):
+            data, photo_hash = self._encode(frame)
+            distance = min((hamming(photo_hash, other) for other in sibling_hashes), default=64)
+            if distance > self.min_distance:
+                return data, photo_hash
+            if best is None or distance > best[0]:
+                best = (distance, data, photo_hash)
+            frame = self._make_variant(batch[position:position + 1], rng)[0]
+        print(f"   ⚠️ Variant photo {position + 1} is only {best[0]} bits from another variant")
+        return best[1], best[2]
+
+    def generate(self, source_files, count):
+        """
+        Create `count` distinct variant sets of the source photos.
+
+        Args:
+            source_files (list): Paths of the source photos
+            count (int): Number of variant sets (usually one per ad)
+
+        Returns:
+            list: `count` lists of JPEG paths, each in the same order as source_files
+        """
+        source_files = list(source_files)
+        key = self._set_key(source_files)
+        names = [os.path.splitext(os.path.basename(path))[0] for path in source_files]
+        variant_sets = [[os.path.join(self.cache_dir, key, f'variant{index + 1}', f'{name}.jpg')
+                         for name in names] for index in range(count)]
+
+        missing = [index for index, paths in enumerate(variant_sets)
+                   if not all(os.path.exists(path) for path in paths)]
+        if not missing:
+            return variant_sets
+
+        batch = self._load_batch(source_files)
+        # Hashes of the variant sets already on disk, per photo, to keep new ones apart from
+        hashes = {index: [dhash(path) for path in paths]
+                  for index, paths in enumerate(variant_sets) if index not in missing}
+        for index in missing:
+            # Seeded by set + variant number, so a variant always looks the same across runs
+            rng = np.random.default_rng(int(key[:12], 16) + index)
+            variant = self._make_variant(batch, rng)
+            os.makedirs(os.path.dirname(variant_sets[index][0]), exist_ok=True)
+            hashes[index] = []
+            for position, (frame, path) in enumerate(zip(variant, variant_sets[index])):
+                siblings = [photo_hashes[position] for other, photo_hashes in hashes.items() if other != index]
+                data, photo_hash = self._distinct_photo(batch, position, frame, rng, siblings)
+                hashes[index].append(photo_hash)
+                # Write-then-rename with a per-process temp name - multi_account_runner
+                # workers may generate the same variant set at once
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        print(f"   🎨 Generated {len(missing)} variant set(s) of {len(source_files)} photos")
+        return variant_sets
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage:")
+        print("  python image_variants.py SOURCE_FOLDER [COUNT]")
+        print("  Example: python image_variants.py images/ad1 3")
+        return
+    source_files = list_images(sys.argv[1])
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    for index, paths in enumerate(VariantGenerator().generate(source_files, count), 1):
+        print(f"Ad {index}: {os.path.dirname(paths[0])} ({len(paths)} photos)")
+
+
+if __name__ == "__main__":
+    main()
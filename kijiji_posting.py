@@ -0,0 +1,1215 @@
+"""
+Kijiji Room Rental Posting Engine
+=================================
+
+This script automates the process of posting room rental ads on Kijiji.ca
+The ads come from a catalog file (catalogs/*.json or .yaml) holding any number of ads,
+each targeting its own audience - see ad_catalog.py for the format.
+
+Features:
+- Automatic login to Kijiji
+- Deletion of existing ads to avoid duplicates
+- Posting of every ad in the catalog, validated before the browser starts
+- Silent image upload (no visual file picker)
+- Screenshot logging for debugging
+- Ready for daily automation via cron/scheduler
+
+Usage:
+  python kijiji_posting.py                        - Post the ads in catalog_file (default catalogs/dual.json)
+  python kijiji_posting.py catalogs/triple.json   - Post the ads in another catalog
+
+Author: Built with ❤️ using Playwright and Python
+Repository: https://github.com/BlockchainHB/KijijiBot
+"""
+
+# Import required libraries
+import asyncio          # For asynchronous operations (waiting, delays)
+import json            # For reading configuration files
+import os              # For file system operations (creating directories)
+import sys             # For the catalog file command-line argument
+from datetime import datetime    # For timestamps in screenshots and logs
+from playwright.async_api import async_playwright  # Web automation library
+from page_waits import WaitEngine  # Readiness-based waits instead of fixed sleeps
+from session_store import SessionStore, SESSION_CHECK_URL  # Saved logins so runs can skip the login flow
+from concurrent_posting import post_ads_concurrently, KIJIJI_HOME  # Parallel posting on separate pages
+from fast_delete import FastAdDeleter, listing_to_ad_id  # Direct HTTP deletion of old ads
+from image_pipeline import ImagePreprocessor  # Resized, metadata-free JPEGs for faster uploads
+from image_variants import VariantGenerator, list_images  # Distinct per-ad photos from one source set
+from photo_hash_index import check_duplicate_photos  # Flags photos reused between ads
+from traffic_filter import TrafficFilter  # Blocks analytics/ads/fonts, counts traffic per step
+from run_metrics import RunMetrics  # Per-step timing spans, JSONL run log and Prometheus export
+from har_replay import HarArchive  # Record a run's traffic to HAR, replay it offline
+from form_fill import fill_form_fields  # Sets the plain form fields in one in-page script
+from image_upload import UploadWatcher, DEFAULT_UPLOAD_URL_PATTERN, DEFAULT_THUMBNAIL_SELECTOR  # Background photo upload
+from ad_catalog import load_catalog  # Ads loaded from a validated catalog file
+from ad_reconcile import PostedAdStore, plan_reconcile, SYNC_MODES  # Only repost ads that changed or aged out
+from run_journal import RunJournal  # Completed steps, so a failed run resumes instead of starting over
+from step_retry import RetryEngine, RetryPolicy, CircuitBreaker, BreakerStore, CircuitOpenError  # Backoff retries, circuit breakers
+from selector_registry import SelectorRegistry  # Fallback selectors per element, fastest working one first
+from ad_id_capture import AdIdCapture, DEFAULT_PUBLISH_URL_PATTERN  # New listing's ID, read at checkout
+from my_ads_scan import MyAdsScanner, DEFAULT_NEXT_SELECTOR  # Every My Ads page, streamed page by page
+from rate_limiter import RateLimiter  # Login/delete/post token buckets shared across accounts and processes
+
+class KijijiPosting:
+    """
+    Main automation class for Kijiji room rental posting.
+    
+    This class handles:
+    1. Configuration and ad catalog loading
+    2. Browser automation using Playwright
+    3. Kijiji login and navigation
+    4. Ad deletion and posting workflow
+    5. Image upload management
+    6. Error handling and screenshot logging
+    """
+    
+    # Catalog posted when the config doesn't name one (catalog_file)
+    default_catalog = 'catalogs/dual.json'
+    
+    def __init__(self, config_file='test_input.json', config=None, catalog=None):
+        """
+        Initialize the automation with configuration settings.
+        
+        Args:
+            config_file (str): Path to JSON config file containing login credentials
+            config (dict): Settings to use instead of reading config_file (e.g. from the multi-account runner)
+            catalog: Ads to post instead of catalog_file - a catalog file path, or a list
+                     of ads already loaded with ad_catalog.load_catalog()
+        
+        The config file should contain:
+        - username: Kijiji email address
+        - password: Kijiji password  
+        - headless: Boolean (True for background mode, False to see browser)
+        - catalog_file: Ads to post (default: the class's default_catalog)
+        """
+        # Load configuration from a dict, JSON file or environment variables
+        if config is not None:
+            self.config = dict(config)
+        elif os.path.exists(config_file):
+            with open(config_file, 'r') as f:
+                self.config = json.load(f)
+        else:
+            # Fallback to environment variables for GitHub Actions
+            self.config = {}
+        
+        # Extract login credentials from config or environment
+        self.username = self.config.get('username') or os.getenv('KIJIJI_USERNAME')
+        self.password = self.config.get('password') or os.getenv('KIJIJI_PASSWORD')
+        self.headless = self.config.get('headless', True)  # Default to headless for cloud
+        
+        if not self.username or not self.password:
+            raise ValueError("Username and password must be provided via config file or environment variables")
+        
+        # =================================================================
+        # AD CATALOG - EDIT catalogs/*.json TO CUSTOMIZE YOUR ADS
+        # =================================================================
+        
+        # Optional: derive every ad's photos from ONE source set instead of separate folders
+        # Each ad gets its own cropped/mirrored/colour-shifted variant (see image_variants.py)
+        variant_source = self.config.get('variant_source_dir')
+        
+        # Every ad is validated here (title, price, tags, photos) - a bad catalog fails before the browser starts
+        # IMPORTANT: Each ad uses different photos to avoid Kijiji's duplicate content detection
+        self.catalog_file = self.config.get('catalog_file', self.default_catalog)
+        if isinstance(catalog, str):
+            self.catalog_file = catalog
+        if catalog is None or isinstance(catalog, str):
+            self.ads = load_catalog(self.catalog_file, check_images=not variant_source)
+        else:
+            self.ads = [dict(ad) for ad in catalog]
+        
+        if variant_source:
+            generator = VariantGenerator(
+                cache_dir=os.path.join(self.config.get('image_cache_dir', '.image_cache'), 'variants'),
+                # Variants must pass the duplicate photo check run before posting
+                min_distance=self.config.get('duplicate_photo_threshold', 6)
+            )
+            variant_sets = generator.generate(list_images(variant_source), len(self.ads))
+            for ad, images in zip(self.ads, variant_sets):
+                ad['images'] = images
+        
+        # Sync mode - "replace" deletes every listing and reposts every ad; "reconcile" only
+        # reposts ads that are missing, changed or older than bump_age_hours (see ad_reconcile.py)
+        self.sync_mode = self.config.get('sync_mode', 'replace')
+        if self.sync_mode not in SYNC_MODES:
+            raise ValueError(f"Unknown sync_mode '{self.sync_mode}' (expected one of: {', '.join(SYNC_MODES)})")
+        self.bump_age_hours = self.config.get('bump_age_hours', 72)
+        # Fingerprint and time of every ad posted from this machine, per account
+        self.posted_ads = PostedAdStore(self.username, state_dir=self.config.get('state_dir', 'state'))
+        
+        # Run journal - every completed step is appended; a run that failed is resumed by the
+        # next one (within resume_window_hours) instead of re-deleting and reposting everything
+        self.journal = RunJournal(
+            self.username,
+            journal_dir=os.path.join(self.config.get('state_dir', 'state'), 'journal'),
+            resume=self.config.get('resume_runs', True),
+            resume_window_hours=self.config.get('resume_window_hours', 24)
+        )
+        
+        # Wait engine - waits on real page readiness instead of fixed sleeps
+        # wait_timeout (ms) caps every individual wait
+        self.waits = WaitEngine(
+            default_timeout=self.config.get('wait_timeout', 10000),
+            verbose=self.config.get('verbose_waits', False)
+        )
+        
+        # Every element is found through a list of candidate selectors, each given a short
+        # timeout - a renamed button falls through to the next candidate instead of failing the run
+        self.selectors = SelectorRegistry(
+            stats_file=os.path.join(self.config.get('state_dir', 'state'), 'selector_stats.json'),
+            candidate_timeout=self.config.get('selector_timeout', 2000),
+            default_timeout=self.config.get('wait_timeout', 10000),
+            overrides=self.config.get('selectors')
+        )
+        
+        # Saved login sessions - later runs reuse cookies instead of logging in again
+        self.use_saved_session = self.config.get('use_saved_session', True)
+        self.sessions = SessionStore(
+            session_dir=self.config.get('session_dir', 'sessions'),
+            ttl_hours=self.config.get('session_ttl_hours', 12)
+        )
+        
+        # Concurrent posting - after login, post every ad at once on its own page
+        # posting_concurrency caps how many ad forms are open at the same time
+        self.concurrent_posting = self.config.get('concurrent_posting', False)
+        self.posting_concurrency = self.config.get('posting_concurrency', 3)
+        
+        # Fast fill - set radio options, description, tags, price and phone in one in-page script
+        # (location autocomplete and photo upload still use real interaction)
+        self.fast_fill = self.config.get('fast_fill', False)
+        
+        # Fast deletion - replay the page's own delete request instead of clicking through modals
+        # The request is learned from the first UI deletion and saved to delete_endpoint.json
+        self.fast_delete = self.config.get('fast_delete', True)
+        self.fast_deleter = FastAdDeleter(
+            endpoint_file=self.config.get('delete_endpoint_file', 'delete_endpoint.json'),
+            concurrency=self.config.get('delete_concurrency', 4),
+            endpoint=self.config.get('delete_endpoint'),
+            throttle=lambda: self.limiter.acquire('delete')
+        )
+        # Delete by ID - every posted ad's ID is captured at checkout (publish_url_pattern names
+        # the publish request); the next run deletes those IDs directly, without visiting My Ads
+        self.delete_by_id = self.config.get('delete_by_id', True)
+        self.publish_url_pattern = self.config.get('publish_url_pattern', DEFAULT_PUBLISH_URL_PATTERN)
+        # My Ads is read page by page (next link, load-more button or infinite scroll),
+        # one in-page call per page, up to my_ads_max_pages pages
+        self.my_ads_next_selector = self.config.get('my_ads_next_selector', DEFAULT_NEXT_SELECTOR)
+        self.my_ads_max_pages = self.config.get('my_ads_max_pages', 100)
+        
+        # Traffic filter - "block" drops analytics/ad/font requests, "measure" only counts them, "off" disables
+        self.traffic_mode = self.config.get('traffic_filter', 'block')
+        self.traffic = TrafficFilter(
+            blocked_domains=self.config.get('blocked_domains'),
+            blocked_types=self.config.get('blocked_resource_types'),
+            allowed_domains=self.config.get('allowed_domains'),
+            measure_only=self.traffic_mode == 'measure'
+        )
+        
+        # Image preprocessing - upload resized JPEGs from a content-hash cache instead of raw photos
+        self.preprocess_images = self.config.get('preprocess_images', True)
+        self.images = ImagePreprocessor(
+            cache_dir=self.config.get('image_cache_dir', '.image_cache'),
+            max_dimension=self.config.get('image_max_dimension', 1600),
+            quality=self.config.get('image_quality', 85)
+        )
+        
+        # Photo upload runs in the background while the form is filled; it's confirmed by
+        # upload responses (URLs containing upload_url_pattern) or one thumbnail per photo.
+        # The wait allows upload_timeout ms plus upload_seconds_per_mb per MB of photos;
+        # failed photos are re-sent up to upload_retries times before the ad is failed.
+        # If neither signal is ever seen, the wait falls back to upload_fallback_wait ms
+        self.upload_url_pattern = self.config.get('upload_url_pattern', DEFAULT_UPLOAD_URL_PATTERN)
+        self.thumbnail_selector = self.config.get('thumbnail_selector', DEFAULT_THUMBNAIL_SELECTOR)
+        self.upload_timeout = self.config.get('upload_timeout', 10000)
+        self.upload_seconds_per_mb = self.config.get('upload_seconds_per_mb', 10)
+        self.upload_retries = self.config.get('upload_retries', 1)
+        self.upload_fallback_wait = self.config.get('upload_fallback_wait', 5000)
+        
+        # Step timings - every step is timed into logs/runs-YYYYMMDD.jsonl, and the
+        # p50/p95 per step over the last metrics_history_days go to a Prometheus text file
+        self.metrics = RunMetrics(
+            log_dir=self.config.get('metrics_dir', 'logs'),
+            prometheus_file=self.config.get('prometheus_file'),
+            account=self.username,
+            history_days=self.config.get('metrics_history_days', 30)
+        )
+        
+        # HAR record/replay - "record" saves this run's Kijiji traffic, "replay" serves a run from it offline
+        self.har = HarArchive(
+            mode=self.config.get('har_mode', 'off'),
+            har_path=self.config.get('har_path', 'har/kijiji_run.zip')
+        )
+        if self.har.mode != 'off':
+            # The fast-delete request client bypasses context routing, so it can't be recorded or replayed
+            self.fast_delete = False
+            # A recorded/replayed run must take the full path, never skip steps from an earlier run
+            self.journal.resume = False
+        if self.har.replaying:
+            # A replayed run posts nothing real - journaling it would let the next live run
+            # "resume" it and skip deleting and posting the real ads
+            self.journal.enabled = False
+        
+        # Step retries - a failed login, My Ads visit or ad post is retried after an exponentially
+        # growing, jittered pause; every failed attempt is logged to logs/retries-YYYYMMDD.jsonl
+        self.retry = RetryEngine(
+            RetryPolicy(
+                attempts=self.config.get('retry_attempts', 3),
+                base_delay=self.config.get('retry_base_delay', 2.0),
+                max_delay=self.config.get('retry_max_delay', 30.0),
+                jitter=self.config.get('retry_jitter', 0.5)
+            ),
+            metrics=self.metrics,
+            waits=self.waits
+        )
+        # Circuit breakers - after breaker_threshold login or checkout failures in a row, stop
+        # trying for breaker_cooldown_minutes (held across runs) instead of hammering the site
+        breakers = BreakerStore(self.username, state_dir=self.config.get('state_dir', 'state'))
+        breaker_settings = {
+            'threshold': self.config.get('breaker_threshold', 3),
+            'cooldown': self.config.get('breaker_cooldown_minutes', 30) * 60,
+        }
+        self.login_breaker = CircuitBreaker('login', breakers, **breaker_settings)
+        self.checkout_breaker = CircuitBreaker('checkout', breakers, **breaker_settings)
+        # Ads whose current attempt got as far as the checkout button, with the ad ID
+        # the publish response gave (None if it didn't get that far) - see post_ad
+        self.checkouts_clicked = {}
+        
+        # Rate limits - every login, deletion and post takes a token from this account's bucket
+        # and a global one; bucket levels are shared with other processes through a SQLite file
+        self.limiter = RateLimiter(
+            self.username,
+            db_file=self.config.get('rate_limit_db', os.path.join(self.config.get('state_dir', 'state'), 'rate_limits.sqlite')),
+            limits=self.config.get('rate_limits'),
+            metrics=self.metrics,
+            waits=self.waits,
+            enabled=self.config.get('rate_limiting', True)
+        )
+        
+        # =================================================================
+        # DIRECTORY SETUP - CREATE REQUIRED FOLDERS
+        # =================================================================
+        
+        # Create necessary directories if they don't exist
+        # exist_ok=True prevents errors if directories already exist
+        self.screenshot_dir = self.config.get('screenshot_dir', 'screenshots')
+        os.makedirs(self.screenshot_dir, exist_ok=True)    # For automation progress screenshots
+        
+    async def login(self, page):
+        """
+        Handle Kijiji login process.
+        
+        This method:
+        1. Navigates to Kijiji login page
+        2. Fills in username and password from config
+        3. Submits login form
+        4. Waits for successful redirect
+        5. Takes screenshot for verification
+        
+        Args:
+            page: Playwright page object for browser interaction
+            
+        Raises:
+            Exception: If login fails or times out
+        """
+        async with self.metrics.span('login'):
+            print("🔐 Logging in to Kijiji...")
+            self.traffic.set_step(page, 'login')
+            
+            # Kijiji's OAuth login URL - this ensures we get redirected to main site after login
+            login_url = "https://id.kijiji.ca/login?service=https%3A%2F%2Fid.kijiji.ca%2Foauth2.0%2FcallbackAuthorize%3Fclient_id%3Dkijiji_horizontal_web_gpmPihV3%26redirect_uri%3Dhttps%253A%252F%252Fwww.kijiji.ca%252Fapi%252Fauth%252Fcallback%252Fcis%26response_type%3Dcode%26client_name%3DCasOAuthClient&locale=en&scope=openid+email+profile"
+            
+            async with self.metrics.span('open_form'):
+                # Navigate to login page and wait for network to be idle (page fully loaded)
+                await page.goto(login_url, wait_until='networkidle')
+                email_input = await self.selectors.resolve(page, 'login_email')
+            
+            async with self.metrics.span('credentials'):
+                # Step 1: Enter email address
+                await email_input.click()
+                await email_input.fill(self.username)
+                
+                # Step 2: Tab to password field (mimics human behavior)
+                await email_input.press("Tab")
+                forgot_password = await self.selectors.resolve(page, 'forgot_password', optional=True)
+                if forgot_password:
+                    await forgot_password.press("Tab")
+                
+                # Step 3: Enter password and submit
+                await (await self.selectors.resolve(page, 'login_password')).fill(self.password)
+                await self.selectors.click(page, 'sign_in_button')
+            
+            async with self.metrics.span('redirect'):
+                # Step 4: Wait for successful login redirect to main Kijiji site
+                # The ** pattern matches any path under kijiji.ca
+                await page.wait_for_url('https://www.kijiji.ca/**', timeout=30000)
+                await self.selectors.resolve(page, 'account_menu')
+            
+            print("   ✅ Login successful!")
+            # Take screenshot for verification/debugging - timestamp prevents filename conflicts
+            await page.screenshot(path=f'{self.screenshot_dir}/01-login-{datetime.now().strftime("%H%M%S")}.png')
+        
+    async def ensure_logged_in(self, context, page, saved_session):
+        """
+        Reuse a saved login session when it's still valid, otherwise log in and save a new one.
+        
+        Args:
+            context: Playwright browser context the page belongs to
+            page: Playwright page object for browser interaction
+            saved_session: Storage state the context was created with (None if there wasn't one)
+        """
+        if saved_session:
+            self.traffic.set_step(page, 'session_check')
+            if await self.sessions.verify(page, self.waits):
+                print("🔐 Reusing saved Kijiji session - login skipped")
+                return
+            print("   ⚠️ Saved session no longer valid - logging in again")
+            if not self.har.replaying:
+                self.sessions.invalidate(self.username)
+        
+        async def attempt_login():
+            with self.login_breaker:
+                await self.limiter.acquire('login')
+                await self.login(page)
+        
+        await self.retry.run('login', attempt_login)
+        
+        # A replayed login isn't a real session - keep the saved one as it is
+        if self.use_saved_session and not self.har.replaying:
+            await self.sessions.save(context, self.username)
+        
+    async def delete_existing_ads(self, page):
+        """
+        Delete all existing ads from the user's account.
+        
+        This is crucial to avoid duplicate content issues on Kijiji.
+        The method:
+        1. Navigates to "My Ads" section
+        2. Scans for all existing listings
+        3. Deletes each ad individually
+        4. Confirms deletion and closes modals
+        
+        Args:
+            page: Playwright page object for browser interaction
+            
+        Note: 
+            - Reads every My Ads page and starts deleting each page's ads while the next is read
+            - Uses try/catch for each deletion to continue if one fails
+            - Deletes over HTTP in parallel once the page's delete request is known (fast_delete.py)
+            - Skips My Ads entirely when every catalog ad's ID was recorded when it was posted
+            - Takes screenshot for debugging
+        """
+        async with self.metrics.span('delete_existing_ads'):
+            print("🗑️  Deleting existing ads...")
+            self.traffic.set_step(page, 'delete_ads')
+            if await self.delete_known_ads(page):
+                return
+            await self.retry.run('open_my_ads', lambda: self.open_my_ads(page), before_retry=lambda: self.go_home(page))
+            
+            try:
+                print("   Scanning for existing ads...")
+                deleted_count = await self.delete_while_scanning(page)
+                print(f"   ✅ Total ads deleted: {deleted_count}")
+                
+            except Exception as e:
+                # Handle case where no ads exist or scanning fails
+                print(f"   ⚠️ Error scanning for ads: {e}")
+                print("   No ads found or already deleted")
+        
+    async def delete_known_ads(self, page):
+        """
+        Delete the ads this machine posted by their recorded IDs, without scanning My Ads.
+        
+        Only used when every catalog ad has a recorded ID and the delete request is known and
+        verified; otherwise (or if any ID can't be deleted) the caller falls back to the full scan.
+        
+        Args:
+            page: Playwright page of the logged-in context
+            
+        Returns:
+            bool: True if all recorded ads were deleted and no scan is needed
+        """
+        known = self.posted_ads.ad_ids()
+        # Only a template whose deletions were seen to take effect is trusted without looking
+        if not (self.delete_by_id and self.fast_delete and self.fast_deleter.is_verified()):
+            return False
+        if not known or any(ad['name'] not in known for ad in self.ads):
+            return False
+        
+        print(f"   Deleting {len(known)} ads by their recorded IDs...")
+        async with self.metrics.span('delete_by_id'):
+            deleted, failed = await self.fast_deleter.delete_all(page.context.request, list(known.values()))
+        for name, ad_id in known.items():
+            if ad_id in deleted:
+                self.journal.step_done('delete', f'listing-id-{ad_id}')
+                self.posted_ads.forget(name)
+        print(f"   ✅ Total ads deleted: {len(deleted)}")
+        
+        if failed:
+            # Already gone, or the IDs are stale - the scan finds whatever is really still up
+            print(f"   ⚠️ {len(failed)} recorded IDs couldn't be deleted - scanning My Ads instead")
+            return False
+        return True
+        
+    async def reconcile_ads(self, page):
+        """
+        Match the catalog against the live listings and delete only what must go (sync_mode "reconcile").
+        
+        Listings of changed, aged-out or untracked ads are deleted along with listings
+        that aren't in the catalog; ads whose listing is current are left alone.
+        
+        Args:
+            page: Playwright page object for browser interaction
+            
+        Returns:
+            list: Catalog ads to post (missing, changed, aged or untracked)
+        """
+        async with self.metrics.span('reconcile'):
+            print("🔄 Reconciling the catalog with the live listings...")
+            self.traffic.set_step(page, 'reconcile')
+            await self.retry.run('open_my_ads', lambda: self.open_my_ads(page), before_retry=lambda: self.go_home(page))
+            
+            listings = await self.scan_listings(page)
+            plan = plan_reconcile(self.ads, listings, self.posted_ads, self.bump_age_hours)
+            print(f"   {len(self.ads)} catalog ads, {len(listings)} live listings: "
+                  f"keep {len(plan.keep)}, post {len(plan.post)}, delete {len(plan.delete)}")
+            plan.print_plan()
+            
+            if plan.delete:
+                deleted_count = await self.delete_listings(page, [listing_id for listing_id, _ in plan.delete])
+                print(f"   ✅ Total ads deleted: {deleted_count}")
+            return [ad for ad, _ in plan.post]
+        
+    async def open_my_ads(self, page):
+        """Go to the account's My Ads page through the header menu"""
+        async with self.metrics.span('open_my_ads'):
+            # A saved-session check already left the page on (the first page of) My Ads -
+            # clicking the link there wouldn't change the URL the navigation wait looks for
+            if page.url.split('#')[0] != SESSION_CHECK_URL:
+                # Click "My Account" dropdown in header
+                await self.selectors.click(page, 'account_menu')
+                my_ads_link = await self.selectors.resolve(page, 'my_ads_link')
+                
+                # Click "My Ads" link in dropdown menu
+                menu_url = page.url
+                await my_ads_link.click()
+                await self.waits.navigation(page, lambda url: url != menu_url, label='My Ads page')
+            await self.waits.dom_settled(page, 'My Ads listings rendered', quiet_ms=500)
+        
+        # Take screenshot of current ads before deletion
+        await page.screenshot(path=f'{self.screenshot_dir}/02-my-ads-{datetime.now().strftime("%H%M%S")}.png')
+        
+    def my_ads_scanner(self, page):
+        """Scanner for the My Ads pages shown on this page"""
+        return MyAdsScanner(page, self.waits, next_selector=self.my_ads_next_selector, max_pages=self.my_ads_max_pages)
+        
+    async def scan_listings(self, page):
+        """
+        Read every listing on every My Ads page, one in-page call per page.
+        
+        Kijiji uses test IDs like "listing-id-1234567890" for each ad; the listing's
+        text (which includes its title) is used by reconcile mode to match catalog ads.
+        
+        Returns:
+            list: {'id': 'listing-id-...', 'text': '...'} per listing
+        """
+        print("   Scanning for existing ads...")
+        async with self.metrics.span('scan'):
+            scanner = self.my_ads_scanner(page)
+            listings = await scanner.all_listings()
+        print(f"   Found {len(listings)} listings on {scanner.pages_read} page reads")
+        return listings
+        
+    async def delete_while_scanning(self, page):
+        """
+        Delete every listing on My Ads, starting on each page's ads as soon as it is read.
+        
+        With the fast path, each page's ads are handed to a background task that deletes
+        them over HTTP while the scanner moves on to the next page. Without it they are
+        deleted through the UI on the page being shown (the first one teaches the fast
+        path). Deletions move later ads up onto earlier pages, so the scan repeats from
+        the first page until a pass finds nothing new.
+        
+        Args:
+            page: Playwright page object showing the first My Ads page
+            
+        Returns:
+            int: Number of listings deleted
+        """
+        scanner = self.my_ads_scanner(page)
+        batches = asyncio.Queue()
+        deleted_count = 0
+        fast_deleted = []
+        failed = []
+        
+        async def delete_in_background():
+            while True:
+                listing_ids = await batches.get()
+                try:
+                    async with self.metrics.span('fast_delete'):
+                        ad_ids = [listing_to_ad_id(listing_id) for listing_id in listing_ids]
+                        deleted, not_deleted = await self.fast_deleter.delete_all(page.context.request, ad_ids)
+                    fast_deleted.extend(deleted)
+                    failed.extend(f'listing-id-{ad_id}' for ad_id in not_deleted)
+                except Exception as e:
+                    print(f"   ⚠️ Direct deletion failed: {e}")
+                    failed.extend(listing_ids)
+                finally:
+                    batches.task_done()
+        
+        worker = asyncio.create_task(delete_in_background())
+        try:
+            # Before starting over, let the background deletions land so the pages have shifted
+            async for listings in scanner.stream(rescan=True, before_rescan=batches.join):
+                listing_ids = [listing['id'] for listing in listings]
+                print(f"   Found {len(listing_ids)} ads to delete: {listing_ids}")
+                if self.fast_delete and self.fast_deleter.has_endpoint():
+                    batches.put_nowait(listing_ids)
+                else:
+                    deleted_count += await self.delete_listings(page, listing_ids)
+            await batches.join()
+        finally:
+            worker.cancel()
+        
+        if fast_deleted:
+            # The responses said deleted - check My Ads agrees before counting them
+            gone, still_up = await self.confirm_fast_deletes(page, fast_deleted)
+            deleted_count += len(gone)
+            failed.extend(f'listing-id-{ad_id}' for ad_id in still_up)
+        
+        if failed:
+            if not deleted_count:
+                # Nothing went through - the saved request is stale, so let the UI re-learn it
+                self.fast_deleter.forget_endpoint()
+            print(f"   Falling back to the UI for {len(failed)} ads")
+            deleted_count += await self.delete_listings(page, failed)
+        return deleted_count
+        
+    async def go_home(self, page):
+        """Reload the home page - the starting point a retried step expects"""
+        await page.goto(KIJIJI_HOME, wait_until='domcontentloaded')
+        await self.waits.dom_settled(page, 'home page')
+        
+    async def find_live_ad(self, page, ad_data, ad_id=None):
+        """
+        ID of the listing a failed attempt posted for this ad, or None if it isn't on My Ads.
+        
+        With the ad ID the attempt captured, only that listing counts. Without one, a
+        listing counts when one of its lines is exactly the ad's title and it isn't an
+        ad recorded by an earlier run (an old same-title listing isn't this attempt's).
+        """
+        await page.goto(SESSION_CHECK_URL, wait_until='domcontentloaded')
+        await self.waits.dom_settled(page, 'My Ads listings rendered', quiet_ms=500)
+        listings = await self.scan_listings(page)
+        if ad_id:
+            return ad_id if any(listing_to_ad_id(listing['id']) == ad_id for listing in listings) else None
+        
+        title = ' '.join(ad_data['title'].split()).lower()
+        earlier = set(self.posted_ads.ad_ids().values())
+        for listing in listings:
+            lines = {' '.join(line.split()).lower() for line in listing['text'].splitlines()}
+            if title in lines and listing_to_ad_id(listing['id']) not in earlier:
+                return listing_to_ad_id(listing['id'])
+        return None
+        
+    async def delete_listings(self, page, listing_ids):
+        """
+        Delete the given listings from the My Ads page.
+        
+        Args:
+            page: Playwright page object showing the My Ads page
+            listing_ids (list): Listing test IDs, e.g. "listing-id-1234567890"
+            
+        Returns:
+            int: Number of listings deleted
+        """
+        # IMPORTANT: We collect all IDs first, then delete each one
+        # This prevents infinite loops that could occur if we tried to
+        # find and delete ads in the same loop (DOM changes during deletion)
+        
+        # Ads are deleted directly over HTTP when the delete request is known;
+        # otherwise the first UI deletion teaches it and the rest go fast
+        deleted_count = 0
+        fast_path_tried = False
+        listing_ids = list(listing_ids)
+        while listing_ids:
+            if self.fast_delete and self.fast_deleter.has_endpoint() and not fast_path_tried:
+                fast_path_tried = True
+                async with self.metrics.span('fast_delete'):
+                    listing_ids, count = await self.delete_ads_directly(page, listing_ids)
+                    deleted_count += count
+                continue
+            
+            listing_id = listing_ids.pop(0)
+            try:
+                # The listing may be on another My Ads page than the one shown
+                if not await self.my_ads_scanner(page).show(listing_id, SESSION_CHECK_URL):
+                    print(f"   ⚠️ {listing_id} is no longer on My Ads - skipping")
+                    continue
+                print(f"   Deleting ad: {listing_id}")
+                await self.limiter.acquire('delete')
+                
+                # Record the request this deletion fires so the remaining ads can skip the UI
+                async with self.metrics.span('delete_ui'):
+                    recorder = self.fast_deleter.learn(page, listing_to_ad_id(listing_id))
+                    with recorder:
+                        await self.delete_ad_via_ui(page, listing_id)
+                    if recorder.learning:
+                        # Only learn it once My Ads, read afresh, no longer shows the listing
+                        gone = not await self.still_listed(page, [listing_to_ad_id(listing_id)])
+                        await recorder.commit(listing_gone=gone)
+                
+                deleted_count += 1
+                self.journal.step_done('delete', listing_id)
+                print(f"   ✅ Ad {deleted_count} deleted: {listing_id}")
+                
+            except Exception as e:
+                # If one ad fails to delete, log the error but continue with others
+                print(f"   ⚠️ Failed to delete {listing_id}: {e}")
+                continue
+        return deleted_count
+        
+    async def still_listed(self, page, ad_ids):
+        """Of these ad IDs, the ones My Ads still shows (read afresh from its first page)"""
+        await page.goto(SESSION_CHECK_URL, wait_until='domcontentloaded')
+        await self.waits.dom_settled(page, 'My Ads refreshed', quiet_ms=500)
+        live = {listing_to_ad_id(listing['id']) for listing in await self.my_ads_scanner(page).all_listings()}
+        return [ad_id for ad_id in ad_ids if ad_id in live]
+        
+    async def confirm_fast_deletes(self, page, ad_ids):
+        """
+        Check that ads the delete request reported deleted are gone from My Ads.
+        
+        A template that answers 2xx but deletes nothing (e.g. it was learned from the
+        wrong request) would otherwise "delete" every ad without anything happening.
+        
+        Returns:
+            tuple: (ad IDs really gone - journaled, ad IDs still listed)
+        """
+        still_up = await self.still_listed(page, ad_ids)
+        gone = [ad_id for ad_id in ad_ids if ad_id not in still_up]
+        for ad_id in gone:
+            self.journal.step_done('delete', f'listing-id-{ad_id}')
+        if still_up:
+            print(f"   ⚠️ {len(still_up)} ads reported deleted are still on My Ads")
+        elif gone:
+            self.fast_deleter.mark_verified()
+        return gone, still_up
+        
+    async def delete_ad_via_ui(self, page, listing_id):
+        """
+        Delete one listing by clicking through the My Ads delete modals.
+        
+        Args:
+            page: Playwright page object showing the My Ads page
+            listing_id (str): Listing test ID, e.g. "listing-id-1234567890"
+        """
+        # Find and click the delete button for this specific listing
+        # Each ad has its own delete button with adDeleteButton test-id
+        await self.selectors.click(page, 'delete_button', listing_id=listing_id)
+        
+        # Kijiji requires a reason for deletion - we select "Prefer not to say"
+        await self.selectors.click(page, 'delete_reason')
+        confirm_button = await self.selectors.resolve(page, 'delete_confirm')
+        await self.waits.enabled(confirm_button, 'delete confirm button')
+        
+        # Confirm the deletion
+        await confirm_button.click()
+        
+        # Close the confirmation modal that appears after deletion
+        close_button = await self.selectors.click(page, 'modal_close')
+        await self.waits.hidden(close_button, 'modal closed')
+        
+    async def delete_ads_directly(self, page, listing_ids):
+        """
+        Delete listings in parallel through the context's request client.
+        
+        Args:
+            page: Playwright page object showing the My Ads page
+            listing_ids (list): Listing test IDs to delete
+            
+        Returns:
+            tuple: (listing IDs still to delete through the UI, number deleted)
+        """
+        ad_ids = [listing_to_ad_id(listing_id) for listing_id in listing_ids]
+        deleted, failed = await self.fast_deleter.delete_all(page.context.request, ad_ids)
+        if deleted:
+            # Also leaves My Ads reloaded, so the UI fallback only sees ads that are really still there
+            deleted, still_up = await self.confirm_fast_deletes(page, deleted)
+            failed += still_up
+        
+        if not deleted:
+            # Nothing went through - the saved request is stale, so let the UI re-learn it
+            self.fast_deleter.forget_endpoint()
+        
+        if failed:
+            print(f"   Falling back to the UI for {len(failed)} ads")
+        return [f'listing-id-{ad_id}' for ad_id in failed], len(deleted)
+        
+    async def post_ad(self, page, ad_data, ad_number):
+        """
+        Post a single ad, retrying failed attempts (see step_retry.py).
+        
+        A retry starts over from the home page. If the failed attempt had already clicked
+        the checkout button, My Ads is checked first: when the ad is live, that attempt
+        did post it (only the confirmation failed) and it is not posted a second time.
+        
+        Args:
+            page: Playwright page object for browser interaction
+            ad_data (dict): Catalog ad to post
+            ad_number (int): Position of the ad in the catalog
+        """
+        live_id = None
+        
+        async def attempt():
+            self.checkouts_clicked.pop(ad_data['name'], None)
+            await self.limiter.acquire('post')
+            return await self.post_ad_once(page, ad_data, ad_number)
+        
+        async def already_posted():
+            nonlocal live_id
+            if ad_data['name'] in self.checkouts_clicked:
+                live_id = await self.find_live_ad(page, ad_data, self.checkouts_clicked[ad_data['name']])
+            return live_id is not None
+        
+        ad_id = await self.retry.run('post_ad', attempt, item=ad_number,
+                                     already_done=already_posted, before_retry=lambda: self.go_home(page))
+        ad_id = ad_id or live_id
+        
+        # Reconcile mode and the next run's delete-by-ID use this (a replayed post isn't a real listing)
+        if not self.har.replaying:
+            self.posted_ads.record(ad_data, ad_id=ad_id)
+        self.journal.step_done('post_ad', ad_data['name'], ad_id=ad_id)
+        
+    async def post_ad_once(self, page, ad_data, ad_number):
+        """
+        Post a single ad - based on recording
+        
+        Returns:
+            str: The new listing's ad ID, or None if the confirmation didn't show it
+        """
+        async with self.metrics.span('post_ad', ad_number=ad_number):
+            print(f"📝 Posting Ad #{ad_number}: {ad_data['title']}")
+            self.traffic.set_step(page, f'post_ad_{ad_number}')
+            
+            async with self.metrics.span('open_form'):
+                # Start posting
+                start_url = page.url
+                await self.selectors.click(page, 'post_ad_link')
+                await self.waits.navigation(page, lambda url: url != start_url, label='post ad page')
+                
+                # Close drawer if it appears (from recording)
+                drawer_close = await self.selectors.resolve(page, 'drawer_close', timeout=3000, optional=True)
+                if drawer_close:
+                    try:
+                        await drawer_close.click()
+                        await self.waits.hidden(drawer_close, 'drawer closed')
+                    except Exception:
+                        pass
+                
+            async with self.metrics.span('title'):
+                # STEP 1: Enter title FIRST (this is the key from your recording!)
+                await self.selectors.fill(page, 'ad_title', ad_data['title'])
+                next_button = await self.selectors.resolve(page, 'next_button')
+                await self.waits.enabled(next_button, 'Next button enabled')
+                
+                # STEP 2: Click Next (now enabled because title is filled)
+                await next_button.click()
+            
+            async with self.metrics.span('category'):
+                # STEP 3: Select category
+                await self.selectors.click(page, 'category_room_rentals')
+                await self.selectors.resolve(page, 'description')
+            
+            # STEP 4: Fill form details (with this ad's own images)
+            await self.fill_ad_form(page, ad_data, ad_data['images'])
+            
+            async with self.metrics.span('submit'):
+                # STEP 5: Submit
+                await self.selectors.click(page, 'package_select')
+                checkout_button = await self.selectors.resolve(page, 'checkout_button')
+                await self.waits.enabled(checkout_button, 'checkout page')
+                checkout_url = page.url
+                # From the click on, the ad may be posted even if this attempt fails (see post_ad)
+                self.checkouts_clicked[ad_data['name']] = None
+                # Listen for the publish response before clicking, so the new ad's ID isn't missed
+                capture = AdIdCapture(page, self.publish_url_pattern)
+                try:
+                    with self.checkout_breaker:
+                        # Wait on the publish POST itself, then the confirmation page, within one 30s budget
+                        published = await self.waits.response(page, self.publish_url_pattern, checkout_button.click,
+                                                              label='publish request', timeout=30000, method='POST')
+                        submitted = await self.waits.navigation(page, lambda url: url != checkout_url,
+                                                                label='ad submitted',
+                                                                timeout=max(1000, 30000 - published.elapsed * 1000))
+                        # A stalled checkout counts against the breaker like any other failure
+                        if not submitted.ok:
+                            reason = 'publish response OK' if published.ok else 'no successful publish response'
+                            raise Exception(f"Checkout didn't reach the confirmation page in "
+                                            f"{published.elapsed + submitted.elapsed:.0f}s ({reason})")
+                    await self.waits.dom_settled(page, 'confirmation page')
+                except Exception:
+                    # The publish response may have come back before the failure - the retry
+                    # then checks My Ads for exactly that listing
+                    self.checkouts_clicked[ad_data['name']] = await capture.ad_id()
+                    raise
+                ad_id = await capture.ad_id()
+            
+            print(f"   ✅ Ad #{ad_number} posted successfully!" + (f" (ad ID {ad_id})" if ad_id else ""))
+            await page.screenshot(path=f'{self.screenshot_dir}/03-ad{ad_number}-posted-{datetime.now().strftime("%H%M%S")}.png')
+            return ad_id
+        
+    async def post_ads_in_parallel(self, context, ads):
+        """
+        Post several ads concurrently, each on its own page of the logged-in context.
+        
+        Args:
+            context: Logged-in Playwright browser context
+            ads (list): (ad_data, ad_number) pairs to post
+            
+        Raises:
+            CircuitOpenError: If any ad stopped at an open circuit breaker
+            Exception: If any other ad failed (the others still finish first)
+        """
+        results = await post_ads_concurrently(self, context, ads, self.posting_concurrency)
+        
+        failed = [r for r in results if not r.ok]
+        # An open breaker must reach the scheduler as such, so it doesn't rerun into it
+        for result in failed:
+            if isinstance(result.exception, CircuitOpenError):
+                raise result.exception
+        if failed:
+            details = ', '.join(f"#{r.ad_number} ({r.error})" for r in failed)
+            raise Exception(f"{len(failed)} of {len(results)} ads failed to post: {details}")
+        return results
+        
+    async def fill_ad_form(self, page, ad_data, image_files):
+        """Fill the ad form with details"""
+        async with self.metrics.span('fill_ad_form'):
+            print("   📋 Filling form details...")
+            
+            # Start the photo upload first - it runs in the background while the other fields are filled
+            async with self.metrics.span('images'):
+                upload = await self.start_image_upload(page, image_files)
+            
+            # One in-page script for the plain fields; falls back to field-by-field if the form changed
+            fast_filled = self.fast_fill and await self.fill_fields_fast(page, ad_data)
+            
+            if not fast_filled:
+                async with self.metrics.span('options'):
+                    # Set furnished to Yes (optional - the form is still valid without it)
+                    try:
+                        await self.selectors.click(page, 'furnished_yes')
+                        await self.waits.dom_settled(page, 'furnished option')
+                    except Exception as e:
+                        print(f"   ⚠️ Furnished option not found or failed: {e}")
+                        print("   ⚠️ Skipping furnished option - continuing with form")
+                    
+                    # Set additional room option (with error handling)
+                    try:
+                        await self.selectors.click(page, 'room_option')
+                        await self.waits.dom_settled(page, 'room option')
+                    except Exception as e:
+                        print(f"   ⚠️ Additional room option failed: {e}")
+                        print("   ⚠️ Skipping additional room option - continuing with form")
+                
+                async with self.metrics.span('description'):
+                    # Fill description
+                    await self.selectors.fill(page, 'description', ad_data['description'])
+                    await self.waits.dom_settled(page, 'description')
+                
+                async with self.metrics.span('tags'):
+                    # Add tags
+                    for tag in ad_data['tags'][:5]:  # Max 5 tags
+                        await self.selectors.fill(page, 'tags_input', tag)
+                        await self.selectors.click(page, 'add_tag_button')
+                        await self.waits.dom_settled(page, f'tag "{tag}" added')
+            
+            async with self.metrics.span('location'):
+                # Type the ad's address and pick the autocomplete suggestion for it
+                await self.selectors.fill(page, 'location_input', ad_data['location'])
+                await self.selectors.click(page, 'location_option', location=ad_data['location'])
+                await self.selectors.click(page, 'location_confirm')
+                await self.waits.dom_settled(page, 'location selected')
+            
+            if not fast_filled:
+                async with self.metrics.span('price'):
+                    # Set price
+                    await self.selectors.fill(page, 'price', ad_data['price'])
+                    await self.waits.dom_settled(page, 'price')
+                
+                async with self.metrics.span('phone'):
+                    # Set phone
+                    await self.selectors.fill(page, 'phone', ad_data['phone'])
+                    await self.waits.dom_settled(page, 'phone')
+            
+            # Photos must be fully uploaded before the package is selected (next in post_ad).
+            # Raises UploadIncomplete (failing this ad) if photos are still missing after the retries
+            if upload:
+                async with self.metrics.span('upload_wait'):
+                    file_input = page.locator('input[type="file"]')
+                    await upload.wait(self.waits, resend=file_input.set_input_files, retries=self.upload_retries)
+            
+            print("   ✅ Form completed")
+        
+    async def start_image_upload(self, page, image_files):
+        """
+        Hand this ad's photos to the form's file input without waiting for the upload to finish.
+        
+        The page uploads them in the background while the rest of the form is filled;
+        the returned watcher is awaited just before the package is selected.
+        
+        Args:
+            page: Playwright page showing the ad form
+            image_files (list): Photo paths for this ad
+            
+        Returns:
+            UploadWatcher for the running upload, or None if no photos were sent
+        """
+        upload = None
+        try:
+            existing_images = [img for img in image_files if os.path.exists(img)]
+            if existing_images:
+                print(f"   📸 Uploading {len(existing_images)} unique images for this ad...")
+                
+                # Shrink the photos first (cached, so only new photos cost any time)
+                if self.preprocess_images:
+                    ad_folder = os.path.dirname(existing_images[0])
+                    existing_images = self.images.prepare(existing_images, ad_folder)
+                
+                # Start following the upload requests before the files are set, so none are missed
+                upload = UploadWatcher(page, existing_images,
+                                       url_pattern=self.upload_url_pattern,
+                                       thumbnail_selector=self.thumbnail_selector,
+                                       base_timeout=self.upload_timeout,
+                                       seconds_per_mb=self.upload_seconds_per_mb,
+                                       fallback_wait=self.upload_fallback_wait)
+                
+                # Direct upload without clicking - find the hidden file input
+                file_input = page.locator('input[type="file"]')
+                await file_input.set_input_files(existing_images)
+                return upload
+            else:
+                ad_folder = image_files[0].split('/')[1] if image_files else "ad1"
+                print(f"   ⚠️ No images found for this ad!")
+                print(f"   💡 Add photos to 'images/{ad_folder}/' folder")
+                print(f"   Expected files: {', '.join([f.split('/')[-1] for f in image_files])}")
+        except Exception as e:
+            print(f"   ⚠️ Image upload failed: {e}")
+            print(f"   💡 Tip: Make sure image files exist and are under 10MB each")
+            if upload:
+                upload.stop()
+        return None
+        
+    async def fill_fields_fast(self, page, ad_data):
+        """
+        Set the radio options, description, tags, price and phone in a single page.evaluate().
+        
+        Args:
+            page: Playwright page showing the ad form
+            ad_data (dict): Ad being posted
+            
+        Returns:
+            bool: True if the fields were filled; False if one wasn't found (the form is left untouched)
+        """
+        async with self.metrics.span('fields_fast'):
+            result = await fill_form_fields(page, ad_data, self.selectors)
+            if not result['ok']:
+                print(f"   ⚠️ Fast fill couldn't find: {', '.join(result['missing'])} - filling field by field")
+                return False
+            await self.waits.dom_settled(page, 'fast-filled fields')
+        print(f"   ⚡ Fast-filled {', '.join(result['filled'])}")
+        return True
+        
+    async def launch_browser(self, playwright):
+        """
+        Launch Chromium with the automation's browser settings.
+        
+        Args:
+            playwright: Started Playwright instance (from async_playwright())
+        """
+        return await playwright.chromium.launch(
+            headless=self.headless,
+            args=[
+                '--disable-blink-features=AutomationControlled',
+                '--no-sandbox',
+                '--disable-dev-shm-usage',
+                '--disable-web-security',
+                '--disable-features=VizDisplayCompositor'
+            ]
+        )
+        
+    async def run_automation(self, browser=None):
+        """
+        Run the complete posting automation for every ad in the catalog.
+        
+        Args:
+            browser: Optional already-running Playwright browser (e.g. the scheduler's warm browser).
+                     If None, a fresh Chromium is launched for this run and closed afterwards.
+        """
+        print(f"🤖 Starting Kijiji Room Posting Automation ({len(self.ads)} ads)")
+        print("=" * 55)
+        print(f"Username: {self.username}")
+        print(f"Catalog: {self.catalog_file}")
+        for ad_number, ad in enumerate(self.ads, 1):
+            print(f"Ad {ad_number}: {ad['title']} - ${ad['price']}")
+        print(f"Headless: {self.headless}")
+        print()
+        
+        # Catch photos reused between ads before spending a run on them
+        if self.config.get('check_duplicate_photos', True):
+            print("🔍 Checking ad photos for near-duplicates...")
+            image_cache_dir = self.config.get('image_cache_dir', '.image_cache')
+            check_duplicate_photos(
+                threshold=self.config.get('duplicate_photo_threshold', 6),
+                index_file=os.path.join(image_cache_dir, 'photo_hashes.json'),
+                # The photos each ad will actually post, wherever they live, plus every variant set
+                photo_sets={ad['name']: ad['images'] for ad in self.ads},
+                variant_cache_dir=os.path.join(image_cache_dir, 'variants')
+            )
+            print()
+        
+        # Fresh counters for this run (the scheduler reuses one instance across runs)
+        self.waits.reset()
+        self.traffic.reset()
+        self.retry.reset()
+        self.selectors.reset()
+        self.limiter.reset()
+        self.metrics.start_run()
+        
+        try:
+            async with self.metrics.run_span():
+                if browser is not None:
+                    # Reuse the caller's already-running browser - it stays open after the run
+                    await self.run_in_browser(browser)
+                    return
+                
+                async with async_playwright() as p:
+                    browser = await self.launch_browser(p)
+                    try:
+                        await self.run_in_browser(browser)
+                    finally:
+                        await browser.close()
+        finally:
+            # Refresh the Prometheus file with this run's timings (failed runs included)
+            self.metrics.export_prometheus()
+            print(f"📈 Step timings logged to {self.metrics.log_dir}/ ({self.metrics.prometheus_file})")
+            self.retry.print_summary()
+            self.limiter.print_summary()
+            # Keep which selectors worked (and how fast) for the next run's candidate order
+            self.selectors.print_summary()
+            self.selectors.save()
+                
+    async def setup_context(self, context):
+        """
+        Prepare a new browser context before any page is opened (routes, listeners).
+        
+        Args:
+            context: Playwright browser context created for this run
+        """
+        # Replay mode answers every request from the recorded archive
+        # (registered first, so the traffic filter's routes fall back to it)
+        await self.har.attach(context)
+        
+        # Drop third-party tracking/ad/font traffic before any page loads
+        if self.traffic_mode in ('block', 'measure'):
+            await self.traffic.attach(context)
+        
+    async def run_in_browser(self, browser):
+        """
+        Run login, deletion and posting in a fresh context of an already-running browser.
+        
+        Args:
+            browser: Playwright browser object - left open when the run finishes
+        """
+        # Pick up an unfinished run of the same catalog where it stopped
+        run_key = f"{self.sync_mode}:{self.catalog_file}:{','.join(ad['name'] for ad in self.ads)}"
+        if self.journal.begin(run_key):
+            print(f"↩️ Resuming unfinished run {self.journal.run_id} (done: {self.journal.describe() or 'nothing'})")
+        
+        # Start from the saved login session if there is a fresh one
+        saved_session = self.sessions.load(self.username) if self.use_saved_session else None
+        if self.har.replaying:
+            # Replays start from the session the recorded run started from, so they take the same path
+            saved_session = self.har.load_state()
+        elif self.har.recording:
+            self.har.save_state(saved_session)
+        
+        context = await browser.new_context(
+            storage_state=saved_session,
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            locale='en-CA',
+            timezone_id='America/Toronto',
+            **self.har.context_options()
+        )
+        
+        await self.setup_context(context)
+        page = await context.new_page()
+        
+        try:
+            # Step 1: Login (skipped when the saved session is still valid)
+            await self.ensure_logged_in(context, page, saved_session)
+            self.journal.step_done('login')
+            
+            # Step 2: Delete existing ads (reconcile mode: only the ones that need reposting)
+            if self.sync_mode == 'reconcile':
+                to_post = await self.reconcile_ads(page)
+            elif self.journal.done('delete_existing_ads'):
+                # The resumed run already cleared the account - its listings now are ads it posted
+                print("⏭️ Old ads were already deleted by this run - skipping deletion")
+                to_post = self.ads
+            else:
+                await self.delete_existing_ads(page)
+                self.journal.step_done('delete_existing_ads')
+                to_post = self.ads
+            
+            # Ads keep their catalog position as their number; ads this run already posted are skipped
+            ads = [(ad, ad_number) for ad_number, ad in enumerate(self.ads, 1)
+                   if ad in to_post and not self.journal.done('post_ad', ad['name'])]
+            if len(ads) < len(to_post):
+                print(f"⏭️ {len(to_post) - len(ads)} ads were already posted by this run - skipping them")
+            if not ads:
+                print("📭 Every catalog ad is live and current - nothing to post")
+            elif self.concurrent_posting:
+                # Step 3: Post every ad at the same time on separate pages
+                await self.post_ads_in_parallel(context, ads)
+            else:
+                # Step 3: Post the ads one after another
+                for ad, ad_number in ads:
+                    await self.post_ad(page, ad, ad_number)
+            
+            print("\n🎉 Posting Automation Completed Successfully!")
+            if self.sync_mode == 'reconcile':
+                print(f"✅ {len(self.ads) - len(ads)} current ads left as they were")
+            else:
+                print("✅ All old ads deleted")
+            for ad, ad_number in ads:
+                print(f"✅ Ad {ad_number} posted: {ad['title']} - ${ad['price']}")
+            
+            await page.screenshot(path=f'{self.screenshot_dir}/04-final-success-{datetime.now().strftime("%H%M%S")}.png')
+            self.journal.finish()
+            self.waits.print_summary()
+            self.traffic.print_summary()
+            
+        except Exception as e:
+            print(f"\n❌ Error during automation: {e}")
+            self.journal.fail(e)
+            print("   ↩️ Completed steps are journaled - the next run resumes from here")
+            await page.screenshot(path=f'{self.screenshot_dir}/error-{datetime.now().strftime("%H%M%S")}.png')
+            raise
+            
+        finally:
+            if not self.headless:
+                print("\n⏱️ Keeping browser open for 5 seconds...")
+                await self.waits.pause(5, 'keep browser open')
+            
+            await context.close()
+            self.har.finish()
+
+async def main():
+    # Optional catalog file argument - overrides catalog_file from the config
+    automation = KijijiPosting(catalog=sys.argv[1] if len(sys.argv) > 1 else None)
+    await automation.run_automation()
+
+if __name__ == "__main__":
+    asyncio.run(main()) 
\ No newline at end of file
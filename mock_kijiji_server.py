@@ -0,0 +1,733 @@
+"""
+Local Mock Kijiji Site for Kijiji Room Rental Automation
+Stands in for Kijiji so the posting flow and speed changes can be checked without a real account
+
+Pages (with the same roles and test IDs the posting scripts target):
+  /login                   - Email/password sign-in form (served for id.kijiji.ca)
+  /                        - Home page with the "My Account" menu and "header-link-post-ad"
+  /m-my-ads/active         - My Ads: a "listing-id-<id>" entry per ad, delete modals (?page=N, page_size per page)
+  /p-select-category       - Post-ad wizard: tips drawer, ad title, Next, category list
+  /p-post-ad               - Ad form: radio options, description, tags, photos, location, price, phone
+  /p-checkout              - Package checkout with "checkout-post-btn"
+  /p-post-ad-success       - Confirmation page (?adId=<new ad ID>)
+
+API:
+  POST   /api/login                 - Start a session
+  GET    /api/my-ads                - List the remaining listing IDs
+  DELETE /api/ads/<id>              - Delete one listing (REST style)
+  POST   /api/graphql               - Delete via {"variables": {"adId": "<id>"}} (GraphQL style)
+  POST   /api/media/upload          - Upload one photo (raw image bytes)
+  GET    /api/locations?q=<text>    - Location autocomplete suggestions
+  POST   /api/ads                   - Save the filled-in form as a draft
+  POST   /api/ads/<draft>/publish   - Post a draft, returns the new ad ID
+
+Every /api request except login and location lookup needs a "session" cookie,
+like the real site's logged-in calls.
+
+Browsers reach the site through route_context(), which answers every
+https://*.kijiji.ca request from the mock, so the posting scripts run unchanged
+against their real URLs. Plain HTTP clients (e.g. fast_delete.py's request
+client) can call the API on the server's own port.
+
+Usage:
+  python mock_kijiji_server.py [port]
+"""
+
+import asyncio
+import html
+import itertools
+import json
+import re
+import secrets
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+WWW = 'https://www.kijiji.ca'
+LOGIN_URL = 'https://id.kijiji.ca/login'
+
+# Addresses the location autocomplete knows about (matched by prefix)
+ADDRESSES = [
+    '138 Chillery Avenue, Scarborough, ON M1K 4T4',
+    '38 Rochman Boulevard, Scarborough, ON M1H 1S1',
+    '1265 Military Trail, Scarborough, ON M1C 1A4',
+    '300 Borough Drive, Scarborough, ON M1P 4P5',
+]
+
+# Radio fields of the ad form, in page order - the posting scripts click
+# "Furnished" by its text and the 6th list item by position
+RADIO_FIELDS = [
+    ('adType', 'Ad type:', False, ['Offering', 'Wanted']),
+    ('forRentBy', 'For rent by:', False, ['Owner', 'Professional']),
+    ('petsAllowed', 'Pet friendly:', True, ['Yes', 'No']),
+    ('smokingPermitted', 'Smoking permitted:', True, ['Yes', 'No']),
+    ('furnished', 'Furnished:', True, ['Yes', 'No']),
+    ('onlyWomen', 'Only women:', True, ['Yes', 'No']),
+]
+
+PAGE_STYLE = """
+body { font-family: sans-serif; margin: 0; }
+header { display: flex; gap: 16px; align-items: center; padding: 12px 24px; background: #373373; }
+header a, header button { color: #fff; }
+main { padding: 24px; max-width: 900px; }
+[hidden] { display: none !important; }
+.form-list { list-style: none; padding: 0; }
+.form-list > li { margin-bottom: 16px; }
+.radio-button-rd { display: inline-block; width: 14px; height: 14px; border: 1px solid #333; border-radius: 50%; }
+[role="dialog"] { position: fixed; top: 20%; left: 30%; padding: 24px; background: #fff; border: 1px solid #333; }
+.listing { display: flex; gap: 16px; align-items: center; border-bottom: 1px solid #ddd; padding: 8px 0; }
+#uploaded-images img { width: 80px; height: 60px; object-fit: cover; }
+"""
+
+
+@dataclass
+class MockResponse:
+    """What the site answers a request with"""
+    status: int
+    content_type: str
+    body: bytes
+    start_session: bool = False
+    delay: float = 0.0
+
+
+def _json(status, payload, **kwargs):
+    return MockResponse(status, 'application/json', json.dumps(payload).encode('utf-8'), **kwargs)
+
+
+def _page(title, body, logged_in, script=''):
+    """Full HTML page with the site header"""
+    if logged_in:
+        account = """
+  <button type="button" id="account-button">My Account</button>
+  <nav id="account-menu" hidden><a href="/m-my-ads/active">My Ads</a></nav>"""
+    else:
+        account = f'\n  <a href="{LOGIN_URL}">Sign In</a>'
+    document = f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{html.escape(title)} | Kijiji (mock)</title><style>{PAGE_STYLE}</style></head>
+<body>
+<header>
+  <a href="/">Kijiji</a>{account}
+  <a data-testid="header-link-post-ad" href="/p-select-category">Post ad</a>
+</header>
+<main>
+{body}
+</main>
+<script>
+const accountButton = document.getElementById('account-button');
+if (accountButton) {{
+  accountButton.addEventListener('click', () => {{
+    const menu = document.getElementById('account-menu');
+    menu.hidden = !menu.hidden;
+  }});
+}}
+{script}
+</script>
+</body>
+</html>"""
+    return MockResponse(200, 'text/html; charset=utf-8', document.encode('utf-8'))
+
+
+class MockKijijiSite:
+    """
+    In-memory Kijiji: listings, drafts, uploads and the pages that drive them.
+
+    respond() is shared by the HTTP server and route_context(), so both see
+    the same listings. Byte and request counters cover every request served.
+    """
+
+    def __init__(self, listings=None, upload_delay=0.0, page_size=20):
+        """
+        Args:
+            listings: Listing IDs (or {id: title}) the mock account starts with
+            upload_delay (float): Seconds each photo upload takes to "process"
+            page_size (int): Listings per My Ads page (a "Next" link leads to the rest)
+        """
+        self.lock = threading.Lock()
+        if isinstance(listings, dict):
+            self.listings = {str(ad_id): title for ad_id, title in listings.items()}
+        else:
+            self.listings = {str(ad_id): f'Old listing {ad_id}' for ad_id in (listings or [])}
+        self.deleted = []
+        self.posted = []
+        self.drafts = {}
+        self.uploads = {}
+        self.upload_delay = upload_delay
+        self.page_size = page_size
+        self._ids = itertools.count(int(time.time()))
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the traffic counters"""
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def stats(self):
+        """Requests served and bytes received/sent since the last reset_stats()"""
+        return {'requests': self.requests, 'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out}
+
+    def new_id(self):
+        return str(next(self._ids))
+
+    @staticmethod
+    def new_session_token():
+        return secrets.token_hex(16)
+
+    # =================================================================
+    # REQUEST DISPATCH
+    # =================================================================
+
+    def respond(self, method, path, body=b'', logged_in=False):
+        """
+        Answer one request.
+
+        Args:
+            method (str): HTTP method
+            path (str): Path plus query string, e.g. "/api/locations?q=138"
+            body (bytes): Request body
+            logged_in (bool): Whether the request carried a session cookie
+
+        Returns:
+            MockResponse
+        """
+        url = urlparse(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.startswith('/api/'):
+            response = self._api(method, url.path, query, body or b'', logged_in)
+        elif method == 'GET':
+            response = self._html(url.path, query, logged_in)
+        else:
+            response = _json(405, {'error': 'method not allowed'})
+        with self.lock:
+            self.requests += 1
+            self.bytes_in += len(body or b'')
+            self.bytes_out += len(response.body)
+        return response
+
+    def _api(self, method, path, query, body, logged_in):
+        if method == 'POST' and path == '/api/login':
+            return self._login(body)
+        if method == 'GET' and path == '/api/locations':
+            prefix = query.get('q', '').strip().lower()
+            matches = [a for a in ADDRESSES if prefix and a.lower().startswith(prefix)]
+            return _json(200, {'locations': matches})
+        if not logged_in:
+            return _json(401, {'error': 'not logged in'})
+
+        if method == 'GET' and path == '/api/my-ads':
+            with self.lock:
+                return _json(200, {'listings': sorted(self.listings)})
+        if method == 'POST' and path == '/api/graphql':
+            return self._graphql_delete(body)
+        if method == 'POST' and path == '/api/media/upload':
+            return self._upload(body)
+        if method == 'POST' and path == '/api/ads':
+            return self._save_draft(body)
+        match = re.fullmatch(r'/api/ads/(\w+)/publish', path)
+        if method == 'POST' and match:
+            return self._publish(match.group(1))
+        match = re.fullmatch(r'/api/ads/(\w+)', path)
+        if method == 'DELETE' and match:
+            if self._delete_listing(match.group(1)):
+                return _json(200, {'deleted': match.group(1)})
+            return _json(404, {'error': f'ad {match.group(1)} not found'})
+        return _json(404, {'error': 'not found'})
+
+    def _html(self, path, query, logged_in):
+        if path == '/login':
+            return self._login_page()
+        if path == '/':
+            return _page('Home', '<h1>Buy and sell in Toronto</h1>', logged_in)
+        pages = {
+            '/m-my-ads/active': self._my_ads_page,
+            '/p-select-category': self._select_category_page,
+            '/p-post-ad': self._post_ad_page,
+            '/p-checkout': self._checkout_page,
+            '/p-post-ad-success': self._success_page,
+        }
+        if path not in pages:
+            return MockResponse(404, 'text/html; charset=utf-8', b'<h1>Page not found</h1>')
+        if not logged_in:
+            # Logged-out visits bounce to the sign-in site, like the real one
+            return _page('Redirecting', '<p>Please sign in.</p>', False,
+                         f"location.replace('{LOGIN_URL}');")
+        return pages[path](query)
+
+    # =================================================================
+    # API HANDLERS
+    # =================================================================
+
+    def _login(self, body):
+        try:
+            credentials = json.loads(body or b'{}')
+        except ValueError:
+            credentials = {}
+        if not credentials.get('email') or not credentials.get('password'):
+            return _json(401, {'error': 'invalid credentials'})
+        return _json(200, {'ok': True}, start_session=True)
+
+    def _delete_listing(self, ad_id):
+        with self.lock:
+            if ad_id not in self.listings:
+                return False
+            del self.listings[ad_id]
+            self.deleted.append(ad_id)
+            return True
+
+    def _graphql_delete(self, body):
+        try:
+            ad_id = str(json.loads(body or b'{}')['variables']['adId'])
+        except (ValueError, KeyError, TypeError):
+            return _json(400, {'errors': [{'message': 'bad request'}]})
+        # GraphQL reports failures with a 200 status and an "errors" field
+        if self._delete_listing(ad_id):
+            return _json(200, {'data': {'deleteAd': {'id': ad_id}}})
+        return _json(200, {'errors': [{'message': f'ad {ad_id} not found'}]})
+
+    def _upload(self, body):
+        if not body:
+            return _json(400, {'error': 'empty upload'})
+        media_id = self.new_id()
+        with self.lock:
+            self.uploads[media_id] = len(body)
+        return _json(200, {'id': media_id, 'size': len(body)}, delay=self.upload_delay)
+
+    def _save_draft(self, body):
+        try:
+            ad = json.loads(body or b'{}')
+        except ValueError:
+            return _json(400, {'error': 'bad request'})
+        missing = [field for field in ('title', 'description', 'price', 'location') if not ad.get(field)]
+        if missing:
+            return _json(400, {'error': f"missing: {', '.join(missing)}"})
+        draft_id = self.new_id()
+        with self.lock:
+            self.drafts[draft_id] = ad
+        return _json(200, {'draftId': draft_id})
+
+    def _publish(self, draft_id):
+        with self.lock:
+            ad = self.drafts.pop(draft_id, None)
+            if ad is None:
+                return _json(404, {'error': f'draft {draft_id} not found'})
+            ad_id = self.new_id()
+            self.listings[ad_id] = ad['title']
+            self.posted.append({'id': ad_id, **ad})
+        return _json(200, {'adId': ad_id})
+
+    # =================================================================
+    # PAGES
+    # =================================================================
+
+    def _login_page(self):
+        body = """
+<h1>Sign in to Kijiji</h1>
+<form id="login-form">
+  <label for="email">Email Address</label>
+  <input id="email" name="email" type="email" autocomplete="username">
+  <a href="#forgot">Forgot Password?</a>
+  <label for="password">Password</label>
+  <input id="password" name="password" type="password" autocomplete="current-password">
+  <button type="submit">Sign in</button>
+</form>
+<p id="login-error" role="alert" hidden>Invalid email or password</p>"""
+        script = f"""
+document.getElementById('login-form').addEventListener('submit', async (event) => {{
+  event.preventDefault();
+  const response = await fetch('/api/login', {{
+    method: 'POST',
+    headers: {{'Content-Type': 'application/json'}},
+    body: JSON.stringify({{email: document.getElementById('email').value,
+                          password: document.getElementById('password').value}}),
+  }});
+  if (response.ok) {{
+    location.href = '{WWW}/';
+  }} else {{
+    document.getElementById('login-error').hidden = false;
+  }}
+}});"""
+        return _page('Sign in', body, False, script)
+
+    def _my_ads_page(self, query):
+        with self.lock:
+            listings = sorted(self.listings.items())
+        # Paged like the real site - deleting ads moves later ones up onto earlier pages
+        pages = max(1, -(-len(listings) // self.page_size))
+        try:
+            page_number = min(max(1, int(query.get('page', 1))), pages)
+        except ValueError:
+            page_number = 1
+        listings = listings[(page_number - 1) * self.page_size:page_number * self.page_size]
+        pagination = f'<p>Page {page_number} of {pages}</p>'
+        if page_number < pages:
+            pagination += (f'<a rel="next" data-testid="pagination-next" '
+                           f'href="/m-my-ads/active?page={page_number + 1}">Next</a>')
+        if listings:
+            rows = '\n'.join(
+                f'<div class="listing" data-testid="listing-id-{ad_id}">'
+                f'<h3>{html.escape(title)}</h3>'
+                f'<button type="button" data-testid="adDeleteButton" data-ad-id="{ad_id}">Delete</button></div>'
+                for ad_id, title in listings)
+        else:
+            rows = '<p>You have no active ads.</p>'
+        body = f"""
+<h1>My Ads</h1>
+<div id="listings">
+{rows}
+</div>
+<nav class="pagination">{pagination}</nav>
+<div id="delete-modal" role="dialog" hidden>
+  <h2>Why are you deleting this ad?</h2>
+  <button type="button" class="reason">Sold on Kijiji</button>
+  <button type="button" class="reason">Sold somewhere else</button>
+  <button type="button" class="reason">Prefer not to say</button>
+  <button type="button" id="confirm-delete" disabled>Delete My Ad</button>
+</div>
+<div id="deleted-modal" role="dialog" hidden>
+  <p>Your ad has been deleted.</p>
+  <button type="button" data-testid="ModalCloseButton">Close</button>
+</div>"""
+        script = """
+const deleteModal = document.getElementById('delete-modal');
+const deletedModal = document.getElementById('deleted-modal');
+const confirmDelete = document.getElementById('confirm-delete');
+let pendingId = null;
+document.querySelectorAll('[data-testid="adDeleteButton"]').forEach(button => {
+  button.addEventListener('click', () => {
+    pendingId = button.dataset.adId;
+    confirmDelete.disabled = true;
+    deleteModal.hidden = false;
+  });
+});
+document.querySelectorAll('.reason').forEach(button => {
+  button.addEventListener('click', () => { confirmDelete.disabled = false; });
+});
+confirmDelete.addEventListener('click', async () => {
+  const response = await fetch(`/api/ads/${pendingId}`, {method: 'DELETE'});
+  deleteModal.hidden = true;
+  if (response.ok) {
+    document.querySelector(`[data-testid="listing-id-${pendingId}"]`).remove();
+    deletedModal.hidden = false;
+  }
+});
+document.querySelector('[data-testid="ModalCloseButton"]').addEventListener('click', () => {
+  deletedModal.hidden = true;
+});"""
+        return _page('My Ads', body, True, script)
+
+    def _select_category_page(self, query):
+        body = """
+<h1>Post ad</h1>
+<div id="drawer" data-testid="drawer">
+  <p>Tip: ads with clear photos get more replies.</p>
+  <button type="button" data-testid="drawer-close-button">Close</button>
+</div>
+<label for="AdTitleForm">Ad title</label>
+<input id="AdTitleForm" name="title" maxlength="64">
+<button type="button" id="next" disabled>Next</button>
+<div id="categories" hidden>
+  <button type="button" data-category="36">Room Rentals &amp; Roommates Real Estate</button>
+  <button type="button" data-category="37">Long Term Rentals Real Estate</button>
+  <button type="button" data-category="38">Short Term Rentals Real Estate</button>
+</div>"""
+        script = """
+const titleInput = document.getElementById('AdTitleForm');
+const next = document.getElementById('next');
+document.querySelector('[data-testid="drawer-close-button"]').addEventListener('click', () => {
+  document.getElementById('drawer').hidden = true;
+});
+titleInput.addEventListener('input', () => { next.disabled = titleInput.value.trim().length < 8; });
+next.addEventListener('click', () => { document.getElementById('categories').hidden = false; });
+document.querySelectorAll('[data-category]').forEach(button => {
+  button.addEventListener('click', () => {
+    const params = new URLSearchParams({categoryId: button.dataset.category, title: titleInput.value});
+    location.href = `/p-post-ad?${params}`;
+  });
+});"""
+        return _page('Post ad', body, True, script)
+
+    def _post_ad_page(self, query):
+        radios = []
+        for name, label, optional, options in RADIO_FIELDS:
+            optional_label = '\n    <label class="optional">(optional)</label>' if optional else ''
+            choices = '\n'.join(
+                f'      <label><input type="radio" name="{name}" value="{value}">'
+                f'<span class="radio-button-rd"></span> {value}</label>'
+                for value in options)
+            radios.append(f"""<li>
+  <div class="radio-button-container">
+    <label class="field-label">{label}</label>{optional_label}
+    <div class="form-section">
+{choices}
+    </div>
+  </div>
+</li>""")
+        body = f"""
+<h1>Ad details</h1>
+<p>Title: <strong id="ad-title">{html.escape(query.get('title', ''))}</strong></p>
+<ul class="form-list">
+{chr(10).join(radios)}
+<li>
+  <label for="pstad-descrptn">Description:</label>
+  <textarea id="pstad-descrptn" rows="8" cols="80"></textarea>
+</li>
+<li>
+  <label for="pstad-tagsInput">Tags: (optional)</label>
+  <input id="pstad-tagsInput">
+  <button type="button" id="add-tag">Add</button>
+  <ul id="tag-list"></ul>
+</li>
+<li>
+  <label for="image-input">Photos</label>
+  <input id="image-input" type="file" accept="image/*" multiple>
+  <ul id="uploaded-images" data-testid="uploaded-images"></ul>
+</li>
+<li>
+  <label for="location">Location</label>
+  <div id="FESLocationModuleWrapper">
+    <input id="location" autocomplete="off"><span class="location-pin">Use this location</span>
+    <ul id="location-options" role="listbox" hidden></ul>
+  </div>
+</li>
+<li>
+  <label for="PriceAmount">Price</label>
+  <input id="PriceAmount" inputmode="decimal">
+</li>
+<li>
+  <span>Phone number (optional)</span>
+  <input id="phone" type="tel" placeholder="e.g. 123 456 7890">
+</li>
+</ul>
+<h2>Select a package</h2>
+<div class="package">
+  <h3>Basic</h3><p>Free</p>
+  <button type="button" data-testid="package-0-bottom-select">Select</button>
+</div>
+<p id="form-error" role="alert" hidden></p>"""
+        script = f"""
+const categoryId = {json.dumps(query.get('categoryId', ''))};
+const adTitle = {json.dumps(query.get('title', ''))};
+const tags = [];
+const mediaIds = [];
+let selectedLocation = '';
+
+document.getElementById('add-tag').addEventListener('click', () => {{
+  const input = document.getElementById('pstad-tagsInput');
+  const tag = input.value.trim();
+  if (tag && tags.length < 5 && !tags.includes(tag)) {{
+    tags.push(tag);
+    const item = document.createElement('li');
+    item.textContent = tag;
+    document.getElementById('tag-list').appendChild(item);
+  }}
+  input.value = '';
+}});
+
+document.getElementById('image-input').addEventListener('change', (event) => {{
+  for (const file of event.target.files) {{
+    fetch('/api/media/upload', {{method: 'POST', headers: {{'Content-Type': file.type || 'application/octet-stream'}}, body: file}})
+      .then(response => response.ok ? response.json() : Promise.reject(response.status))
+      .then(media => {{
+        mediaIds.push(media.id);
+        const item = document.createElement('li');
+        item.dataset.testid = 'image-thumbnail';
+        const image = document.createElement('img');
+        image.alt = file.name;
+        image.src = URL.createObjectURL(file);
+        item.appendChild(image);
+        document.getElementById('uploaded-images').appendChild(item);
+      }})
+      .catch(() => {{}});
+  }}
+}});
+
+const locationInput = document.getElementById('location');
+const locationOptions = document.getElementById('location-options');
+let lookupTimer = null;
+locationInput.addEventListener('input', () => {{
+  clearTimeout(lookupTimer);
+  lookupTimer = setTimeout(async () => {{
+    const response = await fetch(`/api/locations?q=${{encodeURIComponent(locationInput.value)}}`);
+    const {{locations}} = await response.json();
+    locationOptions.innerHTML = '';
+    for (const address of locations) {{
+      const option = document.createElement('li');
+      option.setAttribute('role', 'option');
+      option.textContent = address;
+      option.addEventListener('click', () => {{
+        selectedLocation = address;
+        locationInput.value = address;
+        locationOptions.hidden = true;
+      }});
+      locationOptions.appendChild(option);
+    }}
+    locationOptions.hidden = locations.length === 0;
+  }}, 150);
+}});
+
+document.querySelector('[data-testid="package-0-bottom-select"]').addEventListener('click', async () => {{
+  const options = {{}};
+  document.querySelectorAll('input[type="radio"]:checked').forEach(radio => {{ options[radio.name] = radio.value; }});
+  const response = await fetch('/api/ads', {{
+    method: 'POST',
+    headers: {{'Content-Type': 'application/json'}},
+    body: JSON.stringify({{
+      title: adTitle, categoryId, options, tags, mediaIds,
+      description: document.getElementById('pstad-descrptn').value,
+      location: selectedLocation,
+      price: document.getElementById('PriceAmount').value,
+      phone: document.getElementById('phone').value,
+    }}),
+  }});
+  const result = await response.json();
+  if (response.ok) {{
+    location.href = `/p-checkout?draftId=${{result.draftId}}`;
+  }} else {{
+    const error = document.getElementById('form-error');
+    error.textContent = result.error;
+    error.hidden = false;
+  }}
+}});"""
+        return _page('Ad details', body, True, script)
+
+    def _checkout_page(self, query):
+        body = """
+<h1>Checkout</h1>
+<p>Basic package - Free</p>
+<button type="button" data-testid="checkout-post-btn">Post Your Ad</button>"""
+        script = f"""
+document.querySelector('[data-testid="checkout-post-btn"]').addEventListener('click', async () => {{
+  const response = await fetch('/api/ads/{quote(query.get('draftId', ''))}/publish', {{method: 'POST'}});
+  if (response.ok) {{
+    const result = await response.json();
+    location.href = `/p-post-ad-success?adId=${{result.adId}}`;
+  }}
+}});"""
+        return _page('Checkout', body, True, script)
+
+    def _success_page(self, query):
+        ad_id = html.escape(query.get('adId', ''))
+        body = f"""
+<h1>Your ad is posted!</h1>
+<p>Ad ID: <span data-testid="posted-ad-id">{ad_id}</span></p>
+<a href="/v-room-rental/{ad_id}">View your ad</a>"""
+        return _page('Ad posted', body, True)
+
+
+# =================================================================
+# SERVING THE SITE
+# =================================================================
+
+class MockKijijiHandler(BaseHTTPRequestHandler):
+    """HTTP front end for MockKijijiSite - state lives on self.server.site"""
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _handle(self, method):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        logged_in = 'session=' in self.headers.get('Cookie', '')
+        response = self.server.site.respond(method, self.path, body, logged_in)
+        if response.delay:
+            time.sleep(response.delay)
+
+        self.send_response(response.status)
+        self.send_header('Content-Type', response.content_type)
+        self.send_header('Content-Length', str(len(response.body)))
+        if response.start_session:
+            self.send_header('Set-Cookie', f'session={self.server.site.new_session_token()}; Path=/; HttpOnly')
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+async def route_context(context, site):
+    """
+    Serve every *.kijiji.ca request of a browser context from the mock site.
+
+    Register this before other routes (e.g. the traffic filter) - routes added
+    later run first and fall back to this one. Anything outside kijiji.ca is
+    aborted so benchmark runs never touch the network.
+
+    Args:
+        context: Playwright browser context
+        site (MockKijijiSite): The site to serve (server.site from start_server)
+    """
+    async def handle(route, request):
+        url = urlparse(request.url)
+        host = url.hostname or ''
+        if host != 'kijiji.ca' and not host.endswith('.kijiji.ca'):
+            await route.abort('blockedbyclient')
+            return
+
+        # The browser's own cookie jar decides whether the request is logged in
+        cookies = await context.cookies(request.url)
+        logged_in = any(cookie['name'] == 'session' for cookie in cookies)
+        path = url.path + (f'?{url.query}' if url.query else '')
+        response = site.respond(request.method, path, request.post_data_buffer or b'', logged_in)
+        if response.delay:
+            await asyncio.sleep(response.delay)
+        if response.start_session:
+            await context.add_cookies([{
+                'name': 'session', 'value': site.new_session_token(),
+                'domain': '.kijiji.ca', 'path': '/', 'secure': True, 'httpOnly': True,
+            }])
+        await route.fulfill(status=response.status, content_type=response.content_type, body=response.body)
+
+    await context.route('**/*', handle)
+
+
+def start_server(host='127.0.0.1', port=8765, listings=None, verbose=False, upload_delay=0.0, page_size=20):
+    """
+    Start the mock server on a background thread.
+
+    Args:
+        port (int): Port to listen on (0 picks a free one)
+        listings: Listing IDs (or {id: title}) the mock account starts with
+        upload_delay (float): Seconds each photo upload takes
+        page_size (int): Listings per My Ads page
+
+    Returns:
+        tuple: (server, base_url) - server.site holds the state; call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer((host, port), MockKijijiHandler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    server.site = MockKijijiSite(listings, upload_delay=upload_delay, page_size=page_size)
+    # Shortcuts to the site's state
+    server.listings = server.site.listings
+    server.deleted = server.site.deleted
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server, base_url = start_server(port=port, listings=['1001', '1002', '1003'], verbose=True)
+    print(f"🧪 Mock Kijiji server running at {base_url} (Ctrl+C to stop)")
+    print("   Pages use kijiji.ca URLs - load them in a browser through route_context()")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\n🛑 Mock server stopped")
+
+
+if __name__ == "__main__":
+    main()
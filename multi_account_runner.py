@@ -0,0 +1,228 @@
+"""
+Multi-Account Runner for Kijiji Room Rental Automation
+Posts ads for several Kijiji accounts in parallel, one Chromium per worker process
+
+Usage:
+  python multi_account_runner.py accounts.json            - Run every account in the manifest
+  python multi_account_runner.py accounts.json 4          - Same, with 4 worker processes
+"""
+
+import asyncio
+import json
+import multiprocessing
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from ad_catalog import load_catalog
+from kijiji_dual_posting import KijijiDualPosting
+from kijiji_triple_posting import KijijiTriplePosting
+
+# Which catalog preset each account posts (an account's "catalog" file overrides it)
+STRATEGIES = {
+    'dual': KijijiDualPosting,
+    'triple': KijijiTriplePosting,
+}
+
+
+def load_manifest(manifest_file):
+    """
+    Load and check the accounts manifest.
+
+    Manifest format (see accounts.example.json):
+    {
+        "workers": 2,
+        "defaults": {"headless": true},
+        "accounts": [
+            {"username": "...", "password": "...", "strategy": "triple",
+             "ads": {"ad1": {"price": "550"}}, "images": {"ad1": ["images/ad1/room_main.png"]}},
+            {"username": "...", "password": "...", "catalog": "catalogs/downtown.json"}
+        ]
+    }
+
+    Every account's catalog is loaded and validated here, so a bad ad stops the
+    run before any worker starts.
+    """
+    with open(manifest_file, 'r') as f:
+        manifest = json.load(f)
+
+    accounts = manifest.get('accounts', [])
+    if not accounts:
+        raise ValueError(f"No accounts found in {manifest_file}")
+
+    for index, account in enumerate(accounts, 1):
+        if not account.get('username') or not account.get('password'):
+            raise ValueError(f"Account #{index} in {manifest_file} needs a username and password")
+        strategy = account.get('strategy', 'dual')
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Account #{index} has unknown strategy '{strategy}' "
+                             f"(expected one of: {', '.join(STRATEGIES)})")
+        load_account_catalog(account, manifest.get('defaults'))
+    return manifest
+
+
+def account_slug(username):
+    """Filesystem-safe name for an account (used for its screenshot folder)"""
+    return re.sub(r'[^a-zA-Z0-9]+', '-', username.split('@')[0]).strip('-').lower() or 'account'
+
+
+def account_config(account, defaults=None):
+    """The account's settings layered over the manifest defaults"""
+    config = dict(defaults or {})
+    config.update(account.get('config', {}))
+    config['username'] = account['username']
+    config['password'] = account['password']
+    config.setdefault('screenshot_dir', f"screenshots/{account_slug(account['username'])}")
+    if account.get('catalog'):
+        config['catalog_file'] = account['catalog']
+    return config
+
+
+def load_account_catalog(account, defaults=None):
+    """
+    Load and validate the ads one account posts.
+
+    The account's ad/image overrides (by ad name) are merged into its catalog's ads.
+
+    Raises:
+        CatalogError: If the catalog or an overridden ad is invalid
+    """
+    config = account_config(account, defaults)
+    strategy = STRATEGIES[account.get('strategy', 'dual')]
+    overrides = {name: dict(fields) for name, fields in account.get('ads', {}).items()}
+    for name, images in account.get('images', {}).items():
+        overrides.setdefault(name, {})['images'] = list(images)
+    return load_catalog(config.get('catalog_file', strategy.default_catalog), overrides,
+                        check_images=not config.get('variant_source_dir'))
+
+
+def build_automation(account, defaults=None):
+    """
+    Create the posting automation for one account.
+
+    The account's settings are layered over the manifest defaults, and its
+    ad/image overrides are applied on top of its catalog's ads.
+    """
+    config = account_config(account, defaults)
+    catalog = load_account_catalog(account, defaults)
+    return STRATEGIES[account.get('strategy', 'dual')](config=config, catalog=catalog)
+
+
+def run_account(account, defaults=None):
+    """
+    Worker entry point: run the full posting flow for one account.
+
+    Runs in its own process with its own event loop and Chromium instance.
+    Never raises - failures are reported in the returned summary instead.
+    """
+    started = time.perf_counter()
+    result = {
+        'username': account['username'],
+        'strategy': account.get('strategy', 'dual'),
+        'ok': False,
+        'error': None,
+    }
+    try:
+        automation = build_automation(account, defaults)
+        asyncio.run(automation.run_automation())
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = str(e)
+    result['elapsed'] = round(time.perf_counter() - started, 1)
+    return result
+
+
+def run_all(manifest, workers=None):
+    """
+    Fan the manifest's accounts out across a process pool.
+
+    Args:
+        manifest (dict): Loaded accounts manifest
+        workers (int): Worker process count (defaults to manifest "workers", then 2)
+
+    Returns:
+        dict: Summary with one result per account, in manifest order
+    """
+    accounts = manifest['accounts']
+    defaults = manifest.get('defaults', {})
+    workers = max(1, min(workers or manifest.get('workers', 2), len(accounts)))
+
+    print("🤖 Kijiji Multi-Account Runner")
+    print(f"{'='*50}")
+    print(f"👥 Accounts: {len(accounts)}")
+    print(f"⚙️ Workers: {workers}")
+    print(f"⏰ Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*50}\n")
+
+    started_at = datetime.now().isoformat(timespec='seconds')
+    started = time.perf_counter()
+    results = [None] * len(accounts)
+
+    # "spawn" gives every worker a clean interpreter - Playwright's driver
+    # and event loop don't survive being forked from a parent process
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(run_account, account, defaults): index
+                   for index, account in enumerate(accounts)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                # Worker process itself died (e.g. killed by the OS)
+                results[index] = {'username': accounts[index]['username'],
+                                  'strategy': accounts[index].get('strategy', 'dual'),
+                                  'ok': False, 'error': f'worker crashed: {e}', 'elapsed': None}
+            status = "✅" if results[index]['ok'] else "❌"
+            print(f"{status} {results[index]['username']} finished")
+
+    return {
+        'started': started_at,
+        'workers': workers,
+        'elapsed': round(time.perf_counter() - started, 1),
+        'succeeded': sum(1 for r in results if r['ok']),
+        'failed': sum(1 for r in results if not r['ok']),
+        'accounts': results,
+    }
+
+
+def print_summary(summary):
+    """Print the per-account results table"""
+    print(f"\n📊 Multi-Account Summary ({summary['elapsed']}s total)")
+    print("-" * 70)
+    for result in summary['accounts']:
+        status = "✅ OK  " if result['ok'] else "❌ FAIL"
+        elapsed = f"{result['elapsed']}s" if result['elapsed'] is not None else "-"
+        print(f"{status} | {result['username']:<30} | {result['strategy']:<6} | {elapsed}")
+        if result['error']:
+            print(f"       └─ {result['error']}")
+    print("-" * 70)
+    print(f"✅ {summary['succeeded']} succeeded, ❌ {summary['failed']} failed")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("🤖 Kijiji Multi-Account Runner")
+        print("Usage:")
+        print("  python multi_account_runner.py accounts.json [workers]")
+        print("  Example: python multi_account_runner.py accounts.json 4")
+        return
+
+    manifest = load_manifest(sys.argv[1])
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    summary = run_all(manifest, workers)
+    print_summary(summary)
+
+    summary_file = f"multi_account_summary-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"💾 Summary saved to {summary_file}")
+
+    sys.exit(0 if summary['failed'] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
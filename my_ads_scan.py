@@ -0,0 +1,166 @@
+"""
+Paginated My Ads Scanner for Kijiji Room Rental Automation
+Walks every page (or infinite-scroll batch) of My Ads and streams the listings as it goes
+
+Reading only the first My Ads page silently missed the listings of accounts with more
+ads than fit on it. MyAdsScanner reads each page with ONE page.evaluate() - every
+listing's ID and text, plus how to reach the next page - without changing the page.
+Only once the caller is done with those listings does it move on:
+- follows the "Next" link (a[rel="next"] / pagination-next), or
+- clicks a "Load more" style button, or
+- scrolls to the bottom and waits for more listings to render (infinite scroll),
+until a page brings nothing new.
+
+stream() is an async generator yielding each page's new listings as soon as they are
+read. The page only advances when the caller asks for the next batch, so its deletions
+for the current page are dispatched (and UI deletions done) while that page is shown.
+
+Deleting ads moves later listings up onto earlier pages, so a deleting caller asks for
+rescan=True: the scan starts over from the first page until a full pass finds no
+listing it hasn't already yielded.
+"""
+
+# Element leading to the next page of listings (a link is followed, anything else clicked)
+DEFAULT_NEXT_SELECTOR = 'a[rel="next"], [data-testid="pagination-next"], [data-testid="load-more"]'
+
+# Runs in the page, read-only: every listing on it, what leads to the next page, and
+# whether there is anything below to scroll to. Receives the next-page selector.
+SCAN_PAGE_SCRIPT = """
+(nextSelector) => {
+    const listings = [...document.querySelectorAll('[data-testid^="listing-id-"]')]
+        .map(el => ({id: el.getAttribute('data-testid'), text: el.innerText || el.textContent || ''}));
+    const next = document.querySelector(nextSelector);
+    let nextHref = null, canClick = false;
+    if (next && !next.disabled && next.getAttribute('aria-disabled') !== 'true') {
+        if (next.tagName === 'A' && next.href) {
+            nextHref = next.href;
+        } else {
+            canClick = true;
+        }
+    }
+    const canScroll = window.scrollY + window.innerHeight < document.documentElement.scrollHeight - 1;
+    return {listings, nextHref, canClick, canScroll};
+}
+"""
+
+# Runs in the page: click the load-more button (or scroll to the bottom when there is
+# none). Returns whether anything was done.
+ADVANCE_SCRIPT = """
+(nextSelector) => {
+    const next = document.querySelector(nextSelector);
+    if (next && !next.disabled && next.getAttribute('aria-disabled') !== 'true' && next.tagName !== 'A') {
+        next.click();
+        return true;
+    }
+    const before = window.scrollY;
+    window.scrollTo(0, document.documentElement.scrollHeight);
+    return window.scrollY > before;
+}
+"""
+
+
+class MyAdsScanner:
+    """Reads every listing on the account's My Ads pages"""
+
+    def __init__(self, page, waits, next_selector=DEFAULT_NEXT_SELECTOR, max_pages=100):
+        """
+        Args:
+            page: Playwright page showing the first My Ads page
+            waits (WaitEngine): Used to wait for pages/batches to render
+            next_selector (str): CSS selector of the next-page link or load-more button
+            max_pages (int): Safety limit on pages read per pass
+        """
+        self.page = page
+        self.waits = waits
+        self.next_selector = next_selector
+        self.max_pages = max_pages
+        self.pages_read = 0
+
+    async def _read_page(self):
+        self.pages_read += 1
+        return await self.page.evaluate(SCAN_PAGE_SCRIPT, self.next_selector)
+
+    async def _advance(self, result):
+        """
+        Move on from the page a read returned: follow its next link, or load/scroll to more.
+
+        Returns:
+            bool: False if there was nowhere to go
+        """
+        if result['nextHref']:
+            await self.page.goto(result['nextHref'], wait_until='domcontentloaded')
+            await self.waits.dom_settled(self.page, 'next My Ads page', quiet_ms=500)
+            return True
+        if (result['canClick'] or result['canScroll']) and await self.page.evaluate(ADVANCE_SCRIPT, self.next_selector):
+            # Load more / infinite scroll - the next read stops once nothing new rendered
+            await self.waits.dom_settled(self.page, 'more listings', quiet_ms=500)
+            return True
+        return False
+
+    async def _pass(self, seen):
+        """One walk over all pages - yields the listings not seen before, page by page"""
+        for _ in range(self.max_pages):
+            result = await self._read_page()
+            new = [listing for listing in result['listings'] if listing['id'] not in seen]
+            seen.update(listing['id'] for listing in new)
+            if new:
+                # The page stays put until the caller has dealt with these listings
+                yield new
+
+            # Same-page loading (load more / scroll) is only worth it while it brings new listings
+            if not (result['nextHref'] or new) or not await self._advance(result):
+                return
+
+    async def stream(self, rescan=False, before_rescan=None):
+        """
+        Yield lists of listings ({'id': 'listing-id-...', 'text': '...'}), one per page read.
+
+        Args:
+            rescan (bool): Start over from the first page after a pass that found anything,
+                           until a pass finds nothing new (for callers deleting as they go)
+            before_rescan: Coroutine function awaited before each new pass (e.g. to let
+                           background deletions finish so the pages have shifted)
+        """
+        first_page = self.page.url
+        seen = set()
+        while True:
+            found = False
+            async for listings in self._pass(seen):
+                found = True
+                yield listings
+            if not (rescan and found):
+                return
+            if before_rescan is not None:
+                await before_rescan()
+            await self.page.goto(first_page, wait_until='domcontentloaded')
+            await self.waits.dom_settled(self.page, 'My Ads listings rendered', quiet_ms=500)
+
+    async def show(self, listing_id, first_page):
+        """
+        Bring up the page holding a listing, e.g. to delete it through the UI.
+
+        Args:
+            listing_id (str): Listing test ID, e.g. "listing-id-1234567890"
+            first_page (str): URL of the first My Ads page, where the search starts over
+
+        Returns:
+            bool: True if the listing is now on screen
+        """
+        if await self.page.locator(f'[data-testid="{listing_id}"]').count():
+            return True
+        await self.page.goto(first_page, wait_until='domcontentloaded')
+        await self.waits.dom_settled(self.page, 'My Ads listings rendered', quiet_ms=500)
+        for _ in range(self.max_pages):
+            result = await self._read_page()
+            if any(listing['id'] == listing_id for listing in result['listings']):
+                return True
+            if not await self._advance(result):
+                return False
+        return False
+
+    async def all_listings(self):
+        """Every listing on every page, in one list"""
+        listings = []
+        async for batch in self.stream():
+            listings.extend(batch)
+        return listings
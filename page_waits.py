@@ -0,0 +1,218 @@
+"""
+Event-Driven Wait Engine for Kijiji Room Rental Automation
+Replaces fixed asyncio.sleep() delays with waits on real readiness signals
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+# JavaScript run inside the page: resolves once no DOM mutation has been seen
+# for `quiet` milliseconds, or once `limit` milliseconds have passed
+DOM_SETTLED_SCRIPT = """
+([quiet, limit]) => new Promise(resolve => {
+    let timer = null;
+    const started = performance.now();
+    const done = (settled) => { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(settled); };
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(() => done(true), quiet);
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    timer = setTimeout(() => done(true), quiet);
+    const cap = setTimeout(() => done(false), limit);
+})
+"""
+
+
+@dataclass
+class WaitResult:
+    """Outcome of a single wait: what was waited on, how long it took, and whether it was met"""
+    label: str
+    elapsed: float
+    ok: bool
+
+
+class WaitEngine:
+    """
+    Waits on readiness signals instead of sleeping for a fixed time.
+
+    Every wait has a timeout and records how long it actually took. A wait
+    that times out is logged and returned with ok=False rather than raised,
+    so it behaves like the sleep it replaces: the next Playwright action
+    still fails loudly if the page really isn't ready.
+    """
+
+    def __init__(self, default_timeout=10000, settle_ms=150, verbose=False):
+        """
+        Args:
+            default_timeout (int): Timeout in milliseconds used when a wait doesn't pass one
+            settle_ms (int): Quiet period in milliseconds that counts as "DOM settled"
+            verbose (bool): Print every wait, not just the slow or failed ones
+        """
+        self.default_timeout = default_timeout
+        self.settle_ms = settle_ms
+        self.verbose = verbose
+        self.results = []
+
+    def _record(self, label, started, ok):
+        """Store and report a finished wait"""
+        result = WaitResult(label, time.perf_counter() - started, ok)
+        self.results.append(result)
+        if not ok:
+            print(f"   ⚠️ Wait timed out after {result.elapsed:.2f}s: {label}")
+        elif self.verbose:
+            print(f"   ⏱️ {label}: {result.elapsed:.2f}s")
+        return result
+
+    async def _locator_state(self, locator, state, label, timeout):
+        started = time.perf_counter()
+        try:
+            await locator.wait_for(state=state, timeout=timeout or self.default_timeout)
+            ok = True
+        except Exception:
+            ok = False
+        return self._record(label, started, ok)
+
+    async def visible(self, locator, label='element visible', timeout=None):
+        """Wait for a locator to become visible"""
+        return await self._locator_state(locator, 'visible', label, timeout)
+
+    async def hidden(self, locator, label='element hidden', timeout=None):
+        """Wait for a locator to be hidden or removed from the page"""
+        return await self._locator_state(locator, 'hidden', label, timeout)
+
+    async def enabled(self, locator, label='element enabled', timeout=None):
+        """Wait for a locator to be visible and enabled (e.g. a Next button unlocked by a form field)"""
+        started = time.perf_counter()
+        deadline = started + (timeout or self.default_timeout) / 1000
+        ok = False
+        try:
+            await locator.wait_for(state='visible', timeout=timeout or self.default_timeout)
+            while time.perf_counter() < deadline:
+                if await locator.is_enabled():
+                    ok = True
+                    break
+                await asyncio.sleep(0.05)
+        except Exception:
+            ok = False
+        return self._record(label, started, ok)
+
+    async def navigation(self, page, url=None, state='domcontentloaded', label='navigation', timeout=None):
+        """
+        Wait for a navigation to finish.
+
+        Args:
+            page: Playwright page object
+            url: Optional URL glob/regex the page must reach first
+            state (str): Load state to wait for ('load', 'domcontentloaded', 'networkidle')
+        """
+        started = time.perf_counter()
+        try:
+            if url:
+                await page.wait_for_url(url, wait_until=state, timeout=timeout or self.default_timeout)
+            else:
+                await page.wait_for_load_state(state, timeout=timeout or self.default_timeout)
+            ok = True
+        except Exception:
+            ok = False
+        return self._record(label, started, ok)
+
+    async def response(self, page, url_part, action, label=None, timeout=None, method=None):
+        """
+        Run an action and wait for the XHR/fetch it triggers to complete.
+
+        Args:
+            page: Playwright page object
+            url_part (str): Substring of the response URL to wait for
+            action: Coroutine function performing the click/fill that fires the request
+            method (str): Only count responses to requests of this method (e.g. 'POST')
+
+        Returns:
+            WaitResult: ok is True only if a matching response arrived with a non-error status
+
+        Raises:
+            Exception: Whatever the action raised - a failed click is an error, not a slow response
+        """
+        started = time.perf_counter()
+        ok = False
+        action_failed = False
+
+        def matches(response):
+            return url_part in response.url and (method is None or response.request.method == method)
+
+        try:
+            async with page.expect_response(matches, timeout=timeout or self.default_timeout) as info:
+                try:
+                    await action()
+                except Exception:
+                    action_failed = True
+                    raise
+            response = await info.value
+            ok = response.ok
+        except Exception:
+            if action_failed:
+                raise
+            ok = False
+        return self._record(label or f'response {url_part}', started, ok)
+
+    async def dom_settled(self, page, label='DOM settled', quiet_ms=None, timeout=None):
+        """Wait until the page stops mutating for a short quiet period"""
+        started = time.perf_counter()
+        try:
+            ok = await page.evaluate(DOM_SETTLED_SCRIPT,
+                                     [quiet_ms or self.settle_ms, timeout or self.default_timeout])
+        except Exception:
+            # Page navigated away mid-evaluation - wait for the new document instead
+            try:
+                await page.wait_for_load_state('domcontentloaded', timeout=timeout or self.default_timeout)
+                ok = True
+            except Exception:
+                ok = False
+        return self._record(label, started, ok)
+
+    async def condition(self, check, label='condition', timeout=None, interval=0.1):
+        """
+        Poll a predicate until it holds (e.g. "all photo uploads answered").
+
+        Args:
+            check: Function or coroutine function returning True once the condition is met
+            interval (float): Seconds between checks
+        """
+        started = time.perf_counter()
+        deadline = started + (timeout or self.default_timeout) / 1000
+        while True:
+            try:
+                result = check()
+                if asyncio.iscoroutine(result):
+                    result = await result
+                ok = bool(result)
+            except Exception:
+                ok = False
+            if ok or time.perf_counter() >= deadline:
+                break
+            await asyncio.sleep(interval)
+        return self._record(label, started, ok)
+
+    async def pause(self, seconds, label='pause'):
+        """Deliberate fixed pause (e.g. keeping a visible browser open) - recorded like any other wait"""
+        started = time.perf_counter()
+        await asyncio.sleep(seconds)
+        return self._record(label, started, True)
+
+    def reset(self):
+        """Forget recorded waits (start of a new run)"""
+        self.results = []
+
+    def total_time(self):
+        """Total seconds spent waiting so far"""
+        return sum(result.elapsed for result in self.results)
+
+    def print_summary(self):
+        """Print how long the run spent waiting, slowest waits first"""
+        if not self.results:
+            return
+        print(f"\n⏱️ Waited {self.total_time():.1f}s across {len(self.results)} waits")
+        for result in sorted(self.results, key=lambda r: r.elapsed, reverse=True)[:5]:
+            status = "✅" if result.ok else "⚠️"
+            print(f"   {status} {result.label}: {result.elapsed:.2f}s")
@@ -0,0 +1,221 @@
+"""
+Near-Duplicate Photo Detection for Kijiji Room Rental Automation
+Perceptual-hash index over the photos each ad will post, used to catch reused photos before a run
+
+Each photo gets a 64-bit difference hash (dHash): it survives re-saving, resizing and
+small edits, so the same photo - or a near copy - produces hashes only a few bits apart.
+Hashes are stored in a JSON index and only recomputed for files whose mtime or size
+changed. Pairs are found by bucketing instead of comparing every pair: a hash is split
+into (threshold + 1) bands, and any two hashes within `threshold` bits of each other must
+agree exactly on at least one band, so only photos sharing a band are ever compared.
+
+The posting engine indexes the catalog's resolved photo list of every ad (wherever the
+files live) plus the generated variant sets in the image cache, not just images/ad*.
+Photos are compared between ads: a photo listed by one ad is grouped under that ad,
+any other photo under its folder.
+
+Usage:
+  python photo_hash_index.py [threshold]   - Report near-duplicate photos across images/ad*
+"""
+
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+from PIL import Image, ImageOps
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+HASH_BITS = 64
+
+
+def dhash(path):
+    """64-bit difference hash: brightness gradient between neighbouring pixels of a 9x8 thumbnail"""
+    with Image.open(path) as image:
+        return dhash_image(ImageOps.exif_transpose(image))
+
+
+def dhash_image(image):
+    """dhash() of an already opened PIL image"""
+    small = image.convert('L').resize((9, 8), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+
+class PhotoHashIndex:
+    """
+    Persistent perceptual-hash index of the ad photos.
+
+    Entries are keyed by file path and hold the mtime/size they were hashed at,
+    so refresh() only re-hashes new or changed files and drops deleted ones.
+    """
+
+    def __init__(self, index_file='.image_cache/photo_hashes.json', folders_glob='images/ad*',
+                 photo_sets=None, extra_globs=()):
+        """
+        Args:
+            index_file (str): Where the hash index is saved
+            folders_glob (str): Glob matching every ad photo folder
+            photo_sets (dict): Photo paths each ad posts, by ad name (e.g. from the catalog)
+            extra_globs (tuple): More photo folder globs (e.g. the variant cache's sets)
+        """
+        self.index_file = index_file
+        self.folders_glob = folders_glob
+        self.photo_sets = photo_sets or {}
+        self.extra_globs = tuple(extra_globs)
+        self.entries = self._load()
+        # Ads each listed photo belongs to, and ads with listed photos in each folder
+        self.owners = defaultdict(set)
+        self.folder_owners = defaultdict(set)
+        for name, paths in self.photo_sets.items():
+            for path in paths:
+                self.owners[os.path.normpath(path)].add(name)
+                self.folder_owners[os.path.dirname(os.path.normpath(path))].add(name)
+
+    def _load(self):
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_file) or '.', exist_ok=True)
+        # Per-process temp name - multi_account_runner workers share the index file
+        tmp_path = f'{self.index_file}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.index_file)
+
+    def photo_files(self):
+        """Every photo in every ad folder and photo set"""
+        files = []
+        for pattern in (self.folders_glob,) + self.extra_globs:
+            for folder in sorted(glob.glob(pattern)):
+                if os.path.isdir(folder):
+                    files.extend(os.path.join(folder, name) for name in sorted(os.listdir(folder))
+                                 if name.lower().endswith(IMAGE_EXTENSIONS))
+        files.extend(path for path in self.owners if os.path.isfile(path))
+        return list(dict.fromkeys(os.path.normpath(path) for path in files))
+
+    def group(self, path):
+        """What a photo is compared between: the ads listing it, else its folder (and the ads using that folder)"""
+        if self.owners.get(path):
+            return frozenset(self.owners[path])
+        folder = os.path.dirname(path)
+        return frozenset({folder} | self.folder_owners.get(folder, set()))
+
+    def shared_photos(self):
+        """{path: ad names} of photo files listed by more than one ad"""
+        return {path: sorted(names) for path, names in sorted(self.owners.items()) if len(names) > 1}
+
+    def refresh(self):
+        """
+        Bring the index up to date with the folders and save it.
+
+        Returns:
+            int: Number of photos (re)hashed
+        """
+        current = {}
+        hashed = 0
+        for path in self.photo_files():
+            stat = os.stat(path)
+            entry = self.entries.get(path)
+            if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                current[path] = entry
+                continue
+            try:
+                current[path] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': dhash(path)}
+                hashed += 1
+            except Exception as e:
+                print(f"   ⚠️ Could not hash {path}: {e}")
+        self.entries = current
+        self.save()
+        return hashed
+
+    def near_duplicates(self, threshold=6, across_folders_only=True):
+        """
+        Find photo pairs whose hashes differ by at most `threshold` bits.
+
+        Args:
+            threshold (int): Max differing bits (0 = identical hash, ~10 = visibly similar)
+            across_folders_only (bool): Ignore pairs within the same ad (or folder, for unlisted photos)
+
+        Returns:
+            list: (path_a, path_b, distance) tuples, closest first
+        """
+        bands = threshold + 1
+        band_width = -(-HASH_BITS // bands)  # ceiling division
+        band_mask = (1 << band_width) - 1
+
+        buckets = defaultdict(list)
+        for path, entry in self.entries.items():
+            for band in range(bands):
+                buckets[(band, (entry['hash'] >> (band * band_width)) & band_mask)].append(path)
+
+        pairs = {}
+        for paths in buckets.values():
+            if len(paths) < 2:
+                continue
+            for i, path_a in enumerate(paths):
+                for path_b in paths[i + 1:]:
+                    key = tuple(sorted((path_a, path_b)))
+                    if key in pairs:
+                        continue
+                    if across_folders_only and self.group(path_a) & self.group(path_b):
+                        continue
+                    distance = hamming(self.entries[path_a]['hash'], self.entries[path_b]['hash'])
+                    if distance <= threshold:
+                        pairs[key] = distance
+
+        return sorted(((a, b, d) for (a, b), d in pairs.items()), key=lambda pair: (pair[2], pair))
+
+
+def check_duplicate_photos(threshold=6, index_file='.image_cache/photo_hashes.json',
+                           photo_sets=None, variant_cache_dir=None):
+    """
+    Refresh the index and print any near-duplicate photos shared between ads.
+
+    Args:
+        threshold (int): Max differing bits for two photos to count as near-duplicates
+        index_file (str): Where the hash index is saved
+        photo_sets (dict): Photo paths each ad posts, by ad name (the catalog's resolved lists)
+        variant_cache_dir (str): Variant cache whose generated sets are indexed too
+
+    Returns:
+        list: The near-duplicate pairs found
+    """
+    extra_globs = (os.path.join(variant_cache_dir, '*', 'variant*'),) if variant_cache_dir else ()
+    index = PhotoHashIndex(index_file=index_file, photo_sets=photo_sets, extra_globs=extra_globs)
+    index.refresh()
+    for path, names in index.shared_photos().items():
+        print(f"   ⚠️ {path} is used by several ads: {', '.join(names)}")
+    pairs = index.near_duplicates(threshold)
+    if pairs:
+        print(f"   ⚠️ {len(pairs)} photo(s) look the same in different ads (Kijiji may flag these):")
+        for path_a, path_b, distance in pairs:
+            label = "identical" if distance == 0 else f"{distance} bits apart"
+            print(f"      {path_a} ↔ {path_b} ({label})")
+    else:
+        print(f"   ✅ No near-duplicate photos across {len(index.entries)} ad photos")
+    return pairs
+
+
+def main():
+    threshold = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    print("🔍 Checking ad photos for near-duplicates...")
+    check_duplicate_photos(threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Shared Rate Limiter for Kijiji Room Rental Automation
+Token buckets for logins, deletions and postings - per account and across all accounts and processes
+
+Every login, ad deletion and ad post first takes a token from two buckets: the
+account's own bucket for that action and a global one shared by every account.
+A bucket holds up to `burst` tokens and refills at `per_minute` tokens a minute;
+when either bucket is empty the action waits until both have a token. Bursts
+(posting three ads at once) go through at full speed, sustained traffic is held
+to the configured rate.
+
+Bucket levels live in one SQLite file (state/rate_limits.sqlite) and are updated
+in a single write transaction, so the daily scheduler, multi_account_runner worker
+processes and manual CLI runs all draw from the same budget. The transaction runs in
+a worker thread, so waiting for another process's lock doesn't stall the run's pages.
+
+Time spent waiting is recorded as "rate_limit_<action>" timing spans (so it shows up
+in the run log and the Prometheus export) and summarised after each run.
+
+Usage:
+  python rate_limiter.py [db_file]   - Show every bucket's current level
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+ACTIONS = ('login', 'delete', 'post')
+
+# Per-account and global rate/burst per action (null per_minute = no limit)
+DEFAULT_LIMITS = {
+    'login': {'per_minute': 2, 'burst': 2, 'global_per_minute': 6, 'global_burst': 4},
+    'delete': {'per_minute': 120, 'burst': 30, 'global_per_minute': 300, 'global_burst': 60},
+    'post': {'per_minute': 6, 'burst': 3, 'global_per_minute': 20, 'global_burst': 8},
+}
+
+
+class RateLimiter:
+    """Token buckets for one account, stored in a SQLite file shared with every other process"""
+
+    def __init__(self, username, db_file='state/rate_limits.sqlite', limits=None, metrics=None, waits=None, enabled=True):
+        """
+        Args:
+            username (str): Account whose per-account buckets are used
+            db_file (str): SQLite file holding every bucket's level
+            limits (dict): Overrides of DEFAULT_LIMITS by action, e.g. {"post": {"per_minute": 4}}
+            metrics (RunMetrics): Waits are recorded as "rate_limit_<action>" spans when given
+            waits (WaitEngine): Waits are recorded as pauses when given
+            enabled (bool): False lets every action through at once (e.g. for benchmarks)
+        """
+        self.account = hashlib.sha256(username.lower().encode('utf-8')).hexdigest()[:16]
+        self.db_file = db_file
+        self.limits = {action: dict(DEFAULT_LIMITS[action], **(limits or {}).get(action, {}))
+                       for action in ACTIONS}
+        self.metrics = metrics
+        self.waits = waits
+        self.enabled = enabled
+        self.waited = {}
+
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+
+    def _connect(self):
+        # Autocommit mode - transactions are opened explicitly with BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+
+    def reset(self):
+        """Forget this run's waiting times (start of a new run)"""
+        self.waited = {}
+
+    def buckets(self, action):
+        """(key, tokens per second, burst) of the buckets an action draws from"""
+        limit = self.limits[action]
+        buckets = []
+        if not self.enabled:
+            return buckets
+        for scope, prefix in ((self.account, ''), ('global', 'global_')):
+            per_minute = limit.get(f'{prefix}per_minute')
+            if per_minute:
+                buckets.append((f'{action}:{scope}', per_minute / 60, max(1, limit.get(f'{prefix}burst', 1))))
+        return buckets
+
+    def _take(self, buckets):
+        """
+        Take one token from every bucket if they all have one.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until all buckets have one
+        """
+        with closing(self._connect()) as conn:
+            # Write lock first, so no other process reads the same levels before we update them
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                levels = {}
+                for key, rate, burst in buckets:
+                    row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                    levels[key] = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+                wait = max([(1 - levels[key]) / rate for key, rate, _ in buckets if levels[key] < 1], default=0)
+                for key, _, _ in buckets:
+                    conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                                 (key, levels[key] - (0 if wait else 1), now))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return wait
+
+    async def acquire(self, action):
+        """
+        Wait until the action is allowed under its account and global limits, then use it up.
+
+        Args:
+            action (str): "login", "delete" or "post"
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        buckets = self.buckets(action)
+        waited = 0.0
+        while buckets:
+            # SQLite blocks while another process holds the write lock - keep that off the event loop
+            wait = await asyncio.to_thread(self._take, buckets)
+            if not wait:
+                break
+            started = time.perf_counter()
+            if self.metrics is not None:
+                async with self.metrics.span(f'rate_limit_{action}'):
+                    await self._pause(wait, action)
+            else:
+                await self._pause(wait, action)
+            waited += time.perf_counter() - started
+
+        if waited:
+            count, total = self.waited.get(action, (0, 0.0))
+            self.waited[action] = (count + 1, total + waited)
+        return waited
+
+    async def _pause(self, seconds, action):
+        if self.waits is not None:
+            await self.waits.pause(seconds, f'rate limit {action}')
+        else:
+            await asyncio.sleep(seconds)
+
+    def print_summary(self):
+        """How long this run waited for each kind of action"""
+        if not self.waited:
+            return
+        total = sum(seconds for _, seconds in self.waited.values())
+        details = ', '.join(f"{action} {count}x {seconds:.1f}s" for action, (count, seconds) in sorted(self.waited.items()))
+        print(f"\n⏳ Rate limits: waited {total:.1f}s ({details})")
+
+
+def main():
+    db_file = sys.argv[1] if len(sys.argv) > 1 else 'state/rate_limits.sqlite'
+    if not os.path.exists(db_file):
+        print(f"No rate limit state in {db_file} yet")
+        return
+    with closing(sqlite3.connect(db_file)) as conn:
+        rows = conn.execute('SELECT key, tokens, updated FROM buckets ORDER BY key').fetchall()
+    print(f"⏳ Token buckets ({db_file}) - levels as of their last use")
+    for key, tokens, updated in rows:
+        print(f"   {key:<30} {tokens:6.2f} tokens  {time.time() - updated:8.0f}s ago")
+
+
+if __name__ == "__main__":
+    main()
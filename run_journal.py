@@ -0,0 +1,202 @@
+"""
+Crash-Safe Run Journal for Kijiji Room Rental Automation
+Records every completed step so a failed run resumes where it stopped instead of starting over
+
+Each run appends one JSON line per event to its own journal file
+(state/journal/<account hash>/<run id>.jsonl), flushed and fsynced as it is written:
+
+  {"event": "run_started", "key": "...", ...}
+  {"event": "step_done", "step": "login"}
+  {"event": "step_done", "step": "delete", "item": "listing-id-1234"}
+  {"event": "step_done", "step": "delete_existing_ads"}
+  {"event": "step_done", "step": "post_ad", "item": "ad1"}
+  {"event": "run_failed", "error": "..."}
+  {"event": "run_finished"}
+
+When a run starts and the account's latest journal has no run_finished line (and is
+recent, and was for the same catalog), the run resumes it: the deletion phase is
+skipped once it has completed - so ads already reposted are never deleted again -
+and ads already posted are not posted twice. Login always runs through the saved
+session, which is only a page load when the session is still valid.
+
+Usage:
+  python run_journal.py [journal_dir]   - Show the latest run of every account
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+# Journals kept per account - older ones are removed when a new run starts
+KEEP_RUNS = 20
+
+
+def read_journal(path):
+    """Events in a journal file - a line cut short by a crash is skipped"""
+    events = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return events
+
+
+class RunJournal:
+    """Append-only journal of one account's runs"""
+
+    def __init__(self, username, journal_dir='state/journal', resume=True, resume_window_hours=24, enabled=True):
+        """
+        Args:
+            username (str): Kijiji account the runs belong to
+            journal_dir (str): Folder holding every account's journals
+            resume (bool): Resume an unfinished run instead of starting over
+            resume_window_hours (float): Unfinished runs older than this are started over
+            enabled (bool): False writes nothing and never resumes (e.g. HAR replay runs, which
+                            aren't real posts and must not be resumed by a live run)
+        """
+        digest = hashlib.sha256(username.lower().encode('utf-8')).hexdigest()[:16]
+        self.account_dir = os.path.join(journal_dir, digest)
+        self.resume = resume
+        self.enabled = enabled
+        self.resume_window = resume_window_hours * 3600
+        self.run_id = None
+        self.path = None
+        self.completed = set()
+        self.resumed = False
+
+    @staticmethod
+    def _entry(step, item=None):
+        return f'{step}:{item}' if item is not None else step
+
+    def _journals(self):
+        return sorted(glob.glob(os.path.join(self.account_dir, '*.jsonl')))
+
+    def _resumable(self, key):
+        """Latest journal if it's an unfinished, recent run of the same catalog"""
+        journals = self._journals()
+        if not self.resume or not journals:
+            return None
+        events = read_journal(journals[-1])
+        if not events or events[0].get('event') != 'run_started' or events[0].get('key') != key:
+            return None
+        if any(event.get('event') == 'run_finished' for event in events):
+            return None
+        if time.time() - events[0].get('time', 0) > self.resume_window:
+            return None
+        return journals[-1], events
+
+    def begin(self, key):
+        """
+        Start a run, or resume the last one if it didn't finish.
+
+        Args:
+            key (str): Identifies what the run posts (e.g. catalog and ad names) -
+                       an unfinished run is only resumed for the same key
+
+        Returns:
+            bool: True if an unfinished run is being resumed
+        """
+        self.completed = set()
+        self.resumed = False
+        if not self.enabled:
+            # No file - step_done/fail/finish are no-ops and nothing counts as done
+            self.run_id = self.path = None
+            return False
+        os.makedirs(self.account_dir, exist_ok=True)
+        resumable = self._resumable(key)
+        if resumable:
+            self.path, events = resumable
+            self.run_id = events[0]['run_id']
+            self.completed = {self._entry(event['step'], event.get('item'))
+                              for event in events if event.get('event') == 'step_done'}
+            self.resumed = True
+            # End a line cut short by the crash, so it doesn't swallow the next event
+            with open(self.path, 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+            self._append({'event': 'run_resumed'})
+            return True
+
+        self.run_id = datetime.now().strftime('%Y%m%d-%H%M%S-') + os.urandom(3).hex()
+        self.path = os.path.join(self.account_dir, f'{self.run_id}.jsonl')
+        self.completed = set()
+        self.resumed = False
+        self._append({'event': 'run_started', 'run_id': self.run_id, 'key': key})
+        for old in self._journals()[:-KEEP_RUNS]:
+            os.remove(old)
+        return False
+
+    def _append(self, record):
+        record = dict(record, time=time.time())
+        # One line per write, fsynced - a crash loses at most the line being written
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def done(self, step, item=None):
+        """True if this step (or this item of it) completed in the current run"""
+        return self._entry(step, item) in self.completed
+
+    def step_done(self, step, item=None, **data):
+        """Record a completed step (item: e.g. the listing deleted or the ad posted)"""
+        if self.path is None:
+            return
+        record = {'event': 'step_done', 'step': step}
+        if item is not None:
+            record['item'] = item
+        record.update(data)
+        self._append(record)
+        self.completed.add(self._entry(step, item))
+
+    def fail(self, error):
+        """Record that the run stopped - the next run resumes it"""
+        if self.path is not None:
+            self._append({'event': 'run_failed', 'error': str(error)})
+
+    def finish(self):
+        """Record that the run completed - the next run starts fresh"""
+        if self.path is not None:
+            self._append({'event': 'run_finished'})
+
+    def describe(self):
+        """One-line summary of what the resumed run already did"""
+        steps = {}
+        for entry in self.completed:
+            step = entry.split(':', 1)[0]
+            steps[step] = steps.get(step, 0) + 1
+        return ', '.join(f'{step} x{count}' if count > 1 else step for step, count in sorted(steps.items()))
+
+
+def main():
+    journal_dir = sys.argv[1] if len(sys.argv) > 1 else 'state/journal'
+    accounts = sorted(glob.glob(os.path.join(journal_dir, '*')))
+    if not accounts:
+        print(f"No run journals in {journal_dir}/")
+        return
+    for account_dir in accounts:
+        journals = sorted(glob.glob(os.path.join(account_dir, '*.jsonl')))
+        if not journals:
+            continue
+        events = read_journal(journals[-1])
+        status = events[-1].get('event', '?') if events else 'empty'
+        done = [f"{e['step']}{':' + e['item'] if 'item' in e else ''}" for e in events if e.get('event') == 'step_done']
+        print(f"{os.path.basename(account_dir)}  {os.path.basename(journals[-1])}  {status}")
+        for entry in done:
+            print(f"   ✅ {entry}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Per-Step Timing for Kijiji Room Rental Automation
+Named timing spans written to a JSONL run log, plus a Prometheus text-format export
+
+Every step of a run (login, deletion, each part of posting an ad) is wrapped in a span
+that records its duration, outcome and ad number. Spans nest: a "title" span inside a
+"post_ad" span is recorded as "post_ad.title", and inherits the ad number. Each finished
+span is appended to logs/runs-YYYYMMDD.jsonl straight away, so even a crashed run leaves
+a complete record of what it got through.
+
+At the end of every run the last `history_days` of JSONL logs are summarised into a
+Prometheus text file (p50/p95 duration and run counts per step), which a node_exporter
+textfile collector can pick up to chart step times across days.
+
+Usage:
+  python run_metrics.py   - Rebuild the Prometheus file and print p50/p95 per step
+"""
+
+import contextvars
+import glob
+import json
+import math
+import os
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+# Current span name and ad number - contextvars keep concurrent ad tasks apart
+_current_step = contextvars.ContextVar('current_step', default=None)
+_current_ad = contextvars.ContextVar('current_ad', default=None)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class RunMetrics:
+    """Records timing spans for one automation instance across its runs"""
+
+    def __init__(self, log_dir='logs', prometheus_file=None, account=None, history_days=30):
+        """
+        Args:
+            log_dir (str): Folder for the daily JSONL run logs
+            prometheus_file (str): Prometheus text file (default: <log_dir>/kijiji_steps.prom)
+            account (str): Account label added to every record
+            history_days (int): How many days of logs the Prometheus quantiles cover
+        """
+        self.log_dir = log_dir
+        self.prometheus_file = prometheus_file or os.path.join(log_dir, 'kijiji_steps.prom')
+        self.account = account
+        self.history_days = history_days
+        self.run_id = None
+        os.makedirs(self.log_dir, exist_ok=True)
+
+    def start_run(self):
+        """Begin a new run - every span until the next start_run() shares its run_id"""
+        self.run_id = datetime.now().strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+        return self.run_id
+
+    def _log_path(self, day=None):
+        return os.path.join(self.log_dir, f"runs-{(day or datetime.now()).strftime('%Y%m%d')}.jsonl")
+
+    def _write(self, record):
+        # One short append per span - a line either lands whole or not at all
+        with open(self._log_path(), 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    @asynccontextmanager
+    async def span(self, step, ad_number=None):
+        """
+        Time a step.
+
+            async with self.metrics.span('login'):
+                ...
+
+        Args:
+            step (str): Step name - nested spans are prefixed with their parent's name
+            ad_number (int): Ad the step belongs to (inherited by nested spans)
+        """
+        parent = _current_step.get()
+        name = f'{parent}.{step}' if parent else step
+        step_token = _current_step.set(name)
+        ad_token = _current_ad.set(ad_number) if ad_number is not None else None
+        try:
+            async with self._timed(name):
+                yield
+        finally:
+            if ad_token is not None:
+                _current_ad.reset(ad_token)
+            _current_step.reset(step_token)
+
+    def run_span(self):
+        """
+        Time a whole run, recorded as step "run".
+
+        Unlike span() it doesn't become a parent, so the steps inside
+        keep their own names ("login", not "run.login").
+        """
+        return self._timed('run')
+
+    @asynccontextmanager
+    async def _timed(self, name):
+        started_at = datetime.now()
+        started = time.perf_counter()
+        outcome, error = 'ok', None
+        try:
+            yield
+        except BaseException as e:
+            outcome, error = 'error', f'{type(e).__name__}: {e}'[:500]
+            raise
+        finally:
+            self._write({
+                'run_id': self.run_id,
+                'account': self.account,
+                'step': name,
+                'ad_number': _current_ad.get(),
+                'started': started_at.isoformat(timespec='milliseconds'),
+                'duration': round(time.perf_counter() - started, 4),
+                'outcome': outcome,
+                'error': error,
+            })
+
+    def load_history(self):
+        """All span records from the last history_days of logs"""
+        cutoff = (datetime.now() - timedelta(days=self.history_days)).strftime('%Y%m%d')
+        records = []
+        for path in sorted(glob.glob(os.path.join(self.log_dir, 'runs-*.jsonl'))):
+            if os.path.basename(path)[5:13] < cutoff:
+                continue
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # Half-written line from a killed run
+        return records
+
+    def step_stats(self):
+        """{step: {'p50', 'p95', 'ok', 'error', 'sum'}} over the history window"""
+        durations = defaultdict(list)
+        outcomes = defaultdict(lambda: {'ok': 0, 'error': 0})
+        for record in self.load_history():
+            durations[record['step']].append(record['duration'])
+            outcomes[record['step']][record['outcome']] += 1
+        return {step: {'p50': percentile(values, 0.5), 'p95': percentile(values, 0.95),
+                       'sum': sum(values), **outcomes[step]}
+                for step, values in durations.items()}
+
+    def export_prometheus(self):
+        """Rewrite the Prometheus text file from the recent run logs"""
+        stats = self.step_stats()
+        # Everything here is computed over a sliding window of run logs, so it can go down as
+        # old runs age out - gauges, not a summary/counters (rate() would read resets)
+        lines = [
+            f'# HELP kijiji_step_duration_seconds Step duration quantiles over the last {self.history_days} days',
+            '# TYPE kijiji_step_duration_seconds gauge',
+        ]
+        for step, s in sorted(stats.items()):
+            lines.append(f'kijiji_step_duration_seconds{{step="{step}",quantile="0.5"}} {s["p50"]:.4f}')
+            lines.append(f'kijiji_step_duration_seconds{{step="{step}",quantile="0.95"}} {s["p95"]:.4f}')
+        lines += [
+            f'# HELP kijiji_step_duration_seconds_window_sum Total step time over the last {self.history_days} days',
+            '# TYPE kijiji_step_duration_seconds_window_sum gauge',
+        ]
+        for step, s in sorted(stats.items()):
+            lines.append(f'kijiji_step_duration_seconds_window_sum{{step="{step}"}} {s["sum"]:.4f}')
+        lines += [
+            f'# HELP kijiji_step_duration_seconds_window_count Timed step executions over the last {self.history_days} days',
+            '# TYPE kijiji_step_duration_seconds_window_count gauge',
+        ]
+        for step, s in sorted(stats.items()):
+            lines.append(f'kijiji_step_duration_seconds_window_count{{step="{step}"}} {s["ok"] + s["error"]}')
+        lines += [
+            f'# HELP kijiji_step_runs Step executions by outcome over the last {self.history_days} days',
+            '# TYPE kijiji_step_runs gauge',
+        ]
+        for step, s in sorted(stats.items()):
+            for outcome in ('ok', 'error'):
+                lines.append(f'kijiji_step_runs{{step="{step}",outcome="{outcome}"}} {s[outcome]}')
+        lines += [
+            '# HELP kijiji_metrics_updated_timestamp_seconds When this file was last written',
+            '# TYPE kijiji_metrics_updated_timestamp_seconds gauge',
+            f'kijiji_metrics_updated_timestamp_seconds {time.time():.0f}',
+        ]
+
+        # Write-then-rename so a scraper never reads a half-written file
+        # (per-process temp name - multi_account_runner workers export at the same time)
+        tmp_path = f'{self.prometheus_file}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, self.prometheus_file)
+        return stats
+
+
+def main():
+    metrics = RunMetrics()
+    stats = metrics.export_prometheus()
+    if not stats:
+        print("No run logs found in logs/")
+        return
+    print(f"📈 Step timings over the last {metrics.history_days} days:")
+    print(f"   {'step':<32} {'p50':>8} {'p95':>8} {'runs':>6} {'errors':>7}")
+    for step, s in sorted(stats.items()):
+        print(f"   {step:<32} {s['p50']:>7.2f}s {s['p95']:>7.2f}s {s['ok'] + s['error']:>6} {s['error']:>7}")
+    print(f"\n💾 Prometheus metrics written to {metrics.prometheus_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Selector Registry for Kijiji Room Rental Automation
+Every element the automation touches, with fallback selectors that heal around site changes
+
+Each logical element ("category_room_rentals", "checkout_button", ...) has an ordered
+list of candidate selectors. SelectorRegistry.resolve() tries them in turn, each with
+a short timeout (selector_timeout, 2s), and keeps going round the list until the
+element's overall timeout - so when Kijiji renames a button, the next candidate is
+used after 2 seconds instead of the run failing after Playwright's full timeout.
+
+Which candidate matched, and how long it took, is counted per candidate and saved
+(state/selector_stats.json). On later runs the fastest candidate that worked last
+time is tried first, and candidates that stopped matching move to the back.
+
+Candidates are Playwright selector strings, so they can be overridden in
+test_input.json without code changes:
+    "selectors": {"checkout_button": ["[data-testid=\\"checkout-post-btn\\"]", "text=Post Your Ad"]}
+
+Usage:
+  python selector_registry.py [stats_file]   - Hits, misses and speed of every candidate
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Pause between rounds over the candidates, doubling up to the maximum (seconds)
+ROUND_BACKOFF = 0.1
+MAX_ROUND_BACKOFF = 1.0
+
+# Candidate selectors per element, most specific first. "{name}" placeholders are
+# filled from resolve()'s keyword arguments (e.g. listing_id, location). Fallbacks are
+# scoped to their form section - a bare "textarea" or "button[type=submit]" would
+# happily match the wrong element once the real one is renamed.
+SELECTORS = {
+    # Login form
+    'login_email': ['role=textbox[name="Email Address"]', '#email', 'input[type="email"]'],
+    'forgot_password': ['role=link[name="Forgot Password?"]', 'a:has-text("Forgot Password")'],
+    'login_password': ['role=textbox[name="Password"]', '#password', 'input[type="password"]'],
+    'sign_in_button': ['role=button[name="Sign in"]', 'button[type="submit"]:has-text("Sign in")',
+                       'form:has(input[type="password"]) button[type="submit"]'],
+    # Site header
+    'account_menu': ['role=button[name="My Account"]', '#account-button', 'button:has-text("My Account")'],
+    'my_ads_link': ['role=link[name="My Ads"]', 'a[href*="/m-my-ads"]'],
+    'post_ad_link': ['[data-testid="header-link-post-ad"]', 'a[href*="p-select-category"]', 'role=link[name="Post ad"]'],
+    # My Ads deletion
+    'delete_button': ['[data-testid="{listing_id}"] [data-testid="adDeleteButton"]',
+                      '[data-testid="{listing_id}"] button:has-text("Delete")'],
+    'delete_reason': ['role=button[name="Prefer not to say"]', 'button:has-text("Prefer not to say")'],
+    'delete_confirm': ['role=button[name="Delete My Ad"]', 'button:has-text("Delete My Ad")'],
+    'modal_close': ['[data-testid="ModalCloseButton"]', '[role="dialog"] button:has-text("Close")'],
+    # Title and category
+    'drawer_close': ['[data-testid="drawer-close-button"]', '[data-testid="drawer"] button:has-text("Close")'],
+    'ad_title': ['role=textbox[name="Ad title"]', '#AdTitleForm', 'input[name="title"]'],
+    'next_button': ['role=button[name="Next"]', 'button:has-text("Next")'],
+    'category_room_rentals': ['role=button[name="Room Rentals & Roommates Real"]',
+                              'button:has-text("Room Rentals & Roommates")',
+                              '[data-category="36"]'],
+    # Ad form
+    'furnished_yes': ['li:has-text("Furnished: (optional) Yes No") label >> nth=2',
+                      'li:has-text("Furnished:") label:has-text("Yes")'],
+    'room_option': ['li:nth-child(6) > .radio-button-container > .form-section > label:nth-child(2) > .radio-button-rd',
+                    'li:has-text("Only women:") label:has-text("No") .radio-button-rd'],
+    'description': ['role=textbox[name="Description:"]', '#pstad-descrptn', 'li:has-text("Description") textarea'],
+    'tags_input': ['role=textbox[name="Tags: (optional)"]', '#pstad-tagsInput'],
+    'add_tag_button': ['role=button[name="Add"]', 'li:has(#pstad-tagsInput) button:has-text("Add")'],
+    'location_input': ['#location', 'role=textbox[name="Location"]'],
+    'location_option': ['role=option[name="{location}"]', '[role="listbox"] >> text={location}'],
+    'location_confirm': ['#FESLocationModuleWrapper span >> nth=0', 'text=Use this location'],
+    'price': ['#PriceAmount', 'role=textbox[name="Price"]'],
+    'phone': ['role=textbox[name="e.g. 123 456"]', 'input[placeholder^="e.g. 123 456"]',
+              'li:has-text("Phone") input[type="tel"]'],
+    # Package and checkout
+    'package_select': ['[data-testid="package-0-bottom-select"]', '.package button:has-text("Select") >> nth=0'],
+    'checkout_button': ['[data-testid="checkout-post-btn"]', 'role=button[name="Post Your Ad"]'],
+}
+
+
+class SelectorNotFound(Exception):
+    """No candidate selector of an element matched within its timeout"""
+
+
+class SelectorRegistry:
+    """Resolves logical elements through their candidate selectors and learns which work best"""
+
+    def __init__(self, stats_file='state/selector_stats.json', candidate_timeout=2000,
+                 default_timeout=10000, overrides=None):
+        """
+        Args:
+            stats_file (str): Where candidate hit/miss counts and timings are kept between runs
+            candidate_timeout (int): Milliseconds each candidate is given before the next is tried
+            default_timeout (int): Milliseconds before an element counts as not found
+            overrides (dict): Candidate lists replacing the built-in ones, by element name
+        """
+        self.stats_file = stats_file
+        self.candidate_timeout = candidate_timeout
+        self.default_timeout = default_timeout
+        self.selectors = dict(SELECTORS)
+        self.selectors.update(overrides or {})
+        self.stats = self._load()
+        self.resolutions = []
+
+    def _load(self):
+        try:
+            with open(self.stats_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write the candidate statistics (called once at the end of each run)"""
+        os.makedirs(os.path.dirname(self.stats_file) or '.', exist_ok=True)
+        tmp_path = f'{self.stats_file}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.stats, f, indent=2)
+        os.replace(tmp_path, self.stats_file)
+
+    def reset(self):
+        """Forget this run's resolutions (start of a new run)"""
+        self.resolutions = []
+
+    def candidates(self, name):
+        """
+        An element's candidates in the order they will be tried.
+
+        Candidates that matched last time come first, fastest first; then ones never
+        tried, in their listed order; then ones that failed to match last time.
+        """
+        if name not in self.selectors:
+            raise KeyError(f"Unknown element '{name}' - add it to SELECTORS in selector_registry.py")
+        listed = self.selectors[name]
+        stats = self.stats.get(name, {})
+
+        def rank(indexed):
+            index, selector = indexed
+            entry = stats.get(selector)
+            if entry is None:
+                return (1, 0, index)
+            if entry.get('last_ok'):
+                return (0, entry['total_ms'] / max(1, entry['hits']), index)
+            return (2, 0, index)
+
+        return [selector for _, selector in sorted(enumerate(listed), key=rank)]
+
+    def _record(self, name, selector, ok, ms=0.0):
+        entry = self.stats.setdefault(name, {}).setdefault(
+            selector, {'hits': 0, 'misses': 0, 'total_ms': 0.0, 'last_ok': None})
+        if ok:
+            entry['hits'] += 1
+            entry['total_ms'] = round(entry['total_ms'] + ms, 1)
+        else:
+            entry['misses'] += 1
+        entry['last_ok'] = ok
+        entry['last_used'] = round(time.time())
+
+    async def resolve(self, page, name, state='visible', timeout=None, optional=False, **params):
+        """
+        Find an element through its candidate selectors.
+
+        Args:
+            page: Playwright page to search
+            name (str): Element name from SELECTORS
+            state (str): Locator state to wait for ('visible', 'attached', ...)
+            timeout (int): Milliseconds before giving up (default: default_timeout)
+            optional (bool): Return None instead of raising if nothing matched, and don't
+                             count it against the candidates (e.g. a drawer that may not appear)
+            **params: Values for the "{placeholders}" in the candidates
+
+        Returns:
+            Locator for the first matching candidate (None if optional and not found)
+
+        Raises:
+            SelectorNotFound: If no candidate matched within the timeout
+        """
+        candidates = self.candidates(name)
+        timeout = timeout or self.default_timeout
+        started = time.perf_counter()
+        elapsed_ms = lambda: (time.perf_counter() - started) * 1000
+        # Candidates with no element on the page at their last try (not just slow to show)
+        absent = set()
+        backoff = ROUND_BACKOFF
+
+        # Go round the candidates, each with a short timeout, until the element's timeout -
+        # a slow page still gets its full time, a broken selector only costs one short wait
+        while True:
+            for selector in candidates:
+                remaining = timeout - elapsed_ms()
+                if remaining <= 0:
+                    break
+                locator = page.locator(selector.format(**params)).first
+                tried_at = time.perf_counter()
+                try:
+                    await locator.wait_for(state=state, timeout=min(self.candidate_timeout, remaining))
+                except Exception:
+                    if await self._absent(locator):
+                        absent.add(selector)
+                    else:
+                        absent.discard(selector)
+                    continue
+                self._matched(name, selector, candidates, absent,
+                              (time.perf_counter() - tried_at) * 1000, elapsed_ms())
+                return locator
+            remaining = timeout - elapsed_ms()
+            if remaining <= 0:
+                break
+            # Candidates that fail at once (e.g. a selector the page rejects) would
+            # otherwise be retried in a tight loop until the timeout
+            await asyncio.sleep(min(backoff, remaining / 1000))
+            backoff = min(backoff * 2, MAX_ROUND_BACKOFF)
+
+        if optional:
+            return None
+        for selector in candidates:
+            self._record(name, selector, False)
+        self.resolutions.append({'element': name, 'selector': None, 'ms': round(elapsed_ms(), 1)})
+        raise SelectorNotFound(f"No selector for '{name}' matched within {timeout / 1000:.1f}s "
+                               f"(tried: {' | '.join(candidates)})")
+
+    @staticmethod
+    async def _absent(locator):
+        """True if a candidate that didn't match has no element on the page at all"""
+        try:
+            return await locator.count() == 0
+        except Exception:
+            # The selector itself can't be evaluated - it will never match
+            return True
+
+    def _matched(self, name, selector, candidates, absent, candidate_ms, total_ms):
+        # Candidates tried before the match only count as misses when their element
+        # wasn't on the page - one that was there but slow to show isn't broken
+        for earlier in candidates[:candidates.index(selector)]:
+            if earlier in absent:
+                self._record(name, earlier, False)
+        self._record(name, selector, True, candidate_ms)
+        listed_first = self.selectors[name][0]
+        self.resolutions.append({'element': name, 'selector': selector, 'ms': round(total_ms, 1),
+                                 'fallback': selector != listed_first})
+        if selector != listed_first and not any(r['element'] == name and r.get('fallback')
+                                                for r in self.resolutions[:-1]):
+            print(f"   🩹 '{name}' found with fallback selector {selector}")
+
+    async def click(self, page, name, **params):
+        """Resolve an element and click it"""
+        locator = await self.resolve(page, name, **params)
+        await locator.click()
+        return locator
+
+    async def fill(self, page, name, value, **params):
+        """Resolve an input, click into it and fill it"""
+        locator = await self.resolve(page, name, **params)
+        await locator.click()
+        await locator.fill(value)
+        return locator
+
+    def print_summary(self):
+        """Elements that needed a fallback or weren't found this run"""
+        fallbacks = sorted({r['element'] for r in self.resolutions if r.get('fallback')})
+        missing = sorted({r['element'] for r in self.resolutions if r['selector'] is None})
+        if not fallbacks and not missing:
+            return
+        print(f"\n🩹 Selectors: {len(self.resolutions)} lookups this run")
+        if fallbacks:
+            print(f"   Found by a fallback (first choice no longer matches?): {', '.join(fallbacks)}")
+        if missing:
+            print(f"   Not found at all: {', '.join(missing)}")
+
+
+def main():
+    stats_file = sys.argv[1] if len(sys.argv) > 1 else 'state/selector_stats.json'
+    registry = SelectorRegistry(stats_file=stats_file)
+    if not registry.stats:
+        print(f"No selector statistics in {stats_file} yet")
+        return
+    print(f"🩹 Selector statistics ({stats_file})")
+    for name in sorted(registry.stats):
+        print(f"\n   {name}")
+        order = registry.candidates(name) if name in registry.selectors else []
+        for selector, entry in sorted(registry.stats[name].items(),
+                                      key=lambda item: order.index(item[0]) if item[0] in order else len(order)):
+            average = f"{entry['total_ms'] / entry['hits']:.0f}ms" if entry['hits'] else '-'
+            status = '✅' if entry['last_ok'] else '❌'
+            retired = '' if selector in order else '  (not in SELECTORS)'
+            print(f"     {status} {entry['hits']:>5} hits {entry['misses']:>5} misses {average:>7}  {selector}{retired}")
+
+
+if __name__ == "__main__":
+    main()
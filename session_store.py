@@ -0,0 +1,95 @@
+"""
+Persistent Login Session Store for Kijiji Room Rental Automation
+Saves the browser's cookies/localStorage after login so later runs can skip the login flow
+"""
+
+import hashlib
+import json
+import os
+import time
+
+# Page only reachable while logged in - a logged-out visit is redirected to id.kijiji.ca
+SESSION_CHECK_URL = "https://www.kijiji.ca/m-my-ads/active"
+
+
+class SessionStore:
+    """
+    Per-account cache of Playwright storage state (cookies + localStorage).
+
+    Each account gets its own file under session_dir, named by a hash of the
+    username so email addresses never appear in file names. Saved states
+    older than ttl_hours are treated as missing.
+    """
+
+    def __init__(self, session_dir='sessions', ttl_hours=12):
+        """
+        Args:
+            session_dir (str): Folder where session files are kept (keep it out of version control)
+            ttl_hours (float): How long a saved session is trusted before forcing a fresh login
+        """
+        self.session_dir = session_dir
+        self.ttl_seconds = ttl_hours * 3600
+        os.makedirs(self.session_dir, exist_ok=True)
+
+    def path_for(self, username):
+        """File that holds the saved session for this account"""
+        digest = hashlib.sha256(username.lower().encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.session_dir, f'session-{digest}.json')
+
+    def load(self, username):
+        """
+        Return the saved storage state for this account, or None if missing or expired.
+
+        The returned dict can be passed straight to browser.new_context(storage_state=...).
+        """
+        path = self.path_for(username)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        age = time.time() - saved.get('saved_at', 0)
+        if age > self.ttl_seconds:
+            print(f"   ⏰ Saved session expired ({age / 3600:.1f}h old)")
+            self.invalidate(username)
+            return None
+        return saved.get('state')
+
+    async def save(self, context, username):
+        """Save the context's current cookies and localStorage for this account"""
+        state = await context.storage_state()
+        path = self.path_for(username)
+        tmp_path = f'{path}.tmp'
+        # Session files hold live login cookies - only the owner may read them
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'saved_at': time.time(), 'state': state}, f)
+        os.replace(tmp_path, path)
+        print("   💾 Login session saved for next run")
+
+    def invalidate(self, username):
+        """Forget the saved session for this account"""
+        try:
+            os.remove(self.path_for(username))
+        except FileNotFoundError:
+            pass
+
+    async def verify(self, page, waits):
+        """
+        Cheaply check that the page's context is still logged in.
+
+        Loads a logged-in-only page; an expired session gets redirected to the
+        login site instead of showing the account header.
+        """
+        try:
+            await page.goto(SESSION_CHECK_URL, wait_until='domcontentloaded')
+        except Exception:
+            return False
+        if 'id.kijiji.ca' in page.url:
+            return False
+        result = await waits.visible(page.get_by_role("button", name="My Account"),
+                                     'saved session check', timeout=5000)
+        return result.ok
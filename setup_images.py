@@ -7,6 +7,8 @@ import os
 import shutil
 from pathlib import Path
 
+from photo_hash_index import check_duplicate_photos
+
 def setup_images_directory():
     """Create images directory and provide guidance"""
     
@@ -144,6 +146,11 @@ def main():
     # Setup images
     existing_photos = setup_images_directory()
     
+    # Flag photos that appear (or nearly appear) in more than one ad folder
+    print("\n🔍 Duplicate Photo Check:")
+    print("-" * 50)
+    check_duplicate_photos()
+    
     # Show content tips
     show_content_tips()
     
@@ -0,0 +1,274 @@
+"""
+Step Retry Engine for Kijiji Room Rental Automation
+Retries flaky steps with exponential backoff and jitter, and stops hammering the site with circuit breakers
+
+One transient failure (a slow category button, a checkout button that didn't enable in
+time) used to abort the whole run. Steps now run through RetryEngine.run():
+
+- Each step gets `attempts` tries. Before each retry it waits base_delay * 2^(n-1) seconds
+  (capped at max_delay), shifted by +/- jitter so parallel ads don't retry in lockstep.
+- An `already_done` check runs before each retry, so a step whose effect did happen
+  (an ad that did get posted before the confirmation page timed out) isn't repeated.
+- A CircuitBreaker counts consecutive failures of one kind of step (login, checkout).
+  After `threshold` failures in a row it opens: further attempts fail at once with
+  CircuitOpenError - nothing more is sent to the site - until `cooldown` has passed,
+  when one trial attempt is let through. Breaker state is saved, so it holds across runs.
+
+Every failed attempt is appended to logs/retries-YYYYMMDD.jsonl, so flaky steps show up.
+
+Usage:
+  python step_retry.py [days] [log_dir]   - Retries per step over the last N days (default 7)
+"""
+
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+class CircuitOpenError(Exception):
+    """A circuit breaker is open - the step isn't attempted until its cooldown passes"""
+
+
+class RetryPolicy:
+    """How often and how patiently steps are retried"""
+
+    def __init__(self, attempts=3, base_delay=2.0, max_delay=30.0, jitter=0.5):
+        """
+        Args:
+            attempts: Tries per step - an int, or {"default": 3, "login": 2, ...} per step
+            base_delay (float): Seconds before the first retry (doubles for each one after)
+            max_delay (float): Longest wait between tries
+            jitter (float): Random +/- fraction applied to every wait (0.5 = 50%-150%)
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def attempts_for(self, step):
+        if isinstance(self.attempts, dict):
+            return max(1, self.attempts.get(step, self.attempts.get('default', 3)))
+        return max(1, self.attempts)
+
+    def delay(self, attempt):
+        """Seconds to wait after failed attempt number `attempt` (1-based)"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures; lets one trial through after `cooldown` seconds.
+
+    Use as a context manager around the guarded action:
+        with breaker:
+            await page.get_by_test_id("checkout-post-btn").click()
+    """
+
+    def __init__(self, name, store, threshold=3, cooldown=1800):
+        """
+        Args:
+            name (str): What the breaker guards (e.g. "login", "checkout")
+            store (BreakerStore): Where the breaker's state is saved between runs
+            threshold (int): Consecutive failures that open the breaker
+            cooldown (float): Seconds the breaker stays open
+        """
+        self.name = name
+        self.store = store
+        self.threshold = threshold
+        self.cooldown = cooldown
+
+    @property
+    def state(self):
+        return self.store.get(self.name)
+
+    def is_open(self):
+        opened_at = self.state.get('opened_at')
+        return opened_at is not None and time.time() - opened_at < self.cooldown
+
+    def check(self):
+        """Raise CircuitOpenError while the breaker is open"""
+        if self.is_open():
+            remaining = self.cooldown - (time.time() - self.state['opened_at'])
+            raise CircuitOpenError(f"{self.name} circuit open after {self.state['failures']} failures in a row - "
+                                   f"not retrying for {remaining / 60:.0f} more minutes")
+
+    def success(self):
+        if self.state.get('failures'):
+            self.store.set(self.name, {'failures': 0, 'opened_at': None})
+
+    def failure(self):
+        failures = self.state.get('failures', 0) + 1
+        opened_at = self.state.get('opened_at')
+        if failures >= self.threshold:
+            if not self.is_open():
+                print(f"   🔌 {self.name} circuit opened after {failures} failures in a row "
+                      f"(cooling down {self.cooldown / 60:.0f} minutes)")
+            opened_at = time.time()
+        self.store.set(self.name, {'failures': failures, 'opened_at': opened_at})
+
+    def __enter__(self):
+        self.check()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.success()
+        elif not issubclass(exc_type, (CircuitOpenError, asyncio.CancelledError)):
+            self.failure()
+        return False
+
+
+class BreakerStore:
+    """Circuit breaker state for one account, saved to state/breakers-<hash>.json"""
+
+    def __init__(self, username, state_dir='state'):
+        digest = hashlib.sha256(username.lower().encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(state_dir, f'breakers-{digest}.json')
+        try:
+            with open(self.path, 'r') as f:
+                self.states = json.load(f)
+        except (OSError, ValueError):
+            self.states = {}
+
+    def get(self, name):
+        return self.states.get(name, {})
+
+    def set(self, name, state):
+        self.states[name] = state
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.states, f)
+        os.replace(tmp_path, self.path)
+
+
+class RetryEngine:
+    """Runs steps with retries and logs every failed attempt"""
+
+    def __init__(self, policy, metrics=None, waits=None):
+        """
+        Args:
+            policy (RetryPolicy): Attempts and backoff
+            metrics (RunMetrics): Supplies the run ID, account and log folder for the retry log
+            waits (WaitEngine): Backoff pauses are recorded as waits when given
+        """
+        self.policy = policy
+        self.metrics = metrics
+        self.waits = waits
+        self.retries = []
+
+    def reset(self):
+        """Forget this run's retries (start of a new run)"""
+        self.retries = []
+
+    def _log(self, record):
+        self.retries.append(record)
+        if self.metrics is None:
+            return
+        os.makedirs(self.metrics.log_dir, exist_ok=True)
+        path = os.path.join(self.metrics.log_dir, f"retries-{datetime.now().strftime('%Y%m%d')}.jsonl")
+        record = dict(record, run_id=self.metrics.run_id, account=self.metrics.account,
+                      time=datetime.now().isoformat(timespec='seconds'))
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    async def run(self, step, action, item=None, already_done=None, before_retry=None):
+        """
+        Run `action` until it succeeds or its attempts run out.
+
+        Args:
+            step (str): Step name used for the attempt count and the retry log
+            action: Coroutine function performing the step
+            item: What the step works on (e.g. the ad number), for the log
+            already_done: Coroutine function returning True if the step's effect happened
+                          despite the error - checked before each retry (idempotency)
+            before_retry: Coroutine function putting the page back in a state to retry from
+
+        Returns:
+            The action's result (None if already_done said the step had completed)
+
+        Raises:
+            The last error once every attempt failed; CircuitOpenError at once, never retried
+        """
+        attempts = self.policy.attempts_for(step)
+        for attempt in range(1, attempts + 1):
+            try:
+                return await action()
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                last_attempt = attempt == attempts
+                delay = 0 if last_attempt else self.policy.delay(attempt)
+                self._log({'step': step, 'item': item, 'attempt': attempt, 'of': attempts,
+                           'error': str(e).splitlines()[0][:300] if str(e) else type(e).__name__,
+                           'delay': round(delay, 2), 'gave_up': last_attempt})
+                if last_attempt:
+                    raise
+                label = f"{step} #{item}" if item is not None else step
+                print(f"   🔁 {label} failed (attempt {attempt}/{attempts}): {str(e).splitlines()[0] if str(e) else e!r}")
+                print(f"      Retrying in {delay:.1f}s...")
+
+            if self.waits is not None:
+                await self.waits.pause(delay, f'retry backoff {step}')
+            else:
+                await asyncio.sleep(delay)
+            if already_done is not None and await already_done():
+                print(f"   ✅ {step} had completed despite the error - not repeating it")
+                return None
+            if before_retry is not None:
+                await before_retry()
+
+    def print_summary(self):
+        """Which steps needed retries this run"""
+        if not self.retries:
+            return
+        print(f"\n🔁 {len(self.retries)} failed attempts this run")
+        for record in self.retries:
+            label = f"{record['step']} #{record['item']}" if record['item'] is not None else record['step']
+            outcome = "gave up" if record['gave_up'] else "retried"
+            print(f"   {label} attempt {record['attempt']}/{record['of']} {outcome}: {record['error']}")
+
+
+def load_retry_log(log_dir='logs', days=7):
+    """Retry records from the last `days` daily log files"""
+    cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
+    records = []
+    for path in sorted(glob.glob(os.path.join(log_dir, 'retries-*.jsonl'))):
+        if os.path.basename(path)[len('retries-'):-len('.jsonl')] < cutoff:
+            continue
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    log_dir = sys.argv[2] if len(sys.argv) > 2 else 'logs'
+    records = load_retry_log(log_dir, days)
+    if not records:
+        print(f"No retries logged in {log_dir}/ over the last {days} days")
+        return
+    steps = {}
+    for record in records:
+        entry = steps.setdefault(record['step'], {'retried': 0, 'gave_up': 0, 'runs': set()})
+        entry['gave_up' if record['gave_up'] else 'retried'] += 1
+        entry['runs'].add(record.get('run_id'))
+    print(f"🔁 Retries over the last {days} days ({log_dir}/)")
+    print(f"   {'step':<24} {'retried':>8} {'gave up':>8} {'runs':>6}")
+    for step, entry in sorted(steps.items(), key=lambda item: -(item[1]['retried'] + item[1]['gave_up'])):
+        print(f"   {step:<24} {entry['retried']:>8} {entry['gave_up']:>8} {len(entry['runs']):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""ad_catalog.validate_ad - Kijiji's form limits, checked before the browser starts"""
+
+import json
+
+import pytest
+
+from ad_catalog import CatalogError, load_catalog, validate_ad, MAX_TITLE_LENGTH, MAX_DESCRIPTION_LENGTH, MAX_TAGS
+
+
+def make_ad(**fields):
+    ad = {
+        'name': 'ad1',
+        'title': 'Furnished Basement Room Scarborough',
+        'description': 'Bright room near the TTC.',
+        'price': '500',
+        'phone': '647-607-4050',
+        'location': '138 Chillery Avenue',
+        'tags': ['furnished', 'scarborough'],
+        'images': [],
+    }
+    ad.update(fields)
+    return ad
+
+
+def test_valid_ad_has_no_problems():
+    assert validate_ad(make_ad(), check_images=False) == []
+
+
+def test_missing_required_fields_are_all_reported():
+    problems = validate_ad(make_ad(title='', description=None, price=''), check_images=False)
+    assert problems == ['missing title', 'missing description', 'missing price']
+
+
+def test_location_must_be_a_non_empty_string():
+    assert validate_ad(make_ad(location=''), check_images=False) == ['missing location']
+    assert validate_ad(make_ad(location='   '), check_images=False) == ['missing location']
+    assert validate_ad(make_ad(location=None), check_images=False) == ['missing location']
+    problems = validate_ad(make_ad(location=['138 Chillery Avenue']), check_images=False)
+    assert len(problems) == 1 and problems[0].startswith('location should be an address string')
+
+
+def test_length_limits():
+    problems = validate_ad(make_ad(title='x' * (MAX_TITLE_LENGTH + 1),
+                                   description='x' * (MAX_DESCRIPTION_LENGTH + 1)), check_images=False)
+    assert problems == [f"title is {MAX_TITLE_LENGTH + 1} characters (Kijiji allows {MAX_TITLE_LENGTH})",
+                        f"description is {MAX_DESCRIPTION_LENGTH + 1} characters (Kijiji allows {MAX_DESCRIPTION_LENGTH})"]
+
+
+def test_price_and_phone_formats():
+    assert validate_ad(make_ad(price='450.00', phone='6476074050'), check_images=False) == []
+    problems = validate_ad(make_ad(price='$500', phone='647-607'), check_images=False)
+    assert problems == ["price '$500' should be a plain amount like 500 or 450.00",
+                        "phone '647-607' should be a 10-digit number"]
+
+
+def test_tags():
+    assert validate_ad(make_ad(tags='furnished'), check_images=False) == ['tags should be a list']
+    problems = validate_ad(make_ad(tags=[f'tag{i}' for i in range(MAX_TAGS + 1)]), check_images=False)
+    assert problems == [f"{MAX_TAGS + 1} tags (Kijiji allows {MAX_TAGS})"]
+    problems = validate_ad(make_ad(tags=['x' * 21]), check_images=False)
+    assert problems == [f"tags longer than 20 characters: {'x' * 21}"]
+
+
+def test_missing_photos_only_checked_when_asked(tmp_path):
+    photo = tmp_path / 'room.jpg'
+    photo.write_bytes(b'jpeg')
+    missing = str(tmp_path / 'gone.jpg')
+    ad = make_ad(images=[str(photo), missing])
+    assert validate_ad(ad) == [f"missing photos: {missing}"]
+    assert validate_ad(ad, check_images=False) == []
+
+
+def test_wrong_types_are_reported_not_raised():
+    assert validate_ad(['ad1'], check_images=False) == [
+        "should be an object with title, description, price, phone, location, not list"]
+    problems = validate_ad(make_ad(title=42, description=['Bright room'],
+                                   tags=['furnished', 7, None], images='images/ad1/room.jpg'))
+    assert problems == ["title should be text", "description should be text",
+                        "tags should be text: 7, None", "images should be a list of photo paths"]
+    assert validate_ad(make_ad(images=['room.jpg', 3]), check_images=False) == [
+        "images should be a list of photo paths"]
+
+
+def test_load_catalog_reports_every_bad_entry(tmp_path):
+    catalog = tmp_path / 'catalog.json'
+    catalog.write_text(json.dumps({'defaults': make_ad(name=None),
+                                   'ads': ['ad1', {'name': 'ad2', 'images': 'room.jpg'}, {'name': 'ad3'}]}))
+    with pytest.raises(CatalogError) as error:
+        load_catalog(str(catalog), check_images=False)
+    assert error.value.problems == [
+        "ad #1: should be an object with title, description, price, phone, location, not str",
+        "ad2: images should be a list of photo paths"]
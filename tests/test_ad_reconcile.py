@@ -0,0 +1,84 @@
+"""ad_reconcile.plan_reconcile - which ads to keep, repost and delete"""
+
+import time
+
+from ad_reconcile import PostedAdStore, plan_reconcile
+
+NOW = 1_800_000_000.0
+
+
+def make_ad(name, title, price='500'):
+    return {'name': name, 'title': title, 'description': 'Room', 'price': price, 'phone': '6476074050',
+            'location': '138 Chillery Avenue', 'tags': [], 'images': []}
+
+
+def listing(ad_id, text):
+    return {'id': f'listing-id-{ad_id}', 'text': text}
+
+
+def posted(store, ad, hours_ago, ad_id=None):
+    store.record(ad, ad_id=ad_id)
+    store.ads[ad['name']]['posted_at'] = NOW - hours_ago * 3600
+
+
+def test_fresh_unchanged_ad_is_kept(tmp_path):
+    store = PostedAdStore('user@example.com', state_dir=str(tmp_path))
+    ad = make_ad('ad1', 'Furnished Room')
+    posted(store, ad, hours_ago=5)
+    plan = plan_reconcile([ad], [listing(111111, 'Furnished Room\n$500')], store, now=NOW)
+    assert [(a['name'], listing_id) for a, listing_id, _ in plan.keep] == [('ad1', 'listing-id-111111')]
+    assert plan.post == [] and plan.delete == []
+
+
+def test_missing_changed_aged_and_untracked(tmp_path):
+    store = PostedAdStore('user@example.com', state_dir=str(tmp_path))
+    changed, aged, untracked, missing = (make_ad('ad1', 'Room One'), make_ad('ad2', 'Room Two'),
+                                         make_ad('ad3', 'Room Three'), make_ad('ad4', 'Room Four'))
+    posted(store, changed, hours_ago=1)
+    posted(store, aged, hours_ago=100)
+    changed = dict(changed, price='550')
+    live = [listing(1000001, 'Room One'), listing(1000002, 'Room Two'), listing(1000003, 'Room Three')]
+
+    plan = plan_reconcile([changed, aged, untracked, missing], live, store, bump_age_hours=72, now=NOW)
+
+    assert plan.keep == []
+    assert [(ad['name'], reason) for ad, reason in plan.post] == [
+        ('ad1', 'changed'), ('ad2', 'aged 100h'), ('ad3', 'untracked'), ('ad4', 'missing')]
+    assert plan.delete == [('listing-id-1000001', 'ad1 changed'), ('listing-id-1000002', 'ad2 aged 100h'),
+                           ('listing-id-1000003', 'ad3 untracked')]
+
+
+def test_listings_not_in_catalog_are_deleted(tmp_path):
+    store = PostedAdStore('user@example.com', state_dir=str(tmp_path))
+    plan = plan_reconcile([], [listing(2000001, 'Old ad')], store, now=NOW)
+    assert plan.delete == [('listing-id-2000001', 'not in catalog')]
+
+
+def test_recorded_ad_id_wins_over_title(tmp_path):
+    store = PostedAdStore('user@example.com', state_dir=str(tmp_path))
+    ad = make_ad('ad1', 'Furnished Room')
+    posted(store, ad, hours_ago=1, ad_id='3000002')
+    # Two listings with the same title - only the one with the recorded ID is this ad
+    live = [listing(3000001, 'Furnished Room'), listing(3000002, 'Furnished Room')]
+    plan = plan_reconcile([ad], live, store, now=NOW)
+    assert [listing_id for _, listing_id, _ in plan.keep] == ['listing-id-3000002']
+    assert plan.delete == [('listing-id-3000001', 'not in catalog')]
+
+
+def test_renamed_ad_is_found_by_its_posted_title(tmp_path):
+    store = PostedAdStore('user@example.com', state_dir=str(tmp_path))
+    ad = make_ad('ad1', 'Old Title')
+    posted(store, ad, hours_ago=1)
+    renamed = dict(ad, title='New Title')
+    plan = plan_reconcile([renamed], [listing(4000001, 'Old  title')], store, now=NOW)
+    assert plan.delete == [('listing-id-4000001', 'ad1 changed')]
+    assert [(a['title'], reason) for a, reason in plan.post] == [('New Title', 'changed')]
+
+
+def test_store_keeps_ad_ids_between_instances(tmp_path):
+    store = PostedAdStore('User@Example.com', state_dir=str(tmp_path))
+    store.record(make_ad('ad1', 'Room'), ad_id='5000001')
+    store.record(make_ad('ad2', 'Room 2'))
+    reloaded = PostedAdStore('user@example.com', state_dir=str(tmp_path))
+    assert reloaded.ad_ids() == {'ad1': '5000001'}
+    assert reloaded.get('ad2')['posted_at'] <= time.time()
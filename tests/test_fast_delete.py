@@ -0,0 +1,127 @@
+"""fast_delete - which request is learned as the delete endpoint, and how it is saved"""
+
+import asyncio
+import json
+import os
+import stat
+
+from fast_delete import FastAdDeleter, response_confirms
+
+AD_ID = '1712345678'
+PAGE_URL = 'https://www.kijiji.ca/m-my-ads/active'
+
+
+class FakeResponse:
+    def __init__(self, status=200, payload=None):
+        self.ok = 200 <= status < 300
+        self.payload = payload
+
+    async def json(self):
+        if self.payload is None:
+            raise ValueError('not JSON')
+        return self.payload
+
+
+class FakeRequest:
+    def __init__(self, method, url, body=None, response=None, headers=None):
+        self.method = method
+        self.url = url
+        self.post_data = body
+        self.resource_type = 'fetch'
+        self.headers = headers or {}
+        self._response = response or FakeResponse()
+
+    async def response(self):
+        return self._response
+
+
+class FakePage:
+    url = PAGE_URL
+
+    def __init__(self):
+        self.listeners = {}
+
+    def on(self, event, handler):
+        self.listeners[event] = handler
+
+    def remove_listener(self, event, handler):
+        self.listeners.pop(event, None)
+
+
+def ui_delete(deleter, requests, listing_gone=True):
+    """Run a learning UI deletion that fires these requests; returns whether a template was learned"""
+    async def run():
+        page = FakePage()
+        recorder = deleter.learn(page, AD_ID)
+        with recorder:
+            for request in requests:
+                page.listeners['requestfinished'](request)
+        return await recorder.commit(listing_gone=listing_gone)
+    return asyncio.run(run())
+
+
+def deleter(tmp_path):
+    return FastAdDeleter(endpoint_file=str(tmp_path / 'delete_endpoint.json'))
+
+
+def test_tracking_beacons_are_not_learned(tmp_path):
+    fast = deleter(tmp_path)
+    beacons = [
+        FakeRequest('POST', 'https://analytics.example.com/collect', body=f'{{"event": "delete", "ad": "{AD_ID}"}}'),
+        FakeRequest('POST', 'https://www.kijiji.ca/events', body=f'{{"event": "click", "ad": "{AD_ID}"}}'),
+    ]
+    assert ui_delete(fast, beacons) is False
+    assert not fast.has_endpoint() and not os.path.exists(fast.endpoint_file)
+
+
+def test_failed_or_erroring_delete_is_not_learned(tmp_path):
+    fast = deleter(tmp_path)
+    assert ui_delete(fast, [FakeRequest('DELETE', f'https://www.kijiji.ca/api/ads/{AD_ID}',
+                                        response=FakeResponse(500))]) is False
+    graphql = FakeRequest('POST', 'https://www.kijiji.ca/anvil/api', body=f'{{"query": "mutation deleteAd", "id": "{AD_ID}"}}',
+                          response=FakeResponse(200, {'errors': [{'message': 'nope'}]}))
+    assert ui_delete(fast, [graphql]) is False
+    assert not fast.has_endpoint()
+
+
+def test_delete_is_only_learned_once_the_listing_is_gone(tmp_path):
+    request = FakeRequest('DELETE', f'https://www.kijiji.ca/api/ads/{AD_ID}')
+    fast = deleter(tmp_path)
+    assert ui_delete(fast, [request], listing_gone=False) is False
+    assert not fast.has_endpoint()
+
+    assert ui_delete(fast, [request], listing_gone=True) is True
+    assert fast.endpoint['url'] == 'https://www.kijiji.ca/api/ads/{ad_id}'
+    assert not fast.is_verified()
+    fast.mark_verified()
+    assert deleter(tmp_path).is_verified()
+
+
+def test_saved_template_is_private_and_has_no_credentials(tmp_path):
+    request = FakeRequest('POST', 'https://www.kijiji.ca/anvil/api',
+                          body=f'{{"query": "mutation DeleteAd($id: ID!)", "variables": {{"id": "{AD_ID}"}}}}',
+                          response=FakeResponse(200, {'data': {'deleteAd': True}}),
+                          headers={'Authorization': 'Bearer secret', 'Cookie': 'session=secret',
+                                   'x-ecg-ver': '1.0', 'content-type': 'application/json'})
+    fast = deleter(tmp_path)
+    assert ui_delete(fast, [request]) is True
+
+    assert stat.S_IMODE(os.stat(fast.endpoint_file).st_mode) == 0o600
+    with open(fast.endpoint_file) as f:
+        saved = json.load(f)
+    assert saved['headers'] == {'x-ecg-ver': '1.0', 'content-type': 'application/json'}
+    assert '{ad_id}' in saved['body'] and AD_ID not in saved['body']
+
+
+def test_configured_endpoint_is_trusted():
+    assert FastAdDeleter(endpoint_file='/nonexistent', endpoint={'method': 'DELETE', 'url': 'x'}).is_verified()
+
+
+def test_response_confirms():
+    async def check(response):
+        return await response_confirms(response)
+    assert asyncio.run(check(FakeResponse(204)))
+    assert asyncio.run(check(FakeResponse(200, {'data': {'deleteAd': True}})))
+    assert not asyncio.run(check(FakeResponse(200, {'errors': ['x']})))
+    assert not asyncio.run(check(FakeResponse(404)))
+    assert not asyncio.run(check(None))
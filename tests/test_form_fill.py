@@ -0,0 +1,37 @@
+"""form_fill.fill_form_fields - the in-page script gets the registry's candidates"""
+
+import asyncio
+
+from form_fill import FAST_FILL_SCRIPT, FIELD_ELEMENTS, fill_form_fields
+from selector_registry import SelectorRegistry
+
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+
+    async def evaluate(self, script, arg):
+        self.calls.append((script, arg))
+        return {'ok': True, 'missing': [], 'filled': list(arg['selectors'])}
+
+
+AD = {'description': 'Bright room', 'tags': ('room', 'downtown'), 'price': 650, 'phone': '4165550100'}
+
+
+def test_every_field_gets_its_candidates_in_registry_order(tmp_path):
+    registry = SelectorRegistry(stats_file=str(tmp_path / 'stats.json'),
+                                overrides={'price': ['input[name="price"]', '#PriceAmount']})
+    # '#pstad-descrptn' matched last time, so the registry (and the script) try it first
+    registry._record('description', '#pstad-descrptn', True, 40.0)
+    page = FakePage()
+
+    asyncio.run(fill_form_fields(page, AD, registry))
+
+    script, arg = page.calls[0]
+    assert script == FAST_FILL_SCRIPT
+    assert set(arg['selectors']) == set(FIELD_ELEMENTS)
+    for field, element in FIELD_ELEMENTS.items():
+        assert arg['selectors'][field] == registry.candidates(element)
+    assert arg['selectors']['description'][0] == '#pstad-descrptn'
+    assert arg['selectors']['price'] == ['input[name="price"]', '#PriceAmount']
+    assert (arg['price'], arg['tags']) == ('650', ['room', 'downtown'])
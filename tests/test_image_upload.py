@@ -0,0 +1,111 @@
+"""image_upload.UploadWatcher - confirming, re-sending and the untrackable-upload fallback"""
+
+import asyncio
+import time
+
+import pytest
+
+from image_upload import UploadWatcher, UploadIncomplete
+from page_waits import WaitEngine
+
+
+class FakeRequest:
+    def __init__(self, url, body_size, ok=True):
+        self.url = url
+        self.method = 'POST'
+        self.body_size = body_size
+        self.ok = ok
+
+    async def response(self):
+        return self
+
+    async def sizes(self):
+        return {'requestBodySize': self.body_size}
+
+
+class FakePage:
+    def __init__(self):
+        self.listeners = {}
+        self.thumbnails = 0
+
+    def on(self, event, handler):
+        self.listeners[event] = handler
+
+    def remove_listener(self, event, handler):
+        self.listeners.pop(event, None)
+
+    def locator(self, selector):
+        page = self
+
+        class Thumbnails:
+            async def count(self):
+                return page.thumbnails
+        return Thumbnails()
+
+    async def upload(self, request):
+        self.listeners['request'](request)
+        if request.ok:
+            await self.listeners['requestfinished'](request)
+        else:
+            self.listeners['requestfailed'](request)
+
+
+@pytest.fixture
+def photos(tmp_path):
+    paths = []
+    for index, size in enumerate((1000, 5000)):
+        path = tmp_path / f'photo{index}.jpg'
+        path.write_bytes(b'x' * size)
+        paths.append(str(path))
+    return paths
+
+
+def watcher(page, photos, **kwargs):
+    return UploadWatcher(page, photos, base_timeout=300, seconds_per_mb=0, **kwargs)
+
+
+def test_confirmed_by_upload_responses(photos):
+    async def run():
+        page = FakePage()
+        upload = watcher(page, photos)
+        await page.upload(FakeRequest('https://x/upload', 5100))
+        await page.upload(FakeRequest('https://x/upload', 1100))
+        return await upload.wait(WaitEngine())
+    assert asyncio.run(run()) is True
+
+
+def test_failed_photo_is_resent_then_fails(photos):
+    resent = []
+
+    async def run():
+        page = FakePage()
+        upload = watcher(page, photos)
+
+        async def resend(files):
+            resent.append(files)
+            await page.upload(FakeRequest('https://x/upload', 1100, ok=False))
+
+        await page.upload(FakeRequest('https://x/upload', 5100))
+        await page.upload(FakeRequest('https://x/upload', 1100, ok=False))
+        await upload.wait(WaitEngine(), resend=resend, retries=1)
+
+    with pytest.raises(UploadIncomplete):
+        asyncio.run(run())
+    assert resent == [[photos[0]]]
+
+
+def test_no_upload_signal_at_all_falls_back_to_a_fixed_wait(photos):
+    resent = []
+
+    async def resend(files):
+        resent.append(files)
+
+    async def run():
+        upload = watcher(FakePage(), photos, fallback_wait=200)
+        started = time.perf_counter()
+        result = await upload.wait(WaitEngine(), resend=resend)
+        return result, time.perf_counter() - started
+
+    result, elapsed = asyncio.run(run())
+    assert result is False and resent == []
+    assert 0.15 <= elapsed < 0.3
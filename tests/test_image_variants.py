@@ -0,0 +1,39 @@
+"""image_variants.VariantGenerator - every variant set has to pass the duplicate photo check"""
+
+import os
+
+from image_variants import VariantGenerator, list_images
+from photo_hash_index import PhotoHashIndex
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'images', 'ad3')
+
+
+def generator(tmp_path):
+    # No mirroring - the hardest case, every variant differs by crop and colour alone
+    return VariantGenerator(cache_dir=str(tmp_path / 'variants'), canvas=(400, 300), mirror_probability=0)
+
+
+def test_variants_are_not_near_duplicates_of_each_other(tmp_path):
+    variant_sets = generator(tmp_path).generate(list_images(SOURCE), 4)
+    assert len(variant_sets) == 4 and all(os.path.isfile(path) for paths in variant_sets for path in paths)
+
+    index = PhotoHashIndex(index_file=str(tmp_path / 'hashes.json'),
+                           folders_glob=str(tmp_path / 'variants' / '*' / 'variant*'))
+    index.refresh()
+    assert len(index.entries) == 4 * len(list_images(SOURCE))
+    assert index.near_duplicates(threshold=6) == []
+
+
+def test_more_variants_stay_apart_from_the_cached_ones(tmp_path):
+    source_files = list_images(SOURCE)
+    first = generator(tmp_path).generate(source_files, 2)
+    cached = {path: os.path.getmtime(path) for paths in first for path in paths}
+
+    more = generator(tmp_path).generate(source_files, 4)
+    assert more[:2] == first
+    assert all(os.path.getmtime(path) == mtime for path, mtime in cached.items())
+
+    index = PhotoHashIndex(index_file=str(tmp_path / 'hashes.json'),
+                           folders_glob=str(tmp_path / 'variants' / '*' / 'variant*'))
+    index.refresh()
+    assert index.near_duplicates(threshold=6) == []
@@ -0,0 +1,76 @@
+"""page_waits.WaitEngine.response - waiting on the request an action fires"""
+
+import asyncio
+
+import pytest
+
+from page_waits import WaitEngine
+
+
+class FakeResponse:
+    def __init__(self, url, method='POST', ok=True):
+        self.url = url
+        self.ok = ok
+        self.request = type('Request', (), {'method': method})()
+
+
+class ExpectResponse:
+    """Stands in for page.expect_response(): the first fired response the predicate accepts"""
+
+    def __init__(self, page, predicate):
+        self.page = page
+        self.predicate = predicate
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def value(self):
+        async def first_match():
+            for response in self.page.fired:
+                if self.predicate(response):
+                    return response
+            raise TimeoutError('no matching response')
+        return first_match()
+
+
+class FakePage:
+    def __init__(self, responses):
+        self.responses = responses
+        self.fired = []
+
+    def expect_response(self, predicate, timeout):
+        return ExpectResponse(self, predicate)
+
+    async def click(self):
+        self.fired.extend(self.responses)
+
+
+def wait(page, **kwargs):
+    return asyncio.run(WaitEngine().response(page, 'publish', page.click, **kwargs))
+
+
+def test_ok_only_for_a_successful_matching_response():
+    assert wait(FakePage([FakeResponse('/api/ads/d1/publish')])).ok
+    assert not wait(FakePage([FakeResponse('/api/ads/d1/publish', ok=False)])).ok
+    assert not wait(FakePage([FakeResponse('/api/ads/d1/draft')])).ok
+
+
+def test_method_filter_skips_other_requests_to_the_same_url():
+    page = FakePage([FakeResponse('/static/publish.js', method='GET', ok=False),
+                     FakeResponse('/api/ads/d1/publish', method='POST')])
+    assert wait(page, method='POST').ok
+    assert not wait(FakePage(page.responses), method='PUT').ok
+
+
+def test_a_failing_action_raises_instead_of_reading_as_a_timeout():
+    page = FakePage([])
+
+    async def broken_click():
+        raise RuntimeError('element detached')
+
+    with pytest.raises(RuntimeError, match='detached'):
+        asyncio.run(WaitEngine().response(page, 'publish', broken_click))
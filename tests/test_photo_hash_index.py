@@ -0,0 +1,68 @@
+"""photo_hash_index - banded near-duplicate search and what gets compared with what"""
+
+from itertools import combinations
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from photo_hash_index import PhotoHashIndex, hamming, dhash
+
+
+def index_with(tmp_path, hashes, **kwargs):
+    index = PhotoHashIndex(index_file=str(tmp_path / 'hashes.json'), folders_glob=str(tmp_path / 'none*'), **kwargs)
+    index.entries = {path: {'mtime': 0, 'size': 0, 'hash': value} for path, value in hashes.items()}
+    return index
+
+
+@pytest.mark.parametrize('threshold', [0, 3, 6, 10])
+def test_banding_finds_exactly_the_pairs_a_full_comparison_finds(tmp_path, threshold):
+    rng = np.random.default_rng(threshold)
+    base = [int(rng.integers(0, 2 ** 63)) for _ in range(10)]
+    hashes = {}
+    for i, value in enumerate(base):
+        hashes[f'ad{i}/a.jpg'] = value
+        # A near copy in another folder, `i` bits flipped
+        flipped = value
+        for bit in rng.choice(64, size=i, replace=False):
+            flipped ^= 1 << int(bit)
+        hashes[f'copy{i}/a.jpg'] = flipped
+
+    index = index_with(tmp_path, hashes)
+    expected = {tuple(sorted((a, b))) for a, b in combinations(hashes, 2)
+                if hamming(hashes[a], hashes[b]) <= threshold}
+    assert {(a, b) for a, b, _ in index.near_duplicates(threshold)} == expected
+
+
+def test_pairs_within_one_folder_are_ignored(tmp_path):
+    index = index_with(tmp_path, {'ad1/a.jpg': 0b1011, 'ad1/b.jpg': 0b1011, 'ad2/c.jpg': 0b1010})
+    assert index.near_duplicates(1) == [('ad1/a.jpg', 'ad2/c.jpg', 1), ('ad1/b.jpg', 'ad2/c.jpg', 1)]
+    assert len(index.near_duplicates(1, across_folders_only=False)) == 3
+
+
+def test_listed_photos_are_compared_between_ads_not_folders(tmp_path):
+    photo_sets = {'ad1': ['shared/a.jpg'], 'ad2': ['shared/b.jpg', 'both/c.jpg'], 'ad3': ['both/c.jpg']}
+    index = index_with(tmp_path, {'shared/a.jpg': 7, 'shared/b.jpg': 7}, photo_sets=photo_sets)
+    assert index.near_duplicates(0) == [('shared/a.jpg', 'shared/b.jpg', 0)]
+    assert index.shared_photos() == {'both/c.jpg': ['ad2', 'ad3']}
+
+
+def test_refresh_indexes_listed_photos_and_extra_folders(tmp_path):
+    def save(path, seed):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pixels = np.random.default_rng(seed).integers(0, 255, (40, 60, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(path)
+        return str(path)
+
+    listed = save(tmp_path / 'elsewhere' / 'room.png', 1)
+    variant_a = save(tmp_path / 'variants' / 'key' / 'variant1' / 'room.png', 2)
+    variant_b = save(tmp_path / 'variants' / 'key' / 'variant2' / 'room.png', 2)
+    index = PhotoHashIndex(index_file=str(tmp_path / 'hashes.json'), folders_glob=str(tmp_path / 'images' / 'ad*'),
+                           photo_sets={'ad1': [listed]},
+                           extra_globs=(str(tmp_path / 'variants' / '*' / 'variant*'),))
+    assert index.refresh() == 3
+    assert sorted(index.entries) == sorted([listed, variant_a, variant_b])
+    assert index.entries[listed]['hash'] == dhash(listed)
+    assert index.near_duplicates(0) == [(variant_a, variant_b, 0)]
+    # Unchanged files aren't hashed again
+    assert index.refresh() == 0
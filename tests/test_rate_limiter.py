@@ -0,0 +1,109 @@
+"""rate_limiter.RateLimiter - token bucket refill and the shared per-account/global budget"""
+
+import asyncio
+
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter
+
+LIMITS = {'post': {'per_minute': 6, 'burst': 2, 'global_per_minute': None}}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, 'time', clock)
+    return clock
+
+
+def limiter(tmp_path, username='user@example.com', limits=LIMITS):
+    return RateLimiter(username, db_file=str(tmp_path / 'rate_limits.sqlite'), limits=limits)
+
+
+def test_burst_then_wait_for_refill(tmp_path, clock):
+    limits = limiter(tmp_path)
+    buckets = limits.buckets('post')
+    assert limits._take(buckets) == 0
+    assert limits._take(buckets) == 0
+    # Burst used up - 6 a minute refills one token every 10 seconds
+    assert limits._take(buckets) == pytest.approx(10)
+    clock.now += 4
+    assert limits._take(buckets) == pytest.approx(6)
+    clock.now += 6
+    assert limits._take(buckets) == 0
+
+
+def test_refill_stops_at_burst(tmp_path, clock):
+    limits = limiter(tmp_path)
+    buckets = limits.buckets('post')
+    limits._take(buckets)
+    clock.now += 3600
+    assert [limits._take(buckets) for _ in range(3)] == [0, 0, pytest.approx(10)]
+
+
+def test_global_bucket_is_shared_between_accounts(tmp_path, clock):
+    shared = {'post': {'per_minute': None, 'global_per_minute': 60, 'global_burst': 1}}
+    first = limiter(tmp_path, 'first@example.com', shared)
+    second = limiter(tmp_path, 'second@example.com', shared)
+    assert [key for key, _, _ in first.buckets('post')] == ['post:global']
+    assert first._take(first.buckets('post')) == 0
+    assert second._take(second.buckets('post')) == pytest.approx(1)
+
+
+def test_account_buckets_are_separate(tmp_path, clock):
+    first = limiter(tmp_path, 'first@example.com')
+    second = limiter(tmp_path, 'second@example.com')
+    for _ in range(2):
+        first._take(first.buckets('post'))
+    assert first._take(first.buckets('post')) > 0
+    assert second._take(second.buckets('post')) == 0
+
+
+def test_disabled_limiter_never_waits(tmp_path):
+    limits = RateLimiter('user@example.com', db_file=str(tmp_path / 'rate_limits.sqlite'), enabled=False)
+    assert limits.buckets('login') == []
+    assert asyncio.run(limits.acquire('login')) == 0
+
+
+def test_acquire_waits_and_records_it(tmp_path):
+    fast = {'delete': {'per_minute': 600, 'burst': 1, 'global_per_minute': None}}
+    limits = limiter(tmp_path, limits=fast)
+
+    async def two_deletes():
+        return [await limits.acquire('delete'), await limits.acquire('delete')]
+
+    first, second = asyncio.run(two_deletes())
+    assert first == 0 and 0 < second < 1
+    assert limits.waited['delete'][0] == 1
+
+
+def test_two_limiters_share_the_global_and_keep_their_own_account_buckets(tmp_path, clock):
+    # Burst of 2 per account, 3 across every account; 6 a minute per account, 12 globally
+    both = {'post': {'per_minute': 6, 'burst': 2, 'global_per_minute': 12, 'global_burst': 3}}
+    first = limiter(tmp_path, 'first@example.com', both)
+    second = limiter(tmp_path, 'second@example.com', both)
+
+    # The first account uses its whole burst, the second gets the one global token left
+    assert [first._take(first.buckets('post')) for _ in range(2)] == [0, 0]
+    assert second._take(second.buckets('post')) == 0
+    # Global bucket empty - both accounts wait for it (12 a minute = one token per 5s),
+    # and the first also for its own bucket (6 a minute = one token per 10s)
+    assert second._take(second.buckets('post')) == pytest.approx(5)
+    assert first._take(first.buckets('post')) == pytest.approx(10)
+
+    # 5s later the global bucket has a token again - the second account may post, the first may not
+    clock.now += 5
+    assert first._take(first.buckets('post')) == pytest.approx(5)
+    assert second._take(second.buckets('post')) == 0
+    # Another 5s: the first account's own bucket has refilled a token, and the global one too
+    clock.now += 5
+    assert first._take(first.buckets('post')) == 0
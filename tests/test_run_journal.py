@@ -0,0 +1,90 @@
+"""run_journal.RunJournal - resuming unfinished runs of the same run key"""
+
+import json
+import os
+import time
+
+from run_journal import RunJournal, read_journal
+
+
+def journal(tmp_path, **kwargs):
+    return RunJournal('user@example.com', journal_dir=str(tmp_path), **kwargs)
+
+
+def test_unfinished_run_is_resumed_with_its_completed_steps(tmp_path):
+    first = journal(tmp_path)
+    assert first.begin('dual:ad1,ad2') is False
+    first.step_done('login')
+    first.step_done('post_ad', 'ad1', ad_id='1234567')
+    first.fail('checkout stalled')
+
+    second = journal(tmp_path)
+    assert second.begin('dual:ad1,ad2') is True
+    assert second.run_id == first.run_id and second.path == first.path
+    assert second.done('login') and second.done('post_ad', 'ad1')
+    assert not second.done('post_ad', 'ad2')
+    assert second.describe() == 'login, post_ad'
+
+
+def test_finished_run_starts_fresh(tmp_path):
+    first = journal(tmp_path)
+    first.begin('dual:ad1,ad2')
+    first.step_done('login')
+    first.finish()
+
+    second = journal(tmp_path)
+    assert second.begin('dual:ad1,ad2') is False
+    assert second.run_id != first.run_id
+    assert not second.done('login')
+
+
+def test_other_run_key_is_not_resumed(tmp_path):
+    first = journal(tmp_path)
+    first.begin('dual:ad1,ad2')
+    first.step_done('login')
+
+    second = journal(tmp_path)
+    assert second.begin('triple:ad1,ad2,ad3') is False
+    assert not second.done('login')
+
+
+def test_resume_off_and_old_runs_start_fresh(tmp_path):
+    first = journal(tmp_path)
+    first.begin('dual:ad1,ad2')
+    assert journal(tmp_path, resume=False).begin('dual:ad1,ad2') is False
+
+    # Backdate the last run past the resume window
+    latest = sorted(os.listdir(first.account_dir))[-1]
+    path = os.path.join(first.account_dir, latest)
+    events = read_journal(path)
+    events[0]['time'] = time.time() - 25 * 3600
+    with open(path, 'w') as f:
+        f.writelines(json.dumps(event) + '\n' for event in events)
+    assert journal(tmp_path, resume_window_hours=24).begin('dual:ad1,ad2') is False
+
+
+def test_line_cut_short_by_a_crash_is_skipped(tmp_path):
+    first = journal(tmp_path)
+    first.begin('dual:ad1,ad2')
+    first.step_done('login')
+    with open(first.path, 'a') as f:
+        f.write('{"event": "step_do')
+
+    second = journal(tmp_path)
+    assert second.begin('dual:ad1,ad2') is True
+    second.step_done('delete_existing_ads')
+    assert [event.get('step') for event in read_journal(second.path) if event['event'] == 'step_done'] == [
+        'login', 'delete_existing_ads']
+
+
+def test_disabled_journal_writes_nothing_and_never_resumes(tmp_path):
+    live = journal(tmp_path)
+    live.begin('dual:ad1,ad2')
+    live.step_done('login')
+
+    replay = journal(tmp_path, enabled=False)
+    assert replay.begin('dual:ad1,ad2') is False
+    replay.step_done('delete_existing_ads')
+    replay.fail('replay failed')
+    assert replay.path is None and not replay.done('delete_existing_ads')
+    assert len(os.listdir(live.account_dir)) == 1
@@ -0,0 +1,119 @@
+"""selector_registry.SelectorRegistry - candidate ordering and what counts as a miss"""
+
+import asyncio
+
+import pytest
+
+import selector_registry
+from selector_registry import SelectorRegistry, SelectorNotFound
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state, timeout):
+        self.page.tries.append(self.selector)
+        behaviour = self.page.behaviour.get(self.selector, 'absent')
+        if behaviour == 'visible':
+            return
+        if behaviour == 'invalid':
+            raise ValueError(f'Unexpected token in {self.selector}')
+        raise TimeoutError(f'{self.selector} not {state} within {timeout}ms')
+
+    async def count(self):
+        behaviour = self.page.behaviour.get(self.selector, 'absent')
+        if behaviour == 'invalid':
+            raise ValueError(f'Unexpected token in {self.selector}')
+        return 0 if behaviour == 'absent' else 1
+
+
+class FakePage:
+    """behaviour per selector: 'visible', 'slow' (present, not yet visible), 'absent' or 'invalid'"""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.tries = []
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+
+def registry(tmp_path, **selectors):
+    return SelectorRegistry(stats_file=str(tmp_path / 'selector_stats.json'), candidate_timeout=10,
+                            default_timeout=200, overrides=selectors)
+
+
+def test_untried_candidates_keep_their_listed_order(tmp_path):
+    assert registry(tmp_path, button=['a', 'b', 'c']).candidates('button') == ['a', 'b', 'c']
+
+
+def test_working_candidates_first_fastest_first_failed_last(tmp_path):
+    selectors = registry(tmp_path, button=['a', 'b', 'c', 'd'])
+    selectors.stats = {'button': {
+        'a': {'hits': 3, 'misses': 1, 'total_ms': 30.0, 'last_ok': False},
+        'c': {'hits': 2, 'misses': 0, 'total_ms': 400.0, 'last_ok': True},
+        'd': {'hits': 4, 'misses': 0, 'total_ms': 40.0, 'last_ok': True},
+    }}
+    assert selectors.candidates('button') == ['d', 'c', 'b', 'a']
+
+
+def test_unknown_element_is_a_key_error(tmp_path):
+    with pytest.raises(KeyError):
+        registry(tmp_path).candidates('no_such_element')
+
+
+def test_match_is_recorded_and_saved(tmp_path):
+    selectors = registry(tmp_path, button=['#old', '#new'])
+    page = FakePage({'#new': 'visible'})
+    asyncio.run(selectors.resolve(page, 'button'))
+    selectors.save()
+
+    reloaded = registry(tmp_path, button=['#old', '#new'])
+    assert reloaded.stats['button']['#new']['last_ok'] is True
+    assert reloaded.stats['button']['#old']['misses'] == 1
+    assert reloaded.candidates('button') == ['#new', '#old']
+
+
+def test_present_but_slow_candidate_is_not_a_miss(tmp_path):
+    selectors = registry(tmp_path, button=['#slow', '#gone', '#fallback'])
+    page = FakePage({'#slow': 'slow', '#fallback': 'visible'})
+    asyncio.run(selectors.resolve(page, 'button'))
+    assert '#slow' not in selectors.stats['button']
+    assert selectors.stats['button']['#gone']['misses'] == 1
+
+
+def test_placeholders_are_filled(tmp_path):
+    selectors = registry(tmp_path, option=['role=option[name="{location}"]'])
+    page = FakePage({'role=option[name="138 Chillery Avenue"]': 'visible'})
+    assert asyncio.run(selectors.resolve(page, 'option', location='138 Chillery Avenue')) is not None
+
+
+def test_failing_candidates_back_off_between_rounds(tmp_path, monkeypatch):
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        await real_sleep(seconds)
+
+    monkeypatch.setattr(selector_registry.asyncio, 'sleep', sleep)
+    selectors = registry(tmp_path, button=['button:has-text(', '#gone'])
+    page = FakePage({'button:has-text(': 'invalid'})
+    with pytest.raises(SelectorNotFound):
+        asyncio.run(selectors.resolve(page, 'button', timeout=500))
+    # Rounds are spaced out (0.1, 0.2, ...) instead of retrying in a tight loop
+    assert sleeps[:2] == [0.1, 0.2]
+    assert len(page.tries) < 20
+    assert selectors.stats['button']['#gone']['misses'] == 1
+
+
+def test_optional_element_returns_none_without_counting_misses(tmp_path):
+    selectors = registry(tmp_path, drawer=['#drawer'])
+    assert asyncio.run(selectors.resolve(FakePage({}), 'drawer', timeout=30, optional=True)) is None
+    assert selectors.stats == {}
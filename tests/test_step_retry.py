@@ -0,0 +1,89 @@
+"""step_retry.CircuitBreaker and RetryPolicy"""
+
+import asyncio
+
+import pytest
+
+import step_retry
+from step_retry import BreakerStore, CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(step_retry.time, 'time', clock)
+    return clock
+
+
+def breaker(tmp_path, threshold=2, cooldown=60):
+    return CircuitBreaker('checkout', BreakerStore('user@example.com', state_dir=str(tmp_path)),
+                          threshold=threshold, cooldown=cooldown)
+
+
+def fail(guarded, error=RuntimeError):
+    with pytest.raises(error):
+        with guarded:
+            raise error('stalled')
+
+
+def test_opens_after_threshold_consecutive_failures(tmp_path, clock):
+    guarded = breaker(tmp_path)
+    fail(guarded)
+    assert not guarded.is_open()
+    fail(guarded)
+    assert guarded.is_open()
+    with pytest.raises(CircuitOpenError):
+        with guarded:
+            pytest.fail('an open breaker must not run the action')
+
+
+def test_success_resets_the_failure_count(tmp_path, clock):
+    guarded = breaker(tmp_path)
+    fail(guarded)
+    with guarded:
+        pass
+    fail(guarded)
+    assert not guarded.is_open()
+
+
+def test_trial_after_cooldown_closes_or_reopens(tmp_path, clock):
+    guarded = breaker(tmp_path)
+    fail(guarded)
+    fail(guarded)
+    clock.now += 61
+    assert not guarded.is_open()
+    # The trial fails - open again for a full cooldown
+    fail(guarded)
+    assert guarded.is_open()
+    clock.now += 61
+    with guarded:
+        pass
+    assert guarded.state == {'failures': 0, 'opened_at': None}
+
+
+def test_state_survives_between_runs(tmp_path, clock):
+    fail(breaker(tmp_path))
+    fail(breaker(tmp_path))
+    assert breaker(tmp_path).is_open()
+
+
+def test_open_breaker_and_cancellation_are_not_failures(tmp_path, clock):
+    guarded = breaker(tmp_path, threshold=1)
+    fail(guarded, asyncio.CancelledError)
+    assert guarded.state.get('failures', 0) == 0
+    fail(guarded, CircuitOpenError)
+    assert guarded.state.get('failures', 0) == 0
+
+
+def test_retry_delays_double_up_to_the_maximum():
+    policy = RetryPolicy(attempts={'default': 3, 'login': 2}, base_delay=2, max_delay=5, jitter=0)
+    assert [policy.delay(attempt) for attempt in (1, 2, 3)] == [2, 4, 5]
+    assert policy.attempts_for('login') == 2 and policy.attempts_for('post_ad') == 3
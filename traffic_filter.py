@@ -0,0 +1,143 @@
+"""
+Request Interception Layer for Kijiji Room Rental Automation
+Blocks third-party analytics, ad and font traffic and counts what each step loads
+
+Kijiji pages pull in a lot of tracking, advertising and web-font requests that the
+automation never needs. login() also waits for "networkidle", so every one of those
+requests directly delays the run. TrafficFilter routes all of the context's requests
+through allow/block lists (by domain and resource type) and keeps per-step counters
+of requests and bytes, so the time and bandwidth saved can be measured.
+
+Set measure_only=True to let everything through while still counting what *would*
+have been blocked - comparing a measuring run to a blocking run shows the savings.
+"""
+
+from collections import defaultdict
+from urllib.parse import urlparse
+
+# Third-party hosts the posting flow never needs (matched as domain suffixes)
+DEFAULT_BLOCKED_DOMAINS = [
+    'google-analytics.com', 'googletagmanager.com', 'googletagservices.com',
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'adservice.google.com',
+    'amazon-adsystem.com', 'adsrvr.org', 'criteo.com', 'criteo.net', 'taboola.com', 'outbrain.com',
+    'facebook.net', 'connect.facebook.net', 'bat.bing.com', 'clarity.ms',
+    'hotjar.com', 'optimizely.com', 'scorecardresearch.com', 'quantserve.com', 'quantcount.com',
+    'nr-data.net', 'newrelic.com', 'segment.io', 'segment.com', 'branch.io', 'braze.com',
+    'tiktok.com', 'snapchat.com', 'pinterest.com', 'moatads.com', 'pubmatic.com', 'rubiconproject.com',
+    'fonts.googleapis.com', 'fonts.gstatic.com', 'use.typekit.net',
+]
+
+# Resource types blocked everywhere (images stay - the upload thumbnails are images)
+DEFAULT_BLOCKED_TYPES = ['font', 'media']
+
+# Never blocked: Kijiji itself and the CAPTCHA providers its login may show
+DEFAULT_ALLOWED_DOMAINS = ['kijiji.ca', 'recaptcha.net', 'hcaptcha.com']
+ALLOWED_URL_PARTS = ['/recaptcha/']
+
+
+def domain_matches(host, domains):
+    """True if host is one of the domains or a subdomain of one"""
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class TrafficFilter:
+    """
+    Context-wide route filter with per-step request/byte counters.
+
+    Steps are tracked per page (set_step), so concurrent pages posting
+    different ads keep separate counters.
+    """
+
+    def __init__(self, blocked_domains=None, blocked_types=None, allowed_domains=None, measure_only=False):
+        """
+        Args:
+            blocked_domains (list): Extra domains to block (added to the defaults)
+            blocked_types (list): Resource types to block ('font', 'media', 'image', ...)
+            allowed_domains (list): Extra domains that are never blocked
+            measure_only (bool): Count would-be-blocked traffic without blocking it
+        """
+        self.blocked_domains = DEFAULT_BLOCKED_DOMAINS + list(blocked_domains or [])
+        self.blocked_types = set(DEFAULT_BLOCKED_TYPES if blocked_types is None else blocked_types)
+        self.allowed_domains = DEFAULT_ALLOWED_DOMAINS + list(allowed_domains or [])
+        self.measure_only = measure_only
+
+        self.page_steps = {}
+        self.would_block = set()
+        self.stats = defaultdict(lambda: {'allowed_requests': 0, 'allowed_bytes': 0,
+                                          'blocked_requests': 0, 'blocked_bytes': 0})
+
+    async def attach(self, context):
+        """Start filtering and counting every request made by the context"""
+        await context.route('**/*', self._handle_route)
+        context.on('requestfinished', self._on_finished)
+
+    def set_step(self, page, step):
+        """Attribute the page's traffic from now on to `step` (e.g. 'login', 'post_ad_2')"""
+        self.page_steps[id(page)] = step
+
+    def block_reason(self, request):
+        """Why the request should be blocked, or None to let it through"""
+        url = request.url
+        host = urlparse(url).hostname or ''
+        if domain_matches(host, self.allowed_domains) or any(part in url for part in ALLOWED_URL_PARTS):
+            return None
+        if request.resource_type in self.blocked_types:
+            return request.resource_type
+        if domain_matches(host, self.blocked_domains):
+            return host
+        return None
+
+    def _step_for(self, request):
+        try:
+            return self.page_steps.get(id(request.frame.page), 'other')
+        except Exception:
+            # Service-worker and detached-frame requests have no page
+            return 'other'
+
+    async def _handle_route(self, route, request):
+        if self.block_reason(request):
+            if not self.measure_only:
+                self.stats[self._step_for(request)]['blocked_requests'] += 1
+                await route.abort('blockedbyclient')
+                return
+            self.would_block.add(request)
+        # fallback() rather than continue_() so other routes (e.g. HAR replay) still apply
+        await route.fallback()
+
+    async def _on_finished(self, request):
+        try:
+            sizes = await request.sizes()
+            size = sizes['responseBodySize'] + sizes['responseHeadersSize']
+        except Exception:
+            size = 0
+        stats = self.stats[self._step_for(request)]
+        if request in self.would_block:
+            self.would_block.discard(request)
+            stats['blocked_requests'] += 1
+            stats['blocked_bytes'] += size
+        else:
+            stats['allowed_requests'] += 1
+            stats['allowed_bytes'] += size
+
+    def reset(self):
+        """Clear the counters (start of a new run)"""
+        self.page_steps.clear()
+        self.would_block.clear()
+        self.stats.clear()
+
+    def summary(self):
+        """Per-step counters as a plain dict"""
+        return {step: dict(counts) for step, counts in self.stats.items()}
+
+    def print_summary(self):
+        """Print requests and bytes per step"""
+        if not self.stats:
+            return
+        mode = "would block" if self.measure_only else "blocked"
+        print(f"\n🚦 Network traffic per step ({mode} / loaded):")
+        for step, counts in self.stats.items():
+            blocked = f"{counts['blocked_requests']} requests"
+            if self.measure_only:
+                blocked += f" ({counts['blocked_bytes'] / 1e6:.2f} MB)"
+            print(f"   {step:<14} {mode}: {blocked:<24} loaded: {counts['allowed_requests']} requests "
+                  f"({counts['allowed_bytes'] / 1e6:.2f} MB)")
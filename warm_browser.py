@@ -0,0 +1,77 @@
+"""
+Long-Lived Browser for the Kijiji Daily Scheduler
+Keeps one Chromium process running between scheduled jobs instead of cold-starting it per run
+
+Each job gets a fresh browser context (separate cookies, pages and routes) from the
+same warm browser. Before handing the browser out it is health-checked, and if it has
+crashed or stopped responding it is relaunched automatically.
+"""
+
+import asyncio
+
+from playwright.async_api import async_playwright
+
+
+class WarmBrowser:
+    """
+    Owns a Playwright instance and a single long-running browser.
+
+    Must be used from one persistent event loop - Playwright objects
+    can't move between loops (so no asyncio.run() per job).
+    """
+
+    def __init__(self, launcher, health_timeout=10):
+        """
+        Args:
+            launcher: Coroutine function taking a Playwright instance and returning a browser
+                      (e.g. automation.launch_browser)
+            health_timeout (float): Seconds a health check may take before the browser counts as hung
+        """
+        self.launcher = launcher
+        self.health_timeout = health_timeout
+        self.playwright = None
+        self.browser = None
+        self.launches = 0
+
+    async def _launch(self):
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        self.browser = await self.launcher(self.playwright)
+        self.launches += 1
+        print(f"🌐 Browser launched (launch #{self.launches}, Chromium {self.browser.version})")
+
+    async def is_healthy(self):
+        """True if the browser is connected and can still open a context quickly"""
+        if self.browser is None or not self.browser.is_connected():
+            return False
+        try:
+            context = await asyncio.wait_for(self.browser.new_context(), self.health_timeout)
+            await context.close()
+            return True
+        except Exception:
+            return False
+
+    async def get(self):
+        """Return a healthy browser, relaunching it if it crashed or hung"""
+        if await self.is_healthy():
+            return self.browser
+        if self.browser is not None:
+            print("⚠️ Warm browser is not responding - relaunching")
+            await self._close_browser()
+        await self._launch()
+        return self.browser
+
+    async def _close_browser(self):
+        try:
+            await asyncio.wait_for(self.browser.close(), self.health_timeout)
+        except Exception:
+            pass
+        self.browser = None
+
+    async def stop(self):
+        """Close the browser and Playwright (end of the scheduler)"""
+        if self.browser is not None:
+            await self._close_browser()
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None